@@ -0,0 +1,533 @@
+"""
+Ejecuta los checks de checks.yml (SodaCL) en DuckDB, sin pasar por Athena.
+
+Sirve para correr la suite en desarrollo y antes de mergear, en segundos y sin costo, sobre:
+- el archivo DuckDB local (por ejemplo el de dlt o el de los unit tests de dbt), o
+- extractos parquet de las tablas (un archivo <tabla>.parquet o un directorio <tabla>/ por tabla)
+
+Soporta el subconjunto de SodaCL que usa checks.yml:
+- missing_count(col), duplicate_count(col, ...), invalid_count(col) con valid format,
+  valid values, valid min, valid max, valid regex, valid min length y valid max length,
+  y row_count, comparados con =, !=, <, <=, > o >= contra un número
+- freshness(col) < 1d (unidades d, h y m, combinables: 1d12h)
+- values in (col, ...) must exist in tabla (col, ...)
+- row_count same as tabla [in data_source]
+
+Todos los checks de una tabla se compilan en una sola consulta que la recorre una vez: las
+métricas son agregados con FILTER, duplicate_count usa COUNT(*) OVER (PARTITION BY col) y
+los checks de referencia son NOT EXISTS contra la tabla padre (DuckDB los resuelve con un
+hash join sobre el mismo recorrido). Solo row_count same as agrega una consulta por tabla
+comparada.
+
+Uso:
+    python scan_duckdb.py --duckdb ../transformacion/dbt/unit_test.duckdb --esquema unit_test \\
+        --fuente raw_dev=raw_datavision_local checks.yml
+    python scan_duckdb.py --parquet extractos/staging --fuente raw_dev=extractos/raw checks.yml
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import duckdb
+import yaml
+
+ARCHIVO_CHECKS = "checks.yml"
+
+# Expresiones regulares de valid format, con la misma semántica que los formatos de Soda
+FORMATOS = {
+    'email': r"^[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]+@[A-Za-z0-9-]+(\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}$",
+    'uuid': r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$",
+    'integer': r"^[-+]?[0-9]+$",
+    'positive integer': r"^\+?[0-9]+$",
+    'decimal': r"^[-+]?([0-9]+([.,][0-9]*)?|[.,][0-9]+)$",
+    'date iso 8601': r"^[0-9]{4}-[0-9]{2}-[0-9]{2}([T ][0-9]{2}:[0-9]{2}(:[0-9]{2}(\.[0-9]+)?)?)?$",
+    'ip address': r"^([0-9]{1,3}\.){3}[0-9]{1,3}$",
+}
+
+# Configuración de un check que define qué valores son válidos (invalid_count)
+CLAVES_VALIDEZ = {
+    'valid format', 'valid values', 'valid min', 'valid max',
+    'valid regex', 'valid min length', 'valid max length'
+}
+
+OPERADORES = {
+    '=': lambda valor, umbral: valor == umbral,
+    '!=': lambda valor, umbral: valor != umbral,
+    '<>': lambda valor, umbral: valor != umbral,
+    '<': lambda valor, umbral: valor < umbral,
+    '<=': lambda valor, umbral: valor <= umbral,
+    '>': lambda valor, umbral: valor > umbral,
+    '>=': lambda valor, umbral: valor >= umbral,
+}
+
+PATRON_METRICA = re.compile(
+    r"^(?P<metrica>missing_count|duplicate_count|invalid_count)\((?P<columnas>[^)]+)\)\s*"
+    r"(?P<operador>!=|<>|<=|>=|=|<|>)\s*(?P<umbral>-?\d+(\.\d+)?)$"
+)
+PATRON_ROW_COUNT = re.compile(r"^row_count\s*(?P<operador>!=|<>|<=|>=|=|<|>)\s*(?P<umbral>-?\d+(\.\d+)?)$")
+PATRON_FRESCURA = re.compile(r"^freshness\((?P<columna>\w+)\)\s*<\s*(?P<umbral>(\d+[dhm])+)$")
+PATRON_REFERENCIA = re.compile(
+    r"^values in \((?P<columnas>[^)]+)\) must exist in (?P<padre>\w+) \((?P<columnas_padre>[^)]+)\)$"
+)
+PATRON_MISMO_CONTEO = re.compile(r"^row_count same as (?P<otra>\w+)(?: in (?P<fuente>\w+))?$")
+
+def separar_columnas(texto: str) -> List[str]:
+    """
+    Columnas de una lista separada por comas de una definición de check.
+
+    Args:
+        texto (str): Columnas, por ejemplo 'id_cuenta, id_suscripcion'
+
+    Returns:
+        Lista de columnas
+    """
+    return [columna.strip() for columna in texto.split(',') if columna.strip()]
+
+def duracion_frescura(texto: str) -> timedelta:
+    """
+    Convierte el umbral de un check de freshness (1d, 12h, 1d6h, 30m) en timedelta.
+
+    Args:
+        texto (str): Umbral del check
+
+    Returns:
+        timedelta: Antigüedad máxima
+    """
+    unidades = {'d': 'days', 'h': 'hours', 'm': 'minutes'}
+    duracion = timedelta()
+    for cantidad, unidad in re.findall(r"(\d+)([dhm])", texto):
+        duracion += timedelta(**{unidades[unidad]: int(cantidad)})
+    return duracion
+
+def interpretar_check(tabla: str, definicion: str, config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Interpreta un check de SodaCL.
+
+    Args:
+        tabla (str): Tabla del bloque 'checks for'
+        definicion (str): Definición del check, por ejemplo 'missing_count(id_cuenta) = 0'
+        config (Dict[str, Any]): Configuración del check (name, valid ...), o None
+
+    Returns:
+        Dict con tabla, definicion, nombre y tipo, más los datos de cada tipo de check.
+        Los checks no soportados tienen tipo 'no_soportado' y el motivo en 'error'.
+    """
+    config = config or {}
+    check = {
+        'tabla': tabla,
+        'definicion': definicion,
+        'nombre': config.get('name', definicion),
+        'tipo': 'no_soportado'
+    }
+    desconocidas = set(config) - CLAVES_VALIDEZ - {'name'}
+    if desconocidas:
+        check['error'] = f"configuración no soportada: {', '.join(sorted(desconocidas))}"
+        return check
+
+    if coincidencia := PATRON_METRICA.match(definicion):
+        columnas = separar_columnas(coincidencia['columnas'])
+        check.update({
+            'tipo': coincidencia['metrica'],
+            'columnas': columnas,
+            'operador': coincidencia['operador'],
+            'umbral': float(coincidencia['umbral'])
+        })
+        validez = {clave: valor for clave, valor in config.items() if clave in CLAVES_VALIDEZ}
+        if check['tipo'] == 'invalid_count':
+            if not validez:
+                check.update({'tipo': 'no_soportado', 'error': 'invalid_count sin configuración valid ...'})
+            elif validez.get('valid format') is not None and validez['valid format'] not in FORMATOS:
+                check.update({'tipo': 'no_soportado', 'error': f"formato no soportado: {validez['valid format']}"})
+            check['validez'] = validez
+        elif validez:
+            check.update({'tipo': 'no_soportado', 'error': f"{check['tipo']} no admite configuración valid ..."})
+        if len(columnas) > 1 and check['tipo'] in ('missing_count', 'invalid_count'):
+            check.update({'tipo': 'no_soportado', 'error': f"{check['tipo']} admite una sola columna"})
+    elif coincidencia := PATRON_ROW_COUNT.match(definicion):
+        check.update({
+            'tipo': 'row_count',
+            'operador': coincidencia['operador'],
+            'umbral': float(coincidencia['umbral'])
+        })
+    elif coincidencia := PATRON_FRESCURA.match(definicion):
+        check.update({
+            'tipo': 'freshness',
+            'columnas': [coincidencia['columna']],
+            'umbral': duracion_frescura(coincidencia['umbral'])
+        })
+    elif coincidencia := PATRON_REFERENCIA.match(definicion):
+        columnas = separar_columnas(coincidencia['columnas'])
+        columnas_padre = separar_columnas(coincidencia['columnas_padre'])
+        if len(columnas) != len(columnas_padre):
+            check['error'] = 'distinta cantidad de columnas en la tabla y en la tabla padre'
+            return check
+        check.update({
+            'tipo': 'reference',
+            'columnas': columnas,
+            'padre': coincidencia['padre'],
+            'columnas_padre': columnas_padre
+        })
+    elif coincidencia := PATRON_MISMO_CONTEO.match(definicion):
+        check.update({
+            'tipo': 'row_count_same_as',
+            'otra': coincidencia['otra'],
+            'fuente': coincidencia['fuente']
+        })
+    else:
+        check['error'] = 'check no soportado por el motor local'
+    return check
+
+def cargar_checks(ruta: str = ARCHIVO_CHECKS) -> List[Dict[str, Any]]:
+    """
+    Lee los bloques 'checks for <tabla>' de un archivo SodaCL.
+
+    Args:
+        ruta (str): Ruta del archivo de checks
+
+    Returns:
+        Lista de checks (ver interpretar_check), en el orden del archivo
+    """
+    with open(ruta, 'r', encoding='utf-8') as f:
+        contenido = yaml.safe_load(f) or {}
+
+    checks = []
+    for clave, items in contenido.items():
+        if not clave.startswith('checks for '):
+            continue
+        tabla = clave[len('checks for '):].strip()
+        for item in items or []:
+            if isinstance(item, dict):
+                for definicion, config in item.items():
+                    checks.append(interpretar_check(tabla, definicion.strip(), config))
+            else:
+                checks.append(interpretar_check(tabla, str(item).strip(), None))
+    return checks
+
+def literal_sql(valor: Any) -> str:
+    """
+    Literal SQL de un valor de la configuración de un check.
+
+    Args:
+        valor: Texto, número o booleano
+
+    Returns:
+        str: Literal SQL
+    """
+    if isinstance(valor, bool):
+        return 'TRUE' if valor else 'FALSE'
+    if isinstance(valor, (int, float)):
+        return repr(valor)
+    texto = str(valor).replace("'", "''")
+    return f"'{texto}'"
+
+def condicion_invalida(columna: str, validez: Dict[str, Any]) -> str:
+    """
+    Condición SQL de una fila con un valor inválido según la configuración valid ... del check.
+
+    Como en Soda, los NULL no son inválidos (los cuenta missing_count) y un valor es
+    inválido si no cumple alguna de las condiciones configuradas.
+
+    Args:
+        columna (str): Columna
+        validez (Dict[str, Any]): Claves valid ... del check
+
+    Returns:
+        str: Condición para un FILTER
+    """
+    validas = []
+    if validez.get('valid format') is not None:
+        patron = FORMATOS[validez['valid format']].replace("'", "''")
+        validas.append(f"regexp_full_match(CAST({columna} AS VARCHAR), '{patron}')")
+    if validez.get('valid regex') is not None:
+        patron = str(validez['valid regex']).replace("'", "''")
+        validas.append(f"regexp_full_match(CAST({columna} AS VARCHAR), '{patron}')")
+    if validez.get('valid values') is not None:
+        validas.append(f"{columna} IN ({', '.join(literal_sql(valor) for valor in validez['valid values'])})")
+    if validez.get('valid min') is not None:
+        validas.append(f"{columna} >= {literal_sql(validez['valid min'])}")
+    if validez.get('valid max') is not None:
+        validas.append(f"{columna} <= {literal_sql(validez['valid max'])}")
+    if validez.get('valid min length') is not None:
+        validas.append(f"length(CAST({columna} AS VARCHAR)) >= {int(validez['valid min length'])}")
+    if validez.get('valid max length') is not None:
+        validas.append(f"length(CAST({columna} AS VARCHAR)) <= {int(validez['valid max length'])}")
+    return f"{columna} IS NOT NULL AND NOT ({' AND '.join(validas)})"
+
+def construir_consulta_tabla(
+    tabla_sql: str,
+    checks: List[Dict[str, Any]],
+    tablas_sql: Dict[str, str]
+) -> Tuple[str, List[str]]:
+    """
+    Compila en una sola consulta todos los checks de una tabla que se calculan recorriéndola.
+
+    Args:
+        tabla_sql (str): Nombre calificado de la tabla en DuckDB
+        checks (List[Dict[str, Any]]): Checks de la tabla (ver interpretar_check)
+        tablas_sql (Dict[str, str]): Tabla -> nombre calificado, para las tablas padre
+
+    Returns:
+        Tupla (consulta, claves) con una clave 'metrica:<índice del check>' por columna del
+        resultado, más 'row_count'
+    """
+    agregados = ["COUNT(*)"]
+    claves = ['row_count']
+    particiones = []
+    for indice, check in enumerate(checks):
+        columnas = check.get('columnas', [])
+        if check['tipo'] == 'missing_count':
+            agregados.append(f"COUNT(*) FILTER (WHERE {columnas[0]} IS NULL)")
+        elif check['tipo'] == 'invalid_count':
+            agregados.append(f"COUNT(*) FILTER (WHERE {condicion_invalida(columnas[0], check['validez'])})")
+        elif check['tipo'] == 'duplicate_count':
+            # Valores distintos (sin NULL) que aparecen en más de una fila, como en Soda
+            frecuencia = f"_frecuencia_{indice}"
+            particiones.append(f"COUNT(*) OVER (PARTITION BY {', '.join(columnas)}) AS {frecuencia}")
+            valor = columnas[0] if len(columnas) == 1 else f"row({', '.join(columnas)})"
+            no_nulos = ' AND '.join(f"{columna} IS NOT NULL" for columna in columnas)
+            agregados.append(f"COUNT(DISTINCT CASE WHEN {frecuencia} > 1 AND {no_nulos} THEN {valor} END)")
+        elif check['tipo'] == 'freshness':
+            agregados.append(f"MAX({columnas[0]})")
+        elif check['tipo'] == 'reference':
+            padre = tablas_sql[check['padre']]
+            igualdades = ' AND '.join(
+                f"p.{columna_padre} = t.{columna}"
+                for columna, columna_padre in zip(columnas, check['columnas_padre'])
+            )
+            no_nulos = ' AND '.join(f"t.{columna} IS NOT NULL" for columna in columnas)
+            agregados.append(
+                f"COUNT(*) FILTER (WHERE {no_nulos} AND NOT EXISTS (SELECT 1 FROM {padre} p WHERE {igualdades}))"
+            )
+        else:
+            continue
+        claves.append(f"metrica:{indice}")
+
+    origen = tabla_sql
+    if particiones:
+        origen = f"(SELECT *, {', '.join(particiones)} FROM {tabla_sql})"
+    return f"SELECT {', '.join(agregados)} FROM {origen} t", claves
+
+def evaluar_check(check: Dict[str, Any], valor: Any, ahora: datetime) -> Dict[str, Any]:
+    """
+    Compara el valor medido de un check con su umbral.
+
+    Args:
+        check (Dict[str, Any]): Check (ver interpretar_check)
+        valor: Valor medido (para freshness, el máximo de la columna)
+        ahora (datetime): Momento de referencia de freshness
+
+    Returns:
+        Dict con el check, el valor y status 'OK' o 'FAIL'
+    """
+    if check['tipo'] == 'freshness':
+        if valor is None:
+            return {**check, 'valor': None, 'status': 'FAIL', 'message': 'La columna no tiene valores'}
+        if not isinstance(valor, datetime):
+            valor = datetime.combine(valor, datetime.min.time())
+        antiguedad = ahora - valor.replace(tzinfo=None)
+        return {
+            **check,
+            'valor': antiguedad,
+            'status': 'OK' if antiguedad < check['umbral'] else 'FAIL',
+            'message': f'Más reciente: {valor} (antigüedad {antiguedad})'
+        }
+    if check['tipo'] == 'reference':
+        return {**check, 'valor': valor, 'status': 'OK' if valor == 0 else 'FAIL'}
+    return {
+        **check,
+        'valor': valor,
+        'status': 'OK' if OPERADORES[check['operador']](valor, check['umbral']) else 'FAIL'
+    }
+
+def abrir_conexion(
+    archivo_duckdb: Optional[str],
+    directorio_parquet: Optional[str],
+    esquema: str,
+    fuentes: Dict[str, str]
+) -> Tuple[duckdb.DuckDBPyConnection, Dict[str, str]]:
+    """
+    Abre DuckDB sobre el archivo local o sobre los extractos parquet.
+
+    Con extractos parquet, cada archivo <tabla>.parquet o directorio <tabla>/ se expone
+    como una vista, sin copiar los datos.
+
+    Args:
+        archivo_duckdb (str): Archivo DuckDB a abrir en solo lectura, o None
+        directorio_parquet (str): Directorio de extractos de la fuente principal, o None
+        esquema (str): Esquema de las tablas de la fuente principal en el archivo DuckDB
+        fuentes (Dict[str, str]): Data source de SodaCL -> esquema del archivo DuckDB o
+            directorio de extractos (para row_count same as ... in <data_source>)
+
+    Returns:
+        Tupla (conexión, data source -> esquema en la conexión). La fuente principal es ''.
+    """
+    conn = duckdb.connect()
+    catalogo = ''
+    if archivo_duckdb:
+        # Solo lectura: las vistas de los extractos quedan en la base en memoria
+        ruta = archivo_duckdb.replace("'", "''")
+        conn.execute(f"ATTACH '{ruta}' AS origen (READ_ONLY)")
+        catalogo = 'origen.'
+    esquemas = {'': f"{catalogo}{esquema}"}
+    directorios = {}
+    if directorio_parquet:
+        esquemas[''] = 'extractos'
+        directorios['extractos'] = directorio_parquet
+    for fuente, destino in fuentes.items():
+        if os.path.isdir(destino):
+            esquemas[fuente] = f"extractos_{fuente}"
+            directorios[f"extractos_{fuente}"] = destino
+        else:
+            esquemas[fuente] = f"{catalogo}{destino}"
+
+    for esquema_vistas, directorio in directorios.items():
+        conn.execute(f"CREATE SCHEMA IF NOT EXISTS {esquema_vistas}")
+        for nombre in sorted(os.listdir(directorio)):
+            ruta = os.path.join(directorio, nombre)
+            if os.path.isdir(ruta):
+                tabla, archivos = nombre, os.path.join(ruta, '**', '*.parquet')
+            elif nombre.endswith('.parquet'):
+                tabla, archivos = nombre[:-len('.parquet')], ruta
+            else:
+                continue
+            archivos = archivos.replace("'", "''")
+            conn.execute(f"CREATE VIEW {esquema_vistas}.{tabla} AS SELECT * FROM read_parquet('{archivos}')")
+    return conn, esquemas
+
+def ejecutar_checks(
+    conn: duckdb.DuckDBPyConnection,
+    checks: List[Dict[str, Any]],
+    esquemas: Dict[str, str]
+) -> List[Dict[str, Any]]:
+    """
+    Ejecuta los checks agrupados por tabla: una consulta por tabla, más una por row_count same as.
+
+    Args:
+        conn (duckdb.DuckDBPyConnection): Conexión de abrir_conexion
+        checks (List[Dict[str, Any]]): Checks de cargar_checks
+        esquemas (Dict[str, str]): Data source -> esquema (ver abrir_conexion)
+
+    Returns:
+        Lista de resultados en el orden de checks, con status 'OK', 'FAIL', 'ERROR' o 'SKIP'
+    """
+    ahora = datetime.now()
+    resultados: List[Optional[Dict[str, Any]]] = [None] * len(checks)
+    por_tabla: Dict[str, List[int]] = {}
+    for indice, check in enumerate(checks):
+        if check['tipo'] == 'no_soportado':
+            resultados[indice] = {**check, 'status': 'SKIP', 'message': check['error']}
+        else:
+            por_tabla.setdefault(check['tabla'], []).append(indice)
+
+    tablas_sql = {check['tabla']: f"{esquemas['']}.{check['tabla']}" for check in checks}
+    tablas_sql.update({check['padre']: f"{esquemas['']}.{check['padre']}" for check in checks if 'padre' in check})
+    for tabla, indices in por_tabla.items():
+        checks_tabla = [checks[indice] for indice in indices]
+        inicio = time.perf_counter()
+        try:
+            consulta, claves = construir_consulta_tabla(tablas_sql[tabla], checks_tabla, tablas_sql)
+            valores = dict(zip(claves, conn.execute(consulta).fetchone()))
+        except Exception as e:
+            for indice in indices:
+                resultados[indice] = {**checks[indice], 'status': 'ERROR', 'error': str(e)}
+            print(f"  ❌ Error escaneando {tabla}: {e}")
+            continue
+        print(f"  🔍 {tabla}: {len(indices)} checks en una consulta ({time.perf_counter() - inicio:.2f} s)")
+
+        for posicion, indice in enumerate(indices):
+            check = checks[indice]
+            if check['tipo'] == 'row_count':
+                resultados[indice] = evaluar_check(check, valores['row_count'], ahora)
+            elif check['tipo'] == 'row_count_same_as':
+                try:
+                    esquema_otra = esquemas[check['fuente'] or '']
+                    otra = conn.execute(f"SELECT COUNT(*) FROM {esquema_otra}.{check['otra']}").fetchone()[0]
+                except KeyError:
+                    resultados[indice] = {
+                        **check, 'status': 'ERROR',
+                        'error': f"data source {check['fuente']} sin --fuente {check['fuente']}=..."
+                    }
+                    continue
+                except Exception as e:
+                    resultados[indice] = {**check, 'status': 'ERROR', 'error': str(e)}
+                    continue
+                resultados[indice] = {
+                    **check,
+                    'valor': valores['row_count'] - otra,
+                    'status': 'OK' if valores['row_count'] == otra else 'FAIL',
+                    'message': f"{valores['row_count']} filas vs {otra} en {check['otra']}"
+                }
+            else:
+                resultados[indice] = evaluar_check(check, valores[f"metrica:{posicion}"], ahora)
+    return resultados
+
+def mostrar_resultados(resultados: List[Dict[str, Any]]):
+    """
+    Muestra el resultado de cada check y el resumen del scan.
+
+    Args:
+        resultados (List[Dict[str, Any]]): Resultados de ejecutar_checks
+    """
+    print("\n" + "=" * 50)
+    print("📋 RESULTADOS DEL SCAN LOCAL")
+    print("=" * 50)
+
+    iconos = {'OK': '✅', 'FAIL': '❌', 'ERROR': '💥', 'SKIP': '⏭️'}
+    for resultado in resultados:
+        detalle = resultado.get('message') or resultado.get('error')
+        if detalle is None and 'valor' in resultado:
+            detalle = f"valor: {resultado['valor']}"
+        print(f"  {iconos[resultado['status']]} {resultado['tabla']}: {resultado['nombre']} ({detalle})")
+
+    conteos = {status: sum(r['status'] == status for r in resultados) for status in iconos}
+    print(
+        f"\n  {conteos['OK']} correctos, {conteos['FAIL']} fallidos, "
+        f"{conteos['ERROR']} con error, {conteos['SKIP']} no soportados"
+    )
+    print("=" * 50)
+
+def codigo_salida(resultados: List[Dict[str, Any]]) -> int:
+    """
+    Código de salida del scan, con la convención de soda scan.
+
+    Args:
+        resultados (List[Dict[str, Any]]): Resultados de ejecutar_checks
+
+    Returns:
+        int: 0 si todo pasó, 2 si algún check falló, 3 si alguno dio error
+    """
+    if any(resultado['status'] == 'ERROR' for resultado in resultados):
+        return 3
+    if any(resultado['status'] == 'FAIL' for resultado in resultados):
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Ejecuta los checks de SodaCL en DuckDB local')
+    parser.add_argument('checks', nargs='?', default=ARCHIVO_CHECKS,
+                      help=f'Archivo de checks de SodaCL. Por defecto es {ARCHIVO_CHECKS}.')
+    origen = parser.add_mutually_exclusive_group(required=True)
+    origen.add_argument('--duckdb', metavar='ARCHIVO',
+                      help='Archivo DuckDB con las tablas (se abre en solo lectura)')
+    origen.add_argument('--parquet', metavar='DIRECTORIO',
+                      help='Directorio con un <tabla>.parquet o un directorio <tabla>/ de archivos parquet por tabla')
+    parser.add_argument('--esquema', default='main',
+                      help='Esquema de las tablas en el archivo DuckDB. Por defecto es main.')
+    parser.add_argument('--fuente', action='append', default=[], metavar='DATA_SOURCE=ESQUEMA_O_DIRECTORIO',
+                      help='Esquema del archivo DuckDB o directorio de extractos de otro data source, para row_count same as ... in <data_source>. Se puede repetir.')
+    args = parser.parse_args()
+
+    fuentes = dict(fuente.split('=', 1) for fuente in args.fuente)
+    checks = cargar_checks(args.checks)
+    print(f"🔍 Escaneando {len(checks)} checks de {args.checks} en DuckDB...")
+    conn, esquemas = abrir_conexion(args.duckdb, args.parquet, args.esquema, fuentes)
+    try:
+        resultados = ejecutar_checks(conn, checks, esquemas)
+    finally:
+        conn.close()
+    mostrar_resultados(resultados)
+    sys.exit(codigo_salida(resultados))
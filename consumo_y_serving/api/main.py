@@ -3,6 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
 from pydantic import BaseModel
 from typing import List, Optional
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
 import boto3
 import os
 import json
@@ -12,8 +16,21 @@ ATHENA_DATABASE = os.getenv("ATHENA_DATABASE", "datavision")
 ATHENA_WORKGROUP = os.getenv("ATHENA_WORKGROUP", "primary")
 ATHENA_OUTPUT_LOCATION = os.getenv("ATHENA_OUTPUT_LOCATION", "s3://dateneo-athena-results-us-west-2-034362074834/")
 
-# Cliente de Athena
-athena_client = boto3.client('athena')
+# Espera entre consultas del estado de una consulta: empieza en ATHENA_ESPERA_INICIAL_S (las
+# consultas puntuales terminan en décimas de segundo) y crece hasta ATHENA_ESPERA_MAXIMA_S
+ATHENA_ESPERA_INICIAL_S = float(os.getenv("ATHENA_ESPERA_INICIAL_S", "0.05"))
+ATHENA_ESPERA_MAXIMA_S = float(os.getenv("ATHENA_ESPERA_MAXIMA_S", "1"))
+ATHENA_FACTOR_ESPERA = 1.5
+# Tiempo máximo de una consulta (envío, espera y resultados); al vencer se cancela y se responde 504
+ATHENA_TIMEOUT_S = float(os.getenv("ATHENA_TIMEOUT_S", "30"))
+# Llamadas a Athena en curso a la vez: hilos del executor y conexiones HTTP del cliente
+ATHENA_MAX_CONEXIONES = int(os.getenv("ATHENA_MAX_CONEXIONES", "50"))
+
+# Cliente de Athena. boto3 es bloqueante: sus llamadas se ejecutan en un executor propio para no
+# frenar el event loop mientras otras solicitudes esperan a Athena (el executor por defecto de
+# asyncio tiene pocos hilos y lo comparte el resto de la aplicación)
+athena_client = boto3.client('athena', config=Config(max_pool_connections=ATHENA_MAX_CONEXIONES))
+athena_executor = ThreadPoolExecutor(max_workers=ATHENA_MAX_CONEXIONES, thread_name_prefix="athena")
 
 # Modelos Pydantic para las respuestas
 class SegmentoRFM(BaseModel):
@@ -82,36 +99,48 @@ async def api_status():
     }
 
 # Funciones auxiliares para Athena
+async def llamar_athena(metodo: str, **kwargs) -> dict:
+    """Ejecuta un método del cliente de Athena en athena_executor sin bloquear el event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(athena_executor, functools.partial(getattr(athena_client, metodo), **kwargs))
+
+async def esperar_consulta_athena(query_execution_id: str):
+    """Espera a que termine una consulta de Athena sin bloquear el event loop, con espera creciente entre consultas de estado"""
+    espera = ATHENA_ESPERA_INICIAL_S
+    while True:
+        response = await llamar_athena('get_query_execution', QueryExecutionId=query_execution_id)
+        status = response['QueryExecution']['Status']['State']
+        
+        if status in ['SUCCEEDED']:
+            return
+        elif status in ['FAILED', 'CANCELLED']:
+            error_reason = response['QueryExecution']['Status'].get('StateChangeReason', 'Unknown error')
+            raise HTTPException(status_code=500, detail=f"Query failed: {error_reason}")
+        
+        await asyncio.sleep(espera)
+        espera = min(espera * ATHENA_FACTOR_ESPERA, ATHENA_ESPERA_MAXIMA_S)
+
 async def ejecutar_consulta_athena(query: str) -> List[dict]:
     """Ejecuta una consulta en Athena y retorna los resultados"""
+    query_execution_id = None
     try:
-        # Ejecutar la consulta
-        response = athena_client.start_query_execution(
-            QueryString=query,
-            QueryExecutionContext={'Database': ATHENA_DATABASE},
-            ResultConfiguration={'OutputLocation': ATHENA_OUTPUT_LOCATION},
-            WorkGroup=ATHENA_WORKGROUP
-        )
-        
-        query_execution_id = response['QueryExecutionId']
-        
-        # Esperar a que termine la consulta
-        while True:
-            response = athena_client.get_query_execution(QueryExecutionId=query_execution_id)
-            status = response['QueryExecution']['Status']['State']
+        async with asyncio.timeout(ATHENA_TIMEOUT_S):
+            # Ejecutar la consulta
+            response = await llamar_athena(
+                'start_query_execution',
+                QueryString=query,
+                QueryExecutionContext={'Database': ATHENA_DATABASE},
+                ResultConfiguration={'OutputLocation': ATHENA_OUTPUT_LOCATION},
+                WorkGroup=ATHENA_WORKGROUP
+            )
             
-            if status in ['SUCCEEDED']:
-                break
-            elif status in ['FAILED', 'CANCELLED']:
-                error_reason = response['QueryExecution']['Status'].get('StateChangeReason', 'Unknown error')
-                raise HTTPException(status_code=500, detail=f"Query failed: {error_reason}")
+            query_execution_id = response['QueryExecutionId']
             
-            # Esperar 1 segundo antes de verificar nuevamente
-            import time
-            time.sleep(1)
-        
-        # Obtener los resultados
-        results = athena_client.get_query_results(QueryExecutionId=query_execution_id)
+            # Esperar a que termine la consulta
+            await esperar_consulta_athena(query_execution_id)
+            
+            # Obtener los resultados
+            results = await llamar_athena('get_query_results', QueryExecutionId=query_execution_id)
         
         # Procesar los resultados
         rows = results['ResultSet']['Rows']
@@ -136,6 +165,16 @@ async def ejecutar_consulta_athena(query: str) -> List[dict]:
         
         return data
         
+    except TimeoutError:
+        # No dejar la consulta corriendo (y cobrando) en Athena
+        if query_execution_id is not None:
+            try:
+                await llamar_athena('stop_query_execution', QueryExecutionId=query_execution_id)
+            except Exception:
+                pass
+        raise HTTPException(status_code=504, detail=f"La consulta superó el tiempo máximo de {ATHENA_TIMEOUT_S:g} s")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error ejecutando consulta: {str(e)}")
 
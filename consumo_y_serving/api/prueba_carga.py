@@ -0,0 +1,197 @@
+"""
+Prueba de carga de GET /api/v1/rfm/cliente/{id_cuenta} con solicitudes concurrentes.
+
+Por defecto corre en el proceso contra una Athena simulada: las consultas tardan
+--latencia-ms en terminar y cada llamada a la API de Athena bloquea --red-ms, como
+boto3. Mide el tiempo total de --solicitudes solicitudes lanzadas de a --concurrencia
+y lo compara con lo que tardarían una detrás de otra: si el event loop se bloqueara
+mientras se espera a Athena, el tiempo total sería el secuencial.
+
+Con --url se envían las solicitudes a una API desplegada o levantada con python main.py.
+
+Uso:
+    python prueba_carga.py --solicitudes 50 --concurrencia 50 --latencia-ms 800
+    python prueba_carga.py --url http://localhost:8000 --solicitudes 20 --concurrencia 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+# El cliente de Athena se crea al importar main; en la simulación no se usa
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+
+import main
+
+RUTA_CLIENTE = "/api/v1/rfm/cliente/{id_cuenta}"
+
+class AthenaSimulada:
+    """Cliente con la interfaz de boto3 cuyas consultas terminan latencia_ms después de enviarse."""
+
+    def __init__(self, latencia_ms: float, red_ms: float):
+        self.latencia_s = latencia_ms / 1000
+        self.red_s = red_ms / 1000
+        self.inicios: Dict[str, float] = {}
+        self.consultas_estado = 0
+        self.lock = threading.Lock()
+
+    def start_query_execution(self, **kwargs) -> Dict:
+        time.sleep(self.red_s)
+        query_execution_id = str(uuid.uuid4())
+        with self.lock:
+            self.inicios[query_execution_id] = time.perf_counter()
+        return {'QueryExecutionId': query_execution_id}
+
+    def get_query_execution(self, QueryExecutionId: str) -> Dict:
+        time.sleep(self.red_s)
+        with self.lock:
+            self.consultas_estado += 1
+        terminada = time.perf_counter() - self.inicios[QueryExecutionId] >= self.latencia_s
+        return {'QueryExecution': {'Status': {'State': 'SUCCEEDED' if terminada else 'RUNNING'}}}
+
+    def get_query_results(self, QueryExecutionId: str) -> Dict:
+        time.sleep(self.red_s)
+        columnas = ['id_cuenta', 'email', 'nombre', 'segmento_rfm_ultimo', 'fecha_rfm_ultimo',
+                    'segmento_rfm_anterior', 'fecha_rfm_anterior']
+        valores = ['1', 'cliente@ejemplo.com', 'Cliente', 'Campeones', '2025-01-01',
+                   'Clientes Leales', '2024-12-01']
+        return {'ResultSet': {'Rows': [
+            {'Data': [{'VarCharValue': columna} for columna in columnas]},
+            {'Data': [{'VarCharValue': valor} for valor in valores]}
+        ]}}
+
+    def stop_query_execution(self, QueryExecutionId: str) -> Dict:
+        return {}
+
+async def solicitud_asgi(ruta: str) -> Tuple[int, float]:
+    """
+    Envía un GET a la aplicación FastAPI en el proceso, sin servidor HTTP.
+
+    Args:
+        ruta (str): Ruta de la solicitud
+
+    Returns:
+        Tupla (status HTTP, segundos)
+    """
+    inicio = time.perf_counter()
+    mensajes = []
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': ruta, 'raw_path': ruta.encode(), 'query_string': b'',
+        'root_path': '', 'headers': [(b'host', b'localhost')], 'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80)
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(mensaje):
+        mensajes.append(mensaje)
+
+    await main.app(scope, receive, send)
+    status = next(mensaje['status'] for mensaje in mensajes if mensaje['type'] == 'http.response.start')
+    return status, time.perf_counter() - inicio
+
+async def carga_en_proceso(solicitudes: int, concurrencia: int) -> List[Tuple[int, float]]:
+    """
+    Lanza las solicitudes contra la aplicación en el proceso, con hasta concurrencia a la vez.
+
+    Args:
+        solicitudes (int): Solicitudes totales
+        concurrencia (int): Solicitudes en curso como máximo
+
+    Returns:
+        Lista de (status HTTP, segundos) por solicitud
+    """
+    semaforo = asyncio.Semaphore(concurrencia)
+
+    async def una(id_cuenta: int):
+        async with semaforo:
+            return await solicitud_asgi(RUTA_CLIENTE.format(id_cuenta=id_cuenta))
+
+    return await asyncio.gather(*(una(id_cuenta) for id_cuenta in range(1, solicitudes + 1)))
+
+def carga_http(url: str, solicitudes: int, concurrencia: int) -> List[Tuple[int, float]]:
+    """
+    Lanza las solicitudes contra una API levantada, con hasta concurrencia a la vez.
+
+    Args:
+        url (str): URL base de la API
+        solicitudes (int): Solicitudes totales
+        concurrencia (int): Solicitudes en curso como máximo
+
+    Returns:
+        Lista de (status HTTP, segundos) por solicitud
+    """
+    def una(id_cuenta: int) -> Tuple[int, float]:
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url.rstrip('/') + RUTA_CLIENTE.format(id_cuenta=id_cuenta)) as respuesta:
+                json.load(respuesta)
+                status = respuesta.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        return status, time.perf_counter() - inicio
+
+    with ThreadPoolExecutor(max_workers=concurrencia) as executor:
+        return list(executor.map(una, range(1, solicitudes + 1)))
+
+def mostrar_resultados(resultados: List[Tuple[int, float]], total_s: float, concurrencia: int):
+    """
+    Muestra latencias, throughput y el solapamiento de las solicitudes.
+
+    Args:
+        resultados (List[Tuple[int, float]]): (status HTTP, segundos) por solicitud
+        total_s (float): Segundos de toda la prueba
+        concurrencia (int): Solicitudes en curso como máximo
+    """
+    latencias = sorted(segundos for _, segundos in resultados)
+    estados = {}
+    for status, _ in resultados:
+        estados[status] = estados.get(status, 0) + 1
+    secuencial_s = sum(latencias)
+
+    print("\n" + "=" * 50)
+    print("📋 RESULTADO DE LA PRUEBA DE CARGA")
+    print("=" * 50)
+    print(f"  Solicitudes: {len(resultados)} (concurrencia {concurrencia}), status: {estados}")
+    print(f"  Latencia p50 {statistics.median(latencias) * 1000:.0f} ms, "
+          f"p95 {latencias[int(0.95 * (len(latencias) - 1))] * 1000:.0f} ms, "
+          f"máx {latencias[-1] * 1000:.0f} ms")
+    print(f"  Tiempo total {total_s:.2f} s ({len(resultados) / total_s:.1f} solicitudes/s)")
+    print(f"  Una detrás de otra tardarían {secuencial_s:.2f} s: solapamiento x{secuencial_s / total_s:.1f}")
+    print("=" * 50)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Prueba de carga del endpoint RFM por cliente')
+    parser.add_argument('--solicitudes', type=int, default=50,
+                      help='Solicitudes totales. Por defecto es 50.')
+    parser.add_argument('--concurrencia', type=int, default=50,
+                      help='Solicitudes en curso como máximo. Por defecto es 50.')
+    parser.add_argument('--url',
+                      help='URL base de una API levantada. Si no se indica, se prueba en el proceso contra una Athena simulada.')
+    parser.add_argument('--latencia-ms', type=float, default=800,
+                      help='Duración de cada consulta en la Athena simulada. Por defecto es 800.')
+    parser.add_argument('--red-ms', type=float, default=20,
+                      help='Tiempo que bloquea cada llamada a la Athena simulada. Por defecto es 20.')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    if args.url:
+        print(f"🚀 {args.solicitudes} solicitudes a {args.url}...")
+        resultados = carga_http(args.url, args.solicitudes, args.concurrencia)
+    else:
+        print(f"🚀 {args.solicitudes} solicitudes en el proceso (consultas de {args.latencia_ms:g} ms simuladas)...")
+        simulada = AthenaSimulada(args.latencia_ms, args.red_ms)
+        main.athena_client = simulada
+        resultados = asyncio.run(carga_en_proceso(args.solicitudes, args.concurrencia))
+        print(f"  Consultas de estado a Athena: {simulada.consultas_estado} "
+              f"({simulada.consultas_estado / args.solicitudes:.1f} por solicitud)")
+    mostrar_resultados(resultados, time.perf_counter() - inicio, args.concurrencia)
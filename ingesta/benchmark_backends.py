@@ -0,0 +1,193 @@
+"""
+Benchmark de los backends de extracción de sql_database (sqlalchemy, pyarrow y connectorx).
+
+Genera una tabla sintética en el PostgreSQL origen configurado en .dlt/secrets.toml,
+la carga a un DuckDB temporal con cada backend en un proceso separado y reporta
+filas por segundo y memoria pico (RSS) de cada uno.
+
+Uso:
+    python benchmark_backends.py --filas 1000000
+    python benchmark_backends.py --filas 5000000 --backends sqlalchemy pyarrow
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import dlt
+from dlt.sources.sql_database import sql_table
+
+import calidad_de_datos
+from ingesta_datavision import BACKENDS
+
+TABLA_BENCHMARK = "benchmark_backends"
+MARCA_RESULTADO = "RESULTADO_BENCHMARK "
+
+def generar_tabla_benchmark(filas: int, env: str = 'local'):
+    """
+    Crea (o recrea) la tabla sintética del benchmark en el origen.
+
+    Args:
+        filas (int): Cantidad de filas a generar
+        env (str): Entorno de ejecución
+    """
+    source_conn = calidad_de_datos.get_db_connection(env)
+    try:
+        with source_conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLA_BENCHMARK}")
+            cursor.execute(f"""
+                CREATE TABLE {TABLA_BENCHMARK} AS
+                SELECT
+                    i AS id,
+                    'cuenta_' || i AS nombre,
+                    md5(i::text) AS descripcion,
+                    (random() * 1000)::numeric(10, 2) AS monto,
+                    (i % 7 = 0) AS activo,
+                    now() - random() * interval '365 days' AS updated_at
+                FROM generate_series(1, {filas}) AS i
+            """)
+            cursor.execute(f"ALTER TABLE {TABLA_BENCHMARK} ADD PRIMARY KEY (id)")
+        source_conn.commit()
+    finally:
+        source_conn.close()
+
+def eliminar_tabla_benchmark(env: str = 'local'):
+    """
+    Elimina la tabla sintética del benchmark del origen.
+
+    Args:
+        env (str): Entorno de ejecución
+    """
+    source_conn = calidad_de_datos.get_db_connection(env)
+    try:
+        with source_conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLA_BENCHMARK}")
+        source_conn.commit()
+    finally:
+        source_conn.close()
+
+def ejecutar_backend(backend: str, filas: int) -> Dict:
+    """
+    Carga la tabla del benchmark a un DuckDB temporal con el backend indicado.
+
+    Se ejecuta dentro de un proceso hijo para que la memoria pico sea la de este backend.
+
+    Args:
+        backend (str): Backend de extracción
+        filas (int): Cantidad de filas de la tabla (para calcular filas por segundo)
+
+    Returns:
+        Dict con tiempos, filas por segundo y memoria pico
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pipeline = dlt.pipeline(
+            pipeline_name=f'benchmark_{backend}',
+            destination=dlt.destinations.duckdb(os.path.join(tmp_dir, 'destino.duckdb')),
+            dataset_name='benchmark',
+            pipelines_dir=tmp_dir,
+        )
+
+        inicio = time.perf_counter()
+        pipeline.extract(sql_table(table=TABLA_BENCHMARK, backend=backend))
+        extract_s = time.perf_counter() - inicio
+        pipeline.normalize()
+        normalize_s = time.perf_counter() - inicio - extract_s
+        pipeline.load()
+        total_s = time.perf_counter() - inicio
+
+    # En Linux ru_maxrss está en KB
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    return {
+        'backend': backend,
+        'filas': filas,
+        'extract_s': extract_s,
+        'normalize_s': normalize_s,
+        'total_s': total_s,
+        'filas_por_segundo': filas / total_s if total_s > 0 else 0,
+        'peak_rss_mb': peak_rss_mb,
+        'status': 'OK'
+    }
+
+def medir_backend(backend: str, filas: int) -> Dict:
+    """
+    Ejecuta un backend en un proceso separado y recupera sus resultados.
+
+    Args:
+        backend (str): Backend de extracción
+        filas (int): Cantidad de filas de la tabla
+
+    Returns:
+        Dict con los resultados del backend o con el error
+    """
+    proceso = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--backend-hijo', backend, '--filas', str(filas)],
+        capture_output=True,
+        text=True
+    )
+    for linea in proceso.stdout.splitlines():
+        if linea.startswith(MARCA_RESULTADO):
+            return json.loads(linea[len(MARCA_RESULTADO):])
+
+    error = proceso.stderr.strip().splitlines()
+    return {
+        'backend': backend,
+        'status': 'ERROR',
+        'error': error[-1] if error else f'El proceso terminó con código {proceso.returncode}'
+    }
+
+def mostrar_resumen_benchmark(results: List[Dict]):
+    """
+    Muestra un resumen comparativo de los backends.
+
+    Args:
+        results (List[Dict]): Resultados de medir_backend
+    """
+    print("\n" + "=" * 70)
+    print("🏁 RESUMEN DE BACKENDS DE EXTRACCIÓN")
+    print("=" * 70)
+
+    for result in results:
+        if result['status'] == 'OK':
+            print(
+                f"  ✅ {result['backend']:<11} {result['filas_por_segundo']:>12,.0f} filas/s  "
+                f"total {result['total_s']:>7.2f}s (extract {result['extract_s']:.2f}s, normalize {result['normalize_s']:.2f}s)  "
+                f"RSS pico {result['peak_rss_mb']:>7.1f} MB"
+            )
+        else:
+            print(f"  ❌ {result['backend']}: Error - {result.get('error', 'Desconocido')}")
+
+    print("=" * 70)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark de backends de extracción de sql_database')
+    parser.add_argument('--filas', type=int, default=1_000_000,
+                      help='Filas de la tabla sintética. Por defecto es 1.000.000.')
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=BACKENDS,
+                      help='Backends a comparar. Por defecto todos.')
+    parser.add_argument('--conservar-tabla', action='store_true',
+                      help='Si se especifica, no se elimina la tabla sintética al terminar')
+    parser.add_argument('--backend-hijo', choices=BACKENDS,
+                      help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend_hijo:
+        # Proceso hijo: medir un único backend e imprimir el resultado
+        print(MARCA_RESULTADO + json.dumps(ejecutar_backend(args.backend_hijo, args.filas)))
+    else:
+        print(f"🧪 Generando {args.filas:,} filas en {TABLA_BENCHMARK}...")
+        generar_tabla_benchmark(args.filas)
+        try:
+            results = []
+            for backend in args.backends:
+                print(f"⏱️ Midiendo backend {backend}...")
+                results.append(medir_backend(backend, args.filas))
+            mostrar_resumen_benchmark(results)
+        finally:
+            if not args.conservar_tabla:
+                eliminar_tabla_benchmark()
@@ -0,0 +1,173 @@
+"""
+Verificación del ejecutor concurrente de Athena contra un cliente simulado.
+
+ClienteAthenaSimulado implementa las llamadas de boto3 que usa ejecutor_athena
+(start_query_execution, batch_get_query_execution y get_query_results): cada consulta
+termina después de una latencia fija y devuelve una fila con un entero. Se ejecuta el
+mismo conjunto de consultas de a una y con el límite de concurrencia pedido, y se
+verifica que:
+- los resultados (incluida una consulta que falla) son correctos en ambos casos
+- los bytes escaneados y el tiempo de motor de cada consulta se informan
+- nunca hay más consultas en curso que el límite
+- sin límite efectivo (--concurrentes mayor o igual a la cantidad de consultas) el tiempo
+  total no supera al de la consulta más lenta en más de --tolerancia segundos
+
+Sale con código 1 si alguna verificación falla. No necesita credenciales de AWS.
+
+Uso:
+    python benchmark_ejecutor_athena.py
+    python benchmark_ejecutor_athena.py --latencias 1 2 3 4 --concurrentes 2
+"""
+import argparse
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+import ejecutor_athena
+
+class ClienteAthenaSimulado:
+    """Cliente de Athena en memoria: cada consulta tarda la latencia indicada en su texto."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ejecuciones: Dict[str, Dict[str, Any]] = {}
+        self.en_curso_maximo = 0
+        self.llamadas_estado = 0
+
+    def _en_curso(self) -> int:
+        ahora = time.monotonic()
+        return sum(1 for e in self._ejecuciones.values() if e['fin'] > ahora)
+
+    def start_query_execution(self, QueryString: str, WorkGroup: str, **kwargs) -> Dict[str, Any]:
+        # Las consultas simuladas son "SELECT <valor> -- <latencia>"
+        valor, latencia = QueryString.removeprefix('SELECT ').split(' -- ')
+        with self._lock:
+            query_execution_id = f"simulada-{len(self._ejecuciones)}"
+            self._ejecuciones[query_execution_id] = {
+                'valor': valor,
+                'latencia': float(latencia),
+                'fin': time.monotonic() + float(latencia)
+            }
+            self.en_curso_maximo = max(self.en_curso_maximo, self._en_curso())
+        return {'QueryExecutionId': query_execution_id}
+
+    def batch_get_query_execution(self, QueryExecutionIds: List[str]) -> Dict[str, Any]:
+        self.llamadas_estado += 1
+        ahora = time.monotonic()
+        ejecuciones = []
+        for query_execution_id in QueryExecutionIds:
+            ejecucion = self._ejecuciones[query_execution_id]
+            if ejecucion['fin'] > ahora:
+                estado = {'State': 'RUNNING'}
+            elif ejecucion['valor'] == 'error':
+                estado = {'State': 'FAILED', 'StateChangeReason': 'consulta simulada con error'}
+            else:
+                estado = {'State': 'SUCCEEDED'}
+            # Estadísticas simuladas: 1 MB escaneado por segundo de latencia
+            latencia_ms = int(ejecucion['latencia'] * 1000)
+            estadisticas = {'DataScannedInBytes': latencia_ms * 1024 ** 2 // 1000, 'EngineExecutionTimeInMillis': latencia_ms}
+            ejecuciones.append({'QueryExecutionId': query_execution_id, 'Status': estado, 'Statistics': estadisticas})
+        return {'QueryExecutions': ejecuciones, 'UnprocessedQueryExecutionIds': []}
+
+    def get_query_results(self, QueryExecutionId: str, MaxResults: int = 1000) -> Dict[str, Any]:
+        valor = self._ejecuciones[QueryExecutionId]['valor']
+        return {
+            'ResultSet': {
+                'Rows': [{'Data': [{'VarCharValue': 'valor'}]}, {'Data': [{'VarCharValue': valor}]}],
+                'ResultSetMetadata': {'ColumnInfo': [{'Name': 'valor', 'Type': 'bigint'}]}
+            }
+        }
+
+def medir(latencias: List[float], concurrentes: int) -> Dict[str, Any]:
+    """
+    Ejecuta una consulta simulada por latencia, más una que falla, con el límite dado.
+
+    Args:
+        latencias (List[float]): Latencia en segundos de cada consulta
+        concurrentes (int): Consultas en curso como máximo
+
+    Returns:
+        Dict con el tiempo total, los resultados y el máximo de consultas en curso observado
+    """
+    client = ClienteAthenaSimulado()
+    consultas = {f"consulta_{i}": f"SELECT {i} -- {latencia}" for i, latencia in enumerate(latencias)}
+    consultas['consulta_con_error'] = f"SELECT error -- {min(latencias)}"
+
+    estadisticas = {}
+    inicio = time.perf_counter()
+    results = ejecutor_athena.ejecutar_consultas(
+        client, consultas, 'primary', max_concurrentes=concurrentes, estadisticas=estadisticas
+    )
+    return {
+        'concurrentes': concurrentes,
+        'estadisticas': estadisticas,
+        'segundos': time.perf_counter() - inicio,
+        'results': results,
+        'en_curso_maximo': client.en_curso_maximo,
+        'llamadas_estado': client.llamadas_estado
+    }
+
+def verificar(medicion: Dict[str, Any], latencias: List[float]) -> List[str]:
+    """
+    Verifica los resultados y el límite de concurrencia de una medición.
+
+    Args:
+        medicion (Dict[str, Any]): Resultado de medir
+        latencias (List[float]): Latencias usadas
+
+    Returns:
+        Lista de errores encontrados (vacía si todo está bien)
+    """
+    errores = []
+    results = medicion['results']
+    for i in range(len(latencias)):
+        if results.get(f"consulta_{i}") != (i,):
+            errores.append(f"consulta_{i}: se esperaba ({i},) y se obtuvo {results.get(f'consulta_{i}')!r}")
+    if not isinstance(results.get('consulta_con_error'), ejecutor_athena.ErrorConsultaAthena):
+        errores.append(f"consulta_con_error: se esperaba ErrorConsultaAthena y se obtuvo {results.get('consulta_con_error')!r}")
+    for i, latencia in enumerate(latencias):
+        esperado = {'bytes': int(latencia * 1000) * 1024 ** 2 // 1000, 'motor_ms': int(latencia * 1000)}
+        if medicion['estadisticas'].get(f"consulta_{i}") != esperado:
+            errores.append(f"consulta_{i}: estadísticas {medicion['estadisticas'].get(f'consulta_{i}')!r}, se esperaba {esperado!r}")
+    if medicion['en_curso_maximo'] > medicion['concurrentes']:
+        errores.append(f"{medicion['en_curso_maximo']} consultas en curso con límite {medicion['concurrentes']}")
+    return errores
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Verificación del ejecutor concurrente de Athena con un cliente simulado')
+    parser.add_argument('--latencias', type=float, nargs='+', default=[0.5, 1.0, 1.5, 2.0, 2.0, 2.5, 3.0, 3.0],
+                      help='Latencia en segundos de cada consulta simulada. Por defecto 8 consultas de 0,5 a 3 segundos.')
+    parser.add_argument('--concurrentes', type=int,
+                      help='Consultas en curso como máximo. Por defecto, una por consulta.')
+    parser.add_argument('--tolerancia', type=float, default=1.0,
+                      help='Segundos de más admitidos sobre la consulta más lenta. Por defecto es 1.')
+    args = parser.parse_args()
+
+    concurrentes = args.concurrentes or len(args.latencias) + 1
+    mediciones = [medir(args.latencias, 1), medir(args.latencias, concurrentes)]
+
+    errores = []
+    print("\n" + "=" * 70)
+    print("🏁 EJECUTOR CONCURRENTE DE ATHENA (CLIENTE SIMULADO)")
+    print("=" * 70)
+    for medicion in mediciones:
+        errores_medicion = verificar(medicion, args.latencias)
+        errores.extend(errores_medicion)
+        icono = '❌' if errores_medicion else '✅'
+        print(
+            f"  {icono} límite {medicion['concurrentes']:>3}: {medicion['segundos']:>6.2f} s  "
+            f"en curso máx. {medicion['en_curso_maximo']:>3}  consultas de estado {medicion['llamadas_estado']:>4}"
+        )
+
+    mas_lenta = max(args.latencias)
+    if concurrentes > len(args.latencias) and mediciones[1]['segundos'] > mas_lenta + args.tolerancia:
+        errores.append(
+            f"Tiempo total {mediciones[1]['segundos']:.2f} s mayor que la consulta más lenta "
+            f"({mas_lenta:.2f} s) más la tolerancia ({args.tolerancia:.2f} s)"
+        )
+    print(f"\n  Suma de latencias {sum(args.latencias):.2f} s, consulta más lenta {mas_lenta:.2f} s")
+    for error in errores:
+        print(f"  ❌ {error}")
+    print("=" * 70)
+    sys.exit(1 if errores else 0)
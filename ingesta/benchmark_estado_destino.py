@@ -0,0 +1,116 @@
+"""
+Verificación de que la ingesta retoma su estado desde el destino.
+
+En ECS cada ejecución arranca en un contenedor nuevo, con el directorio de pipelines vacío:
+las huellas de las tablas replace y los cursores de las incrementales solo existen en el
+destino (_dlt_pipeline_state). El script carga al DuckDB local desde el PostgreSQL origen
+configurado en .dlt/secrets.toml, borra el directorio de trabajo del pipeline (no el
+DuckDB, que queda fuera) y vuelve a cargar. Falla (código de salida 1) si la segunda
+ejecución no omite las tablas replace o si cambia la cantidad de filas de alguna tabla.
+
+Uso:
+    python benchmark_estado_destino.py
+    python benchmark_estado_destino.py --tables accounts subscription_payments --backend pyarrow
+"""
+import argparse
+import shutil
+import sys
+from typing import Any, Dict, List
+
+from benchmark_ingesta import reiniciar_destino
+from ingesta_datavision import BACKENDS, DEFAULT_TABLES, carga_datos, crear_pipeline
+
+def contar_filas_destino(tables: List[str]) -> Dict[str, int]:
+    """
+    Cuenta las filas de cada tabla en el DuckDB local.
+
+    Args:
+        tables (List[str]): Tablas a contar
+
+    Returns:
+        Dict con la cantidad de filas por tabla
+    """
+    pipeline = crear_pipeline('local', dev_mode=False)
+    with pipeline.sql_client() as client:
+        return {
+            table: client.execute_sql(f"SELECT COUNT(*) FROM {client.make_qualified_table_name(table)}")[0][0]
+            for table in tables
+        }
+
+def borrar_estado_local():
+    """
+    Borra el directorio de trabajo del pipeline como si la ingesta corriera en un contenedor nuevo.
+    """
+    shutil.rmtree(crear_pipeline('local', dev_mode=False).working_dir)
+
+def verificar_estado_destino(tables: List[str], backend: str) -> Dict[str, Any]:
+    """
+    Carga dos veces las tablas, borrando el estado local entre ambas ejecuciones.
+
+    Args:
+        tables (List[str]): Tablas a cargar
+        backend (str): Backend de extracción
+
+    Returns:
+        Dict con las filas de cada tabla después de cada ejecución, las tablas omitidas
+        en la segunda, los errores encontrados y el status ('OK' o 'ERROR')
+    """
+    reiniciar_destino()
+
+    print("🚀 Primera carga...")
+    carga_datos('local', None, tables, backend=backend, dev_mode=False)
+    filas_primera = contar_filas_destino(tables)
+
+    print("🧹 Borrando el directorio de trabajo del pipeline...")
+    borrar_estado_local()
+
+    print("🚀 Segunda carga sin estado local...")
+    resultado = carga_datos('local', None, tables, backend=backend, dev_mode=False)
+    filas_segunda = contar_filas_destino(tables)
+
+    errores = []
+    for table in tables:
+        if DEFAULT_TABLES[table]["strategy"] == "replace" and table not in resultado['tablas_omitidas']:
+            errores.append(f"{table}: la tabla replace no se omitió sin cambios en el origen")
+        if filas_segunda[table] != filas_primera[table]:
+            errores.append(f"{table}: {filas_primera[table]} filas después de la primera carga y {filas_segunda[table]} después de la segunda")
+
+    return {
+        'filas_primera': filas_primera,
+        'filas_segunda': filas_segunda,
+        'tablas_omitidas': resultado['tablas_omitidas'],
+        'errores': errores,
+        'status': 'ERROR' if errores else 'OK'
+    }
+
+def mostrar_resumen_estado(verificacion: Dict[str, Any]):
+    """
+    Muestra las filas por tabla en cada ejecución y el resultado de la verificación.
+
+    Args:
+        verificacion (Dict[str, Any]): Resultado de verificar_estado_destino
+    """
+    print("\n" + "=" * 60)
+    print("📋 RESUMEN DEL ESTADO DESDE EL DESTINO")
+    print("=" * 60)
+    print(f"{'Tabla':<28} {'1ª carga':>10} {'2ª carga':>10}  Omitida")
+    for table, filas in verificacion['filas_primera'].items():
+        omitida = "sí" if table in verificacion['tablas_omitidas'] else "no"
+        print(f"{table:<28} {filas:>10,} {verificacion['filas_segunda'][table]:>10,}  {omitida}")
+    for error in verificacion['errores']:
+        print(f"  ❌ {error}")
+    if verificacion['status'] == 'OK':
+        print("✅ La segunda carga retomó huellas y cursores desde el destino")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Verificación del estado de la ingesta restaurado desde el destino')
+    parser.add_argument('--tables', nargs='+', default=list(DEFAULT_TABLES.keys()),
+                      help='Tablas a cargar. Por defecto todas.')
+    parser.add_argument('--backend', choices=BACKENDS, default='sqlalchemy',
+                      help='Backend de extracción. Por defecto es sqlalchemy.')
+    args = parser.parse_args()
+
+    verificacion = verificar_estado_destino(args.tables, args.backend)
+    mostrar_resumen_estado(verificacion)
+    sys.exit(1 if verificacion['status'] == 'ERROR' else 0)
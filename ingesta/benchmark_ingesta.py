@@ -0,0 +1,249 @@
+"""
+Benchmark de la ingesta completa por factor de escala.
+
+Para cada escala (cantidad de cuentas) regenera el origen configurado en .dlt/secrets.toml
+con origen/datos_sinteticos_saas.py y, en un proceso separado, mide:
+- la carga full refresh de todas las tablas al DuckDB local
+- cada validación de calidad_de_datos
+- la carga incremental después de simular actividad sobre una fracción de las filas
+
+Cada fase se agrega como una línea del reporte JSON lines, de modo que se pueden
+comparar escalas, configuraciones (--workers, --backend) y versiones del código.
+
+ATENCIÓN: reemplaza las tablas del origen configurado. Usar solo contra un PostgreSQL local.
+
+Uso:
+    python benchmark_ingesta.py --escalas 1000 10000 100000
+    python benchmark_ingesta.py --escalas 100000 --workers 4 --backend pyarrow
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import calidad_de_datos
+from ingesta_datavision import BACKENDS, DEFAULT_TABLES, VALIDACIONES, carga_datos, crear_pipeline
+from metricas_ingesta import memoria_pico_mb
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'origen'))
+import datos_sinteticos_saas  # noqa: E402
+
+MARCA_RESULTADO = "RESULTADO_BENCHMARK "
+
+def reiniciar_destino():
+    """
+    Elimina el dataset local y el estado del pipeline para que la carga full refresh
+    y la incremental de cada escala partan de cero.
+    """
+    pipeline = crear_pipeline('local', dev_mode=False)
+    with pipeline.sql_client() as client:
+        if client.has_dataset():
+            client.drop_dataset()
+    pipeline.drop()
+
+def resumen_fase(fase: str, segundos: float, filas: int, extra: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Arma el registro de una fase del benchmark.
+
+    Args:
+        fase (str): Nombre de la fase
+        segundos (float): Duración de la fase
+        filas (int): Filas procesadas en la fase
+        extra (Dict[str, Any]): Campos adicionales
+
+    Returns:
+        Dict con el resumen de la fase
+    """
+    return {
+        'fase': fase,
+        'segundos': segundos,
+        'filas': filas,
+        'filas_por_segundo': filas / segundos if segundos > 0 else 0,
+        # Memoria pico del proceso hasta el fin de esta fase
+        'peak_rss_mb': memoria_pico_mb(),
+        **(extra or {})
+    }
+
+def ejecutar_escala(escala: int, workers: int, backend: str, actividad: float) -> Dict[str, Any]:
+    """
+    Mide full refresh, validaciones e incremental sobre el origen ya generado.
+
+    Se ejecuta dentro de un proceso hijo para que la memoria pico sea la de esta escala.
+
+    Args:
+        escala (int): Cantidad de cuentas generadas en el origen
+        workers (int): Workers de carga_datos
+        backend (str): Backend de extracción
+        actividad (float): Fracción de filas que cambian antes de la carga incremental
+
+    Returns:
+        Dict con las fases medidas
+    """
+    tables = list(DEFAULT_TABLES.keys())
+    fases = []
+    reiniciar_destino()
+
+    resultado = carga_datos('local', {table: True for table in tables}, tables, workers, backend=backend, dev_mode=False)
+    fases.append(resumen_fase(
+        'full_refresh',
+        resultado['tiempos_etapas']['total_s'],
+        resultado['metricas'][0]['rows'],
+        {'tiempos_etapas': resultado['tiempos_etapas']}
+    ))
+
+    # Las validaciones recorren las tablas recién cargadas
+    filas_cargadas = resultado['metricas'][0]['rows']
+    with calidad_de_datos.SesionValidacion('local') as sesion:
+        for nombre, funcion_validacion, _ in VALIDACIONES:
+            inicio = time.perf_counter()
+            results = funcion_validacion('local', tables, sesion)
+            errores = sum(1 for r in results.values() if r.get('status') == 'ERROR')
+            fases.append(resumen_fase(
+                f"validacion_{nombre.lower().replace(' ', '_')}",
+                time.perf_counter() - inicio,
+                filas_cargadas,
+                {'errores': errores}
+            ))
+
+    source_conn = calidad_de_datos.get_db_connection('local')
+    try:
+        cambios = datos_sinteticos_saas.simular_actividad(source_conn, actividad)
+    finally:
+        source_conn.close()
+
+    resultado = carga_datos('local', None, tables, workers, backend=backend, dev_mode=False)
+    fases.append(resumen_fase(
+        'incremental',
+        resultado['tiempos_etapas']['total_s'],
+        resultado['metricas'][0]['rows'],
+        {
+            'tiempos_etapas': resultado['tiempos_etapas'],
+            'filas_modificadas_origen': sum(cambios.values()),
+            'tablas_omitidas': resultado['tablas_omitidas']
+        }
+    ))
+
+    return {'escala': escala, 'fases': fases, 'status': 'OK'}
+
+def medir_escala(escala: int, workers: int, backend: str, actividad: float) -> Dict[str, Any]:
+    """
+    Ejecuta las mediciones de una escala en un proceso separado y recupera sus resultados.
+
+    Args:
+        escala (int): Cantidad de cuentas
+        workers (int): Workers de carga_datos
+        backend (str): Backend de extracción
+        actividad (float): Fracción de filas que cambian antes de la carga incremental
+
+    Returns:
+        Dict con los resultados de la escala o con el error
+    """
+    proceso = subprocess.run(
+        [
+            sys.executable, os.path.abspath(__file__), '--escala-hijo', str(escala),
+            '--workers', str(workers), '--backend', backend, '--actividad', str(actividad)
+        ],
+        capture_output=True,
+        text=True
+    )
+    for linea in proceso.stdout.splitlines():
+        if linea.startswith(MARCA_RESULTADO):
+            return json.loads(linea[len(MARCA_RESULTADO):])
+
+    error = proceso.stderr.strip().splitlines()
+    return {
+        'escala': escala,
+        'status': 'ERROR',
+        'error': error[-1] if error else f'El proceso terminó con código {proceso.returncode}'
+    }
+
+def guardar_reporte(results: List[Dict[str, Any]], ruta: str, configuracion: Dict[str, Any]):
+    """
+    Agrega una línea por escala y fase al reporte JSON lines.
+
+    Args:
+        results (List[Dict[str, Any]]): Resultados de medir_escala
+        ruta (str): Ruta del reporte
+        configuracion (Dict[str, Any]): Parámetros de la ejecución (workers, backend, actividad)
+    """
+    timestamp = datetime.now(timezone.utc).isoformat()
+    with open(ruta, 'a', encoding='utf-8') as archivo:
+        for result in results:
+            for fase in result.get('fases', []):
+                registro = {
+                    'timestamp': timestamp,
+                    **configuracion,
+                    'escala': result['escala'],
+                    'generacion_s': result.get('generacion_s'),
+                    **fase
+                }
+                archivo.write(json.dumps(registro, default=str) + "\n")
+
+def mostrar_resumen_benchmark(results: List[Dict[str, Any]]):
+    """
+    Muestra un resumen comparativo por escala y fase.
+
+    Args:
+        results (List[Dict[str, Any]]): Resultados de medir_escala
+    """
+    print("\n" + "=" * 90)
+    print("🏁 RESUMEN DEL BENCHMARK DE INGESTA")
+    print("=" * 90)
+
+    for result in results:
+        if result['status'] != 'OK':
+            print(f"  ❌ {result['escala']:,} cuentas: Error - {result.get('error', 'Desconocido')}")
+            continue
+        print(f"  📦 {result['escala']:,} cuentas (generación {result['generacion_s']:.1f}s)")
+        for fase in result['fases']:
+            print(
+                f"     {fase['fase']:<34} {fase['segundos']:>9.2f}s {fase['filas']:>13,} filas "
+                f"{fase['filas_por_segundo']:>12,.0f} filas/s  RSS pico {fase['peak_rss_mb']:>7.1f} MB"
+            )
+
+    print("=" * 90)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark de la ingesta por factor de escala')
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                      help='Cantidades de cuentas a generar en el origen. Por defecto 1.000, 10.000 y 100.000.')
+    parser.add_argument('--workers', type=int, default=1,
+                      help='Workers de carga_datos. Por defecto es 1.')
+    parser.add_argument('--backend', choices=BACKENDS, default='sqlalchemy',
+                      help='Backend de extracción. Por defecto es sqlalchemy.')
+    parser.add_argument('--actividad', type=float, default=0.01,
+                      help='Fracción de filas que cambian antes de la carga incremental. Por defecto es 0.01.')
+    parser.add_argument('--reporte', default='benchmark_ingesta.jsonl',
+                      help='Archivo JSON lines al que se agregan los resultados. Por defecto es benchmark_ingesta.jsonl.')
+    parser.add_argument('--escala-hijo', type=int,
+                      help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.escala_hijo:
+        # Proceso hijo: medir una única escala e imprimir el resultado
+        result = ejecutar_escala(args.escala_hijo, args.workers, args.backend, args.actividad)
+        print(MARCA_RESULTADO + json.dumps(result, default=str))
+    else:
+        results = []
+        for escala in args.escalas:
+            print(f"🧪 Generando origen con {escala:,} cuentas...")
+            inicio = time.perf_counter()
+            source_conn = calidad_de_datos.get_db_connection('local')
+            try:
+                datos_sinteticos_saas.generar_datos(source_conn, 'postgres', escala)
+            finally:
+                source_conn.close()
+            generacion_s = time.perf_counter() - inicio
+
+            print(f"⏱️ Midiendo ingesta con {escala:,} cuentas...")
+            result = medir_escala(escala, args.workers, args.backend, args.actividad)
+            result['generacion_s'] = generacion_s
+            results.append(result)
+
+        guardar_reporte(results, args.reporte, {'workers': args.workers, 'backend': args.backend, 'actividad': args.actividad})
+        mostrar_resumen_benchmark(results)
+        print(f"📄 Resultados agregados a {args.reporte}")
@@ -0,0 +1,205 @@
+"""
+Verificación de que la memoria de la ingesta no crece con el tamaño de la tabla.
+
+Para cada tamaño genera la tabla sintética de benchmark_backends.py en el PostgreSQL origen
+configurado en .dlt/secrets.toml y la carga a un DuckDB temporal en un proceso separado,
+con el presupuesto de memoria de ingesta_datavision.py (--memoria-mb). Mide la memoria pico
+(RSS) al terminar cada etapa y falla (código de salida 1) si el pico de la carga completa
+de la tabla más grande supera en más de --tolerancia al de la tabla más chica, o si supera
+el presupuesto.
+
+Uso:
+    python benchmark_memoria.py
+    python benchmark_memoria.py --filas 500000 2000000 8000000 --memoria-mb 256 --backend pyarrow
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+import dlt
+from dlt.sources.sql_database import sql_table
+
+import calidad_de_datos
+from benchmark_backends import TABLA_BENCHMARK, eliminar_tabla_benchmark, generar_tabla_benchmark
+from ingesta_datavision import BACKENDS, calcular_lotes_lectura, configurar_limites_memoria
+from metricas_ingesta import memoria_pico_mb
+
+MARCA_RESULTADO = "RESULTADO_BENCHMARK "
+
+def analizar_tabla_benchmark(env: str = 'local'):
+    """
+    Actualiza las estadísticas de la tabla del benchmark, que usa calcular_lotes_lectura.
+
+    Args:
+        env (str): Entorno de ejecución
+    """
+    source_conn = calidad_de_datos.get_db_connection(env)
+    source_conn.autocommit = True
+    try:
+        with source_conn.cursor() as cursor:
+            cursor.execute(f"ANALYZE {TABLA_BENCHMARK}")
+    finally:
+        source_conn.close()
+
+def ejecutar_tamano(filas: int, backend: str, memoria_mb: int) -> Dict[str, Any]:
+    """
+    Carga la tabla del benchmark con el presupuesto de memoria y mide el pico de cada etapa.
+
+    Se ejecuta dentro de un proceso hijo para que la memoria pico sea la de este tamaño.
+
+    Args:
+        filas (int): Cantidad de filas de la tabla
+        backend (str): Backend de extracción
+        memoria_mb (int): Presupuesto de memoria en MB
+
+    Returns:
+        Dict con el chunk_size usado y la memoria pico al terminar cada etapa
+    """
+    configurar_limites_memoria(memoria_mb, 1)
+    lote = calcular_lotes_lectura('local', [TABLA_BENCHMARK], backend, memoria_mb)[TABLA_BENCHMARK]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pipeline = dlt.pipeline(
+            pipeline_name='benchmark_memoria',
+            destination=dlt.destinations.duckdb(os.path.join(tmp_dir, 'destino.duckdb')),
+            dataset_name='benchmark',
+            pipelines_dir=tmp_dir,
+        )
+        resultado = {'filas': filas, 'chunk_size': lote['chunk_size'], 'backend': lote['backend'], 'inicio_mb': memoria_pico_mb()}
+
+        pipeline.extract(
+            sql_table(table=TABLA_BENCHMARK, backend=lote['backend'], chunk_size=lote['chunk_size']),
+            loader_file_format="parquet"
+        )
+        resultado['extract_mb'] = memoria_pico_mb()
+        pipeline.normalize()
+        resultado['normalize_mb'] = memoria_pico_mb()
+        pipeline.load()
+        resultado['load_mb'] = memoria_pico_mb()
+
+    resultado['status'] = 'OK'
+    return resultado
+
+def medir_tamano(filas: int, backend: str, memoria_mb: int) -> Dict[str, Any]:
+    """
+    Ejecuta la medición de un tamaño en un proceso separado y recupera sus resultados.
+
+    Args:
+        filas (int): Cantidad de filas de la tabla
+        backend (str): Backend de extracción
+        memoria_mb (int): Presupuesto de memoria en MB
+
+    Returns:
+        Dict con los resultados del tamaño o con el error
+    """
+    proceso = subprocess.run(
+        [
+            sys.executable, os.path.abspath(__file__), '--filas-hijo', str(filas),
+            '--backend', backend, '--memoria-mb', str(memoria_mb)
+        ],
+        capture_output=True,
+        text=True
+    )
+    for linea in proceso.stdout.splitlines():
+        if linea.startswith(MARCA_RESULTADO):
+            return json.loads(linea[len(MARCA_RESULTADO):])
+
+    error = proceso.stderr.strip().splitlines()
+    return {
+        'filas': filas,
+        'status': 'ERROR',
+        'error': error[-1] if error else f'El proceso terminó con código {proceso.returncode}'
+    }
+
+def verificar_memoria_acotada(results: List[Dict[str, Any]], tolerancia: float, memoria_mb: int) -> Dict[str, Any]:
+    """
+    Compara el pico de la carga completa de la tabla más grande con el de la más chica
+    y con el presupuesto de memoria.
+
+    Args:
+        results (List[Dict[str, Any]]): Resultados de medir_tamano, de menor a mayor tamaño
+        tolerancia (float): Crecimiento relativo máximo admitido (0.25 = 25%)
+        memoria_mb (int): Presupuesto de memoria en MB
+
+    Returns:
+        Dict con 'status' ('OK', 'ERROR' o 'WARNING' si no hay dos mediciones) y el crecimiento
+    """
+    medidos = [r for r in results if r['status'] == 'OK']
+    if len(medidos) < 2:
+        return {'status': 'WARNING', 'message': 'Se necesitan al menos dos tamaños medidos'}
+
+    menor, mayor = medidos[0], medidos[-1]
+    crecimiento = mayor['load_mb'] / menor['load_mb'] - 1
+    pico = max(r['load_mb'] for r in medidos)
+    return {
+        'status': 'OK' if crecimiento <= tolerancia and pico <= memoria_mb else 'ERROR',
+        'crecimiento': crecimiento,
+        'message': (
+            f"{menor['filas']:,} → {mayor['filas']:,} filas: memoria pico "
+            f"{menor['load_mb']:.1f} → {mayor['load_mb']:.1f} MB ({crecimiento:+.0%}, tolerancia {tolerancia:.0%}), "
+            f"presupuesto {memoria_mb} MB"
+        )
+    }
+
+def mostrar_resumen_memoria(results: List[Dict[str, Any]], verificacion: Dict[str, Any]):
+    """
+    Muestra la memoria pico por etapa de cada tamaño y el resultado de la verificación.
+
+    Args:
+        results (List[Dict[str, Any]]): Resultados de medir_tamano
+        verificacion (Dict[str, Any]): Resultado de verificar_memoria_acotada
+    """
+    print("\n" + "=" * 80)
+    print("🏁 MEMORIA PICO POR TAMAÑO DE TABLA")
+    print("=" * 80)
+
+    for result in results:
+        if result['status'] == 'OK':
+            print(
+                f"  📦 {result['filas']:>12,} filas  lotes de {result['chunk_size']:>7,} ({result['backend']})  "
+                f"extract {result['extract_mb']:>7.1f} MB  normalize {result['normalize_mb']:>7.1f} MB  "
+                f"load {result['load_mb']:>7.1f} MB"
+            )
+        else:
+            print(f"  ❌ {result['filas']:,} filas: Error - {result.get('error', 'Desconocido')}")
+
+    icono = {'OK': '✅', 'ERROR': '❌'}.get(verificacion['status'], '⚠️')
+    print(f"\n  {icono} {verificacion['message']}")
+    print("=" * 80)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Verificación de memoria acotada de la ingesta')
+    parser.add_argument('--filas', type=int, nargs='+', default=[250_000, 1_000_000, 4_000_000],
+                      help='Tamaños de la tabla sintética. Por defecto 250.000, 1.000.000 y 4.000.000.')
+    parser.add_argument('--backend', choices=BACKENDS, default='sqlalchemy',
+                      help='Backend de extracción. Por defecto es sqlalchemy.')
+    parser.add_argument('--memoria-mb', type=int, default=512,
+                      help='Presupuesto de memoria en MB. Por defecto es 512.')
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                      help='Crecimiento máximo admitido del pico entre el menor y el mayor tamaño. Por defecto es 0.25.')
+    parser.add_argument('--filas-hijo', type=int,
+                      help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filas_hijo:
+        # Proceso hijo: medir un único tamaño e imprimir el resultado
+        print(MARCA_RESULTADO + json.dumps(ejecutar_tamano(args.filas_hijo, args.backend, args.memoria_mb)))
+    else:
+        results = []
+        try:
+            for filas in sorted(args.filas):
+                print(f"🧪 Generando {filas:,} filas en {TABLA_BENCHMARK}...")
+                generar_tabla_benchmark(filas)
+                analizar_tabla_benchmark()
+                print(f"⏱️ Midiendo memoria con {filas:,} filas...")
+                results.append(medir_tamano(filas, args.backend, args.memoria_mb))
+        finally:
+            eliminar_tabla_benchmark()
+
+        verificacion = verificar_memoria_acotada(results, args.tolerancia, args.memoria_mb)
+        mostrar_resumen_memoria(results, verificacion)
+        sys.exit(1 if verificacion['status'] == 'ERROR' else 0)
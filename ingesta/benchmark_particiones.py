@@ -0,0 +1,188 @@
+"""
+Benchmark de bytes escaneados por las consultas de ventana de fact_rfm según el particionado.
+
+Para cada tabla con partition en DEFAULT_TABLES crea en Athena dos copias Iceberg de la
+tabla raw (CTAS): una sin particionar y otra con el particionado configurado. Sobre cada
+copia ejecuta la consulta de la ventana de 6 meses que usa fact_rfm y compara los bytes
+escaneados que informa Athena. Las copias se eliminan al terminar.
+
+Solo aplica a 'dev' y 'prod' (Athena): en DuckDB no hay particionado de Iceberg.
+
+Uso:
+    python benchmark_particiones.py --env dev
+    python benchmark_particiones.py --env dev --fecha-rfm 2024-01-01 --tables subscription_payments
+"""
+import argparse
+import tomllib
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from dlt.common.utils import uniq_id
+
+import calidad_de_datos
+from ingesta_datavision import DEFAULT_TABLES
+
+# Consultas de la ventana de 6 meses de fact_rfm (recency, frequency y monetary) sobre las tablas raw
+CONSULTAS_RFM = {
+    "subscription_payments": """
+        SELECT account_subscription_id, MAX(payment_date), COUNT(*), SUM(amount)
+        FROM {tabla}
+        WHERE payment_date >= date_add('month', -6, DATE '{fecha}') AND payment_date <= DATE '{fecha}'
+        GROUP BY account_subscription_id
+    """,
+    "account_premium_features": """
+        SELECT account_id, MAX(purchase_date), COUNT(*), SUM(amount_paid)
+        FROM {tabla}
+        WHERE purchase_date >= date_add('month', -6, DATE '{fecha}') AND purchase_date <= DATE '{fecha}'
+        GROUP BY account_id
+    """,
+    "contents": """
+        SELECT account_id, MAX(created_at), COUNT(*)
+        FROM {tabla}
+        WHERE created_at >= date_add('month', -6, DATE '{fecha}') AND created_at <= DATE '{fecha}'
+        GROUP BY account_id
+    """
+}
+
+def obtener_bucket_url() -> str:
+    """
+    Obtiene el bucket de datos del destino desde .dlt/secrets.toml.
+
+    Returns:
+        str: URL del bucket (s3://...)
+    """
+    with open('.dlt/secrets.toml', 'rb') as f:
+        config = tomllib.load(f)
+    return config['destination']['filesystem']['bucket_url'].rstrip('/')
+
+def ejecutar_consulta(dest_conn, query: str) -> int:
+    """
+    Ejecuta una consulta en Athena y devuelve los bytes que escaneó.
+
+    Args:
+        dest_conn: Conexión pyathena al destino
+        query (str): Consulta SQL
+
+    Returns:
+        int: Bytes escaneados según Athena
+    """
+    with dest_conn.cursor() as cursor:
+        cursor.execute(query)
+        cursor.fetchall()
+        return cursor.data_scanned_in_bytes or 0
+
+def crear_copia(dest_conn, dataset: str, table: str, copia: str, ubicacion: str, particion: Optional[List[str]]):
+    """
+    Crea una copia Iceberg de una tabla raw, con o sin particionado.
+
+    Args:
+        dest_conn: Conexión pyathena al destino
+        dataset (str): Base de datos de Glue
+        table (str): Tabla raw
+        copia (str): Nombre de la copia
+        ubicacion (str): Ubicación S3 de la copia
+        particion (List[str]): Transformaciones de partición de Iceberg o None
+    """
+    propiedades = ["table_type = 'ICEBERG'", f"location = '{ubicacion}'", "is_external = false"]
+    if particion:
+        propiedades.append("partitioning = ARRAY[" + ", ".join(f"'{p}'" for p in particion) + "]")
+    with dest_conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {dataset}.{copia} WITH ({', '.join(propiedades)}) "
+            f"AS SELECT * FROM {dataset}.{table}"
+        )
+
+def eliminar_copia(dest_conn, dataset: str, copia: str):
+    """
+    Elimina una copia creada por el benchmark (Athena borra también sus datos por ser Iceberg).
+
+    Args:
+        dest_conn: Conexión pyathena al destino
+        dataset (str): Base de datos de Glue
+        copia (str): Nombre de la copia
+    """
+    with dest_conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {dataset}.{copia}")
+
+def medir_tabla(dest_conn, env: str, table: str, fecha: str) -> Dict[str, Any]:
+    """
+    Compara los bytes escaneados por la consulta de ventana de una tabla sin y con particionado.
+
+    Args:
+        dest_conn: Conexión pyathena al destino
+        env (str): Entorno de ejecución ('dev' o 'prod')
+        table (str): Tabla raw
+        fecha (str): Fecha del cálculo RFM (yyyy-mm-dd)
+
+    Returns:
+        Dict con los bytes escaneados por cada variante y la reducción
+    """
+    dataset = calidad_de_datos.get_dataset_name(env)
+    bucket_url = obtener_bucket_url()
+    particion = DEFAULT_TABLES[table]["partition"]
+    variantes = {'sin_particion': None, 'con_particion': particion}
+
+    result = {'table': table, 'particion': particion, 'status': 'OK'}
+    for variante, spec in variantes.items():
+        copia = f"{table}__benchmark_{variante}"
+        eliminar_copia(dest_conn, dataset, copia)
+        try:
+            crear_copia(dest_conn, dataset, table, copia, f"{bucket_url}/{dataset}/{copia}_{uniq_id(6)}", spec)
+            query = CONSULTAS_RFM[table].format(tabla=f"{dataset}.{copia}", fecha=fecha)
+            result[f'bytes_{variante}'] = ejecutar_consulta(dest_conn, query)
+        finally:
+            eliminar_copia(dest_conn, dataset, copia)
+
+    sin, con = result['bytes_sin_particion'], result['bytes_con_particion']
+    result['reduccion'] = 1 - con / sin if sin else 0
+    return result
+
+def mostrar_resumen_particiones(results: List[Dict[str, Any]], fecha: str):
+    """
+    Muestra los bytes escaneados por tabla sin y con particionado.
+
+    Args:
+        results (List[Dict[str, Any]]): Resultados de medir_tabla
+        fecha (str): Fecha del cálculo RFM
+    """
+    print("\n" + "=" * 90)
+    print(f"🏁 BYTES ESCANEADOS POR LA VENTANA RFM DE 6 MESES HASTA {fecha}")
+    print("=" * 90)
+
+    for result in results:
+        if result['status'] == 'OK':
+            print(
+                f"  ✅ {result['table']:<26} sin partición {result['bytes_sin_particion'] / 1024 ** 2:>10.1f} MB  "
+                f"{', '.join(result['particion'])}: {result['bytes_con_particion'] / 1024 ** 2:>10.1f} MB  "
+                f"(-{result['reduccion']:.0%})"
+            )
+        else:
+            print(f"  ❌ {result['table']}: Error - {result.get('message', 'Desconocido')}")
+
+    print("=" * 90)
+
+if __name__ == "__main__":
+    tablas_particionadas = [table for table, spec in DEFAULT_TABLES.items() if spec.get("partition")]
+
+    parser = argparse.ArgumentParser(description='Benchmark de bytes escaneados según el particionado de las tablas raw')
+    parser.add_argument('--env', choices=['dev', 'prod'], default='dev',
+                      help='Entorno de ejecución (Athena). Por defecto es dev.')
+    parser.add_argument('--tables', nargs='+', choices=tablas_particionadas, default=tablas_particionadas,
+                      help='Tablas a medir. Por defecto todas las que tienen partition en DEFAULT_TABLES.')
+    parser.add_argument('--fecha-rfm', default=date.today().isoformat(),
+                      help='Fecha del cálculo RFM (yyyy-mm-dd). Por defecto es hoy.')
+    args = parser.parse_args()
+
+    dest_conn = calidad_de_datos.get_destination_connection(args.env)
+    results = []
+    try:
+        for table in args.tables:
+            print(f"⏱️ Midiendo {table}...")
+            try:
+                results.append(medir_tabla(dest_conn, args.env, table, args.fecha_rfm))
+            except Exception as e:
+                results.append({'table': table, 'status': 'ERROR', 'message': str(e)})
+    finally:
+        dest_conn.close()
+
+    mostrar_resumen_particiones(results, args.fecha_rfm)
@@ -1,28 +1,74 @@
+import dlt
 import psycopg2
 import duckdb
+import math
 import os
+import time
 from typing import Dict, List, Optional
 from dlt.common.pipeline import get_dlt_pipelines_dir
 import tomllib
 import yaml
+import boto3
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pyathena import connect
 from datetime import datetime, timedelta
 
-def get_db_connection(env: str = 'local'):
+import ejecutor_athena
+import mantenimiento_iceberg
+import reglas_calidad
+
+# Marcas de agua de la validación incremental: tabla del destino con una fila por tabla
+# validada y ejecución; la marca vigente de cada tabla es la última
+TABLA_MARCAS = "_validacion_marcas"
+
+# Modo aproximado (--aproximado):
+# - error estándar relativo de approx_distinct en Athena (mínimo admitido por Trino: 0.0040625)
+# - porcentaje de filas de la tabla hija muestreadas para estimar huérfanos
+# - fracción de filas estimadas con problemas a partir de la cual se repite la validación exacta
+# - z del intervalo de confianza informado (95%)
+ERROR_APROXIMADO = 0.005
+MUESTRA_PCT = 1.0
+UMBRAL_APROXIMADO = 0.02
+Z_CONFIANZA = 1.96
+
+# Reporte de duplicados: claves repetidas que se listan (las de más filas) y filas por lote
+# al escribir la lista completa de claves en parquet desde Athena
+TOP_DUPLICADOS = 20
+FILAS_POR_LOTE_PARQUET = 10000
+
+# Costo de Athena por TB escaneado (USD), para el resumen de costos
+USD_POR_TB = 5.0
+MENSAJE_SIN_PRESUPUESTO = 'Presupuesto de escaneo agotado'
+
+class PresupuestoEscaneoAgotado(Exception):
+    """Un chequeo se omitió porque su consulta no entra en el presupuesto de bytes escaneados."""
+
+def leer_secrets() -> Dict:
+    """
+    Lee la configuración de conexiones de .dlt/secrets.toml.
+    
+    Returns:
+        Dict con el contenido de secrets.toml
+    """
+    # Siempre usar secrets.toml
+    secrets_file = '.dlt/secrets.toml'
+    
+    with open(secrets_file, 'rb') as f:
+        return tomllib.load(f)
+
+def get_db_connection(env: str = 'local', config: Optional[Dict] = None):
     """
     Obtiene conexión a la base de datos origen según el entorno.
     
     Args:
         env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        config (Dict): Contenido de secrets.toml ya leído. Si es None, se lee el archivo.
         
     Returns:
         psycopg2.connection: Conexión a PostgreSQL
     """
-    # Siempre usar secrets.toml
-    secrets_file = '.dlt/secrets.toml'
-    
-    with open(secrets_file, 'rb') as f:
-        config = tomllib.load(f)
+    config = config or leer_secrets()
     
     db_config = config['sources']['sql_database']['credentials']
     
@@ -34,12 +80,13 @@ def get_db_connection(env: str = 'local'):
         port=db_config['port']
     )
 
-def get_destination_connection(env: str = 'local'):
+def get_destination_connection(env: str = 'local', config: Optional[Dict] = None):
     """
     Obtiene conexión al destino según el entorno.
     
     Args:
         env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        config (Dict): Contenido de secrets.toml ya leído. Si es None, se lee el archivo.
         
     Returns:
         Conexión al destino (duckdb para local, pyathena para dev/prod)
@@ -50,9 +97,7 @@ def get_destination_connection(env: str = 'local'):
         return duckdb.connect(db_path)
     else:
         # Para dev/prod usar pyathena
-        secrets_file = '.dlt/secrets.toml'
-        with open(secrets_file, 'rb') as f:
-            config = tomllib.load(f)
+        config = config or leer_secrets()
         
         athena_config = config['destination']['athena']
         athena_creds = config['destination']['athena']['credentials']
@@ -82,26 +127,6 @@ def get_dataset_name(env: str) -> str:
     else:  # prod
         return 'raw_datavision_prod'
 
-def execute_destination_query(env: str, dest_conn, query: str):
-    """
-    Ejecuta una consulta en el destino según el entorno.
-    
-    Args:
-        env (str): Entorno de ejecución
-        dest_conn: Conexión al destino
-        query (str): Consulta SQL a ejecutar
-        
-    Returns:
-        Resultado de la consulta
-    """
-    if env == 'local':
-        return dest_conn.execute(query).fetchone()
-    else:
-        # Para dev/prod usar pyathena
-        with dest_conn.cursor() as cursor:
-            cursor.execute(query)
-            return cursor.fetchone()
-
 def get_primary_keys_from_schema() -> Dict[str, str]:
     """
     Lee las claves primarias de las tablas desde el esquema YAML.
@@ -125,9 +150,476 @@ def get_primary_keys_from_schema() -> Dict[str, str]:
     
     return primary_keys
 
+class SesionValidacion:
+    """
+    Configuración, conexiones y metadatos compartidos por todas las validaciones de una ejecución.
+    
+    secrets.toml, el esquema YAML y las reglas de calidad (reglas_calidad.yaml) se leen una
+    vez, y las conexiones al origen y al destino se abren la primera vez que se usan y se
+    reutilizan hasta cerrar la sesión. En dev/prod, execute_destination_many envía varias
+    consultas a Athena a la vez (ver ejecutor_athena).
+    
+    Cada consulta a Athena registra en costos los bytes escaneados y el tiempo de motor bajo
+    una etiqueta. Con un presupuesto de bytes, las validaciones consultan presupuesto_restante
+    y omiten o reducen a metadatos los chequeos que no entran.
+    
+    Se usa como context manager:
+    
+        with SesionValidacion(env) as sesion:
+            validar_conteo_tablas(env, tables, sesion)
+            validar_freshness_tablas(env, tables, sesion)
+    """
+    
+    def __init__(
+        self,
+        env: str = 'local',
+        max_consultas: int = ejecutor_athena.MAX_CONSULTAS_CONCURRENTES,
+        athena_client=None,
+        presupuesto_bytes: Optional[int] = None
+    ):
+        """
+        Args:
+            env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+            max_consultas (int): Consultas en curso como máximo en Athena
+            athena_client: Cliente de Athena con la interfaz de boto3. Si es None, se crea
+                con las credenciales de secrets.toml en el primer uso.
+            presupuesto_bytes (int): Bytes que pueden escanear en Athena todas las consultas
+                de la sesión. Si es None no hay límite.
+        """
+        self.env = env
+        self.dataset_name = get_dataset_name(env)
+        self.config = leer_secrets()
+        self.max_consultas = max_consultas
+        self._athena_client = athena_client
+        self._source_conn = None
+        self._dest_conn = None
+        self._primary_keys = None
+        self._reglas = None
+        self._columnas_updated_at: Dict[str, bool] = {}
+        self._archivos_iceberg: Dict[str, Optional[Dict[str, int]]] = {}
+        self._bytes_s3: Dict[str, Optional[int]] = {}
+        self.presupuesto_bytes = presupuesto_bytes
+        # Etiqueta -> {'bytes', 'motor_ms', 'consultas'} de las consultas ejecutadas en Athena
+        self.costos: Dict[str, Dict[str, int]] = {}
+    
+    def __enter__(self) -> 'SesionValidacion':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    @property
+    def source_conn(self):
+        """Conexión al origen (PostgreSQL), abierta en el primer uso."""
+        if self._source_conn is None or self._source_conn.closed:
+            self._source_conn = get_db_connection(self.env, self.config)
+            # Solo lecturas: sin transacción abierta, un error en una consulta no invalida las siguientes
+            self._source_conn.autocommit = True
+        return self._source_conn
+    
+    @property
+    def dest_conn(self):
+        """Conexión al destino (DuckDB o Athena), abierta en el primer uso."""
+        if self._dest_conn is None:
+            self._dest_conn = get_destination_connection(self.env, self.config)
+        return self._dest_conn
+    
+    @property
+    def reglas(self) -> Dict[str, Dict]:
+        """Reglas de calidad por tabla (ver reglas_calidad), leídas una vez por sesión."""
+        if self._reglas is None:
+            self._reglas = reglas_calidad.cargar_reglas()
+        return self._reglas
+    
+    @property
+    def primary_keys(self) -> Dict[str, str]:
+        """Claves primarias del esquema YAML y de las reglas (tienen prioridad las reglas), leídas una vez por sesión."""
+        if self._primary_keys is None:
+            try:
+                self._primary_keys = get_primary_keys_from_schema()
+            except FileNotFoundError:
+                # Todavía no hubo cargas que exporten el esquema: alcanzan las reglas
+                self._primary_keys = {}
+            for table, regla in self.reglas.items():
+                if regla['clave_primaria']:
+                    self._primary_keys[table] = regla['clave_primaria']
+        return self._primary_keys
+    
+    @property
+    def fk_relations(self) -> Dict[str, Dict[str, str]]:
+        """Relaciones FK -> tabla padre por tabla, de las reglas."""
+        return reglas_calidad.relaciones_fk(self.reglas)
+    
+    def cliente_aws(self, servicio: str):
+        """
+        Crea un cliente boto3 con las credenciales de Athena de secrets.toml.
+        
+        Args:
+            servicio (str): Servicio de AWS ('athena', 'glue', 's3')
+            
+        Returns:
+            Cliente boto3. Sin access keys en secrets.toml se usan las del rol IAM.
+        """
+        athena_creds = self.config['destination']['athena']['credentials']
+        return boto3.client(
+            servicio,
+            aws_access_key_id=athena_creds.get('aws_access_key_id'),
+            aws_secret_access_key=athena_creds.get('aws_secret_access_key'),
+            region_name=athena_creds['region_name']
+        )
+    
+    @property
+    def athena_client(self):
+        """Cliente boto3 de Athena, creado en el primer uso."""
+        if self._athena_client is None:
+            self._athena_client = self.cliente_aws('athena')
+        return self._athena_client
+    
+    def registrar_costo(self, etiqueta: str, bytes_escaneados: Optional[int], motor_ms: Optional[int]):
+        """
+        Suma los bytes escaneados y el tiempo de motor de una consulta de Athena a su etiqueta.
+        
+        Args:
+            etiqueta (str): Chequeo al que se imputa la consulta (por ejemplo 'conteo:accounts')
+            bytes_escaneados (int): DataScannedInBytes de la consulta
+            motor_ms (int): EngineExecutionTimeInMillis de la consulta
+        """
+        costo = self.costos.setdefault(etiqueta, {'bytes': 0, 'motor_ms': 0, 'consultas': 0})
+        costo['bytes'] += bytes_escaneados or 0
+        costo['motor_ms'] += motor_ms or 0
+        costo['consultas'] += 1
+    
+    @property
+    def bytes_escaneados(self) -> int:
+        """Bytes escaneados en Athena por todas las consultas de la sesión."""
+        return sum(costo['bytes'] for costo in self.costos.values())
+    
+    @property
+    def presupuesto_restante(self) -> Optional[int]:
+        """Bytes que quedan del presupuesto, o None si no hay presupuesto (o estamos en local)."""
+        if self.presupuesto_bytes is None or self.env == 'local':
+            return None
+        return self.presupuesto_bytes - self.bytes_escaneados
+    
+    def presupuesto_agotado(self) -> bool:
+        """Indica si las consultas de la sesión ya escanearon todo el presupuesto."""
+        restante = self.presupuesto_restante
+        return restante is not None and restante <= 0
+    
+    def execute_destination(self, query: str, etiqueta: str = 'otras'):
+        """
+        Ejecuta una consulta en el destino con la conexión de la sesión y devuelve la primera fila.
+        
+        Args:
+            query (str): Consulta SQL a ejecutar
+            etiqueta (str): Chequeo al que se imputa el costo de la consulta en Athena
+            
+        Returns:
+            Primera fila del resultado
+        """
+        if self.env == 'local':
+            return self.dest_conn.execute(query).fetchone()
+        with self.dest_conn.cursor() as cursor:
+            cursor.execute(query)
+            self.registrar_costo(etiqueta, cursor.data_scanned_in_bytes, cursor.engine_execution_time_in_millis)
+            return cursor.fetchone()
+    
+    def execute_destination_all(self, query: str, etiqueta: str = 'otras') -> List[tuple]:
+        """
+        Ejecuta una consulta en el destino y devuelve todas las filas.
+        
+        Args:
+            query (str): Consulta SQL a ejecutar
+            etiqueta (str): Chequeo al que se imputa el costo de la consulta en Athena
+            
+        Returns:
+            Lista de filas
+        """
+        if self.env == 'local':
+            return self.dest_conn.execute(query).fetchall()
+        with self.dest_conn.cursor() as cursor:
+            cursor.execute(query)
+            self.registrar_costo(etiqueta, cursor.data_scanned_in_bytes, cursor.engine_execution_time_in_millis)
+            return cursor.fetchall()
+    
+    def execute_destination_many(
+        self,
+        consultas: Dict[str, str],
+        tiempos: Optional[Dict[str, float]] = None,
+        etiqueta: Optional[str] = None
+    ) -> Dict[str, object]:
+        """
+        Ejecuta varias consultas en el destino y devuelve la primera fila de cada una.
+        
+        En dev/prod las consultas se envían a Athena a la vez, hasta max_consultas en curso,
+        y el costo de cada una se registra con su clave como etiqueta. En local se ejecutan
+        de a una en DuckDB.
+        
+        Args:
+            consultas (Dict[str, str]): Clave -> consulta SQL
+            tiempos (Dict[str, float]): Si se pasa, se completa con los segundos de cada consulta
+            etiqueta (str): Chequeo al que se imputa el costo de todas las consultas. Si es None,
+                cada consulta se imputa a su clave.
+            
+        Returns:
+            Dict clave -> primera fila, o la excepción si la consulta falló
+        """
+        if self.env != 'local':
+            athena_config = self.config['destination']['athena']
+            estadisticas = {}
+            results = ejecutor_athena.ejecutar_consultas(
+                self.athena_client,
+                consultas,
+                athena_config['athena_work_group'],
+                athena_config['query_result_bucket'],
+                self.max_consultas,
+                tiempos,
+                estadisticas
+            )
+            for clave, estadisticas_consulta in estadisticas.items():
+                self.registrar_costo(etiqueta or clave, estadisticas_consulta['bytes'], estadisticas_consulta['motor_ms'])
+            return results
+        
+        results = {}
+        for clave, query in consultas.items():
+            inicio = time.perf_counter()
+            try:
+                results[clave] = self.execute_destination(query)
+            except Exception as e:
+                results[clave] = e
+            if tiempos is not None:
+                tiempos[clave] = time.perf_counter() - inicio
+        return results
+    
+    def archivos_iceberg(self, table: str) -> Optional[Dict[str, int]]:
+        """
+        Filas, bytes y archivos de borrado del snapshot actual de una tabla Iceberg de Athena ($files).
+        
+        Se consulta una vez por tabla y sesión, sin leer los archivos de datos.
+        
+        Args:
+            table (str): Tabla
+            
+        Returns:
+            Dict con 'filas', 'bytes' y 'archivos_borrado', o None si la tabla no es Iceberg o estamos en local
+        """
+        if self.env == 'local':
+            return None
+        if table not in self._archivos_iceberg:
+            try:
+                rows = self.execute_destination_all(
+                    f'SELECT content, COUNT(*), SUM(record_count), SUM(file_size_in_bytes) '
+                    f'FROM "{self.dataset_name}"."{table}$files" GROUP BY content',
+                    f"metadatos:{table}"
+                )
+                archivos = {'filas': 0, 'bytes': 0, 'archivos_borrado': 0}
+                for content, cantidad, filas, bytes_archivos in rows:
+                    if content == mantenimiento_iceberg.CONTENIDO_DATOS:
+                        archivos['filas'] += filas or 0
+                        archivos['bytes'] += bytes_archivos or 0
+                    else:
+                        # Archivos de borrado por posición y por igualdad
+                        archivos['archivos_borrado'] += cantidad
+                self._archivos_iceberg[table] = archivos
+            except Exception:
+                # No es una tabla Iceberg
+                self._archivos_iceberg[table] = None
+        return self._archivos_iceberg[table]
+    
+    def bytes_s3(self, table: str) -> Optional[int]:
+        """
+        Bytes de los objetos de S3 bajo la ubicación de una tabla en el catálogo de Glue.
+        
+        Es el tamaño de las tablas que no son Iceberg, que no tienen $files. Se lista una vez
+        por tabla y sesión.
+        
+        Args:
+            table (str): Tabla
+            
+        Returns:
+            Bytes de la tabla, o None si no se pueden leer (sin permisos o estamos en local)
+        """
+        if self.env == 'local':
+            return None
+        if table not in self._bytes_s3:
+            try:
+                ubicacion = self.cliente_aws('glue').get_table(
+                    DatabaseName=self.dataset_name, Name=table
+                )['Table']['StorageDescriptor']['Location']
+                bucket, _, prefijo = ubicacion.split('://', 1)[1].partition('/')
+                paginas = self.cliente_aws('s3').get_paginator('list_objects_v2').paginate(
+                    Bucket=bucket, Prefix=prefijo.rstrip('/') + '/'
+                )
+                self._bytes_s3[table] = sum(objeto['Size'] for pagina in paginas for objeto in pagina.get('Contents', []))
+            except Exception:
+                self._bytes_s3[table] = None
+        return self._bytes_s3[table]
+    
+    def tiene_updated_at(self, tables: List[str]) -> Dict[str, bool]:
+        """
+        Indica qué tablas del origen tienen columna updated_at, con una consulta para las que no están en caché.
+        
+        Args:
+            tables (List[str]): Tablas origen
+            
+        Returns:
+            Dict tabla -> True si tiene columna updated_at
+        """
+        pendientes = [table for table in tables if table not in self._columnas_updated_at]
+        if pendientes:
+            with self.source_conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT table_name
+                    FROM information_schema.columns
+                    WHERE column_name = 'updated_at' AND table_name = ANY(%s)
+                    """,
+                    (pendientes,)
+                )
+                con_updated_at = {row[0] for row in cursor.fetchall()}
+            for table in pendientes:
+                self._columnas_updated_at[table] = table in con_updated_at
+        return {table: self._columnas_updated_at[table] for table in tables}
+    
+    def close(self):
+        """Cierra las conexiones abiertas por la sesión."""
+        if self._source_conn is not None:
+            self._source_conn.close()
+            self._source_conn = None
+        if self._dest_conn is not None:
+            self._dest_conn.close()
+            self._dest_conn = None
+
+def entra_en_presupuesto(sesion: SesionValidacion, estimado: Optional[int], planificado: int = 0) -> bool:
+    """
+    Indica si una consulta entra en lo que queda del presupuesto de escaneo de la sesión.
+    
+    Args:
+        sesion (SesionValidacion): Sesión de validación
+        estimado (int): Bytes estimados de la consulta (None si no se pueden estimar)
+        planificado (int): Bytes estimados de las consultas ya aceptadas que todavía no se ejecutaron
+        
+    Returns:
+        bool: True si no hay presupuesto o si la consulta entra. Una consulta sin estimación no entra.
+    """
+    restante = sesion.presupuesto_restante
+    if restante is None:
+        return True
+    return estimado is not None and restante > 0 and planificado + estimado <= restante
+
+def omitir_por_presupuesto(results: Dict[str, Dict], table: str):
+    """
+    Registra como SKIP un chequeo de una tabla que no entra en el presupuesto de escaneo.
+    
+    Args:
+        results (Dict[str, Dict]): Resultados de la validación
+        table (str): Tabla
+    """
+    results[table] = {
+        'status': 'SKIP',
+        'message': MENSAJE_SIN_PRESUPUESTO
+    }
+    print(f"  ⏭️ {table}: {MENSAJE_SIN_PRESUPUESTO}")
+
+def adjuntar_costo(result: Dict, sesion: SesionValidacion, etiqueta: str):
+    """
+    Suma al resultado de un chequeo los bytes escaneados y el tiempo de motor de una etiqueta.
+    
+    Un chequeo que usa varias consultas (por ejemplo, el conteo de duplicados en la consulta
+    combinada y el listado de las claves) llama una vez por etiqueta.
+    
+    Args:
+        result (Dict): Resultado del chequeo
+        sesion (SesionValidacion): Sesión de validación
+        etiqueta (str): Etiqueta con la que se registraron las consultas del chequeo
+    """
+    if etiqueta in sesion.costos:
+        result['bytes_escaneados'] = result.get('bytes_escaneados', 0) + sesion.costos[etiqueta]['bytes']
+        result['motor_ms'] = result.get('motor_ms', 0) + sesion.costos[etiqueta]['motor_ms']
+
+def formatear_costo(result: Dict) -> str:
+    """
+    Texto con el costo en Athena de un chequeo para los resúmenes.
+    
+    Args:
+        result (Dict): Resultado con 'bytes_escaneados' y 'motor_ms' (ver adjuntar_costo)
+        
+    Returns:
+        str: ' [X MB, Y s de motor]', o '' si el chequeo no consultó Athena
+    """
+    if 'bytes_escaneados' not in result:
+        return ''
+    return f" [{result['bytes_escaneados'] / 1024 ** 2:.1f} MB, {result['motor_ms'] / 1000:.1f} s de motor]"
+
+def contar_filas_iceberg(sesion: SesionValidacion, table: str) -> Optional[int]:
+    """
+    Cuenta las filas de una tabla Iceberg de Athena con los record_count de sus archivos ($files).
+    
+    No lee los archivos de datos. Solo es exacto si no hay archivos de borrado pendientes
+    (las cargas con merge los agregan hasta la próxima compactación, ver mantenimiento_iceberg).
+    
+    Args:
+        sesion (SesionValidacion): Sesión de validación
+        table (str): Tabla
+        
+    Returns:
+        Cantidad de filas, o None si la tabla no es Iceberg, tiene archivos de borrado o estamos en local
+    """
+    archivos = sesion.archivos_iceberg(table)
+    if archivos is None or archivos['archivos_borrado']:
+        return None
+    return archivos['filas']
+
+def estimar_bytes_tabla(sesion: SesionValidacion, table: str) -> Optional[int]:
+    """
+    Cota superior de los bytes que escanea en Athena una consulta que recorre la tabla completa.
+    
+    Es el tamaño de los archivos de datos de la tabla Iceberg ($files) o, si no es Iceberg, el
+    de sus objetos en S3 (ver SesionValidacion.bytes_s3); Athena lee solo las columnas usadas
+    de cada archivo parquet, así que el escaneo real suele ser menor. La estimación solo sirve
+    para el presupuesto: sin presupuesto no se consultan los metadatos.
+    
+    Args:
+        sesion (SesionValidacion): Sesión de validación
+        table (str): Tabla
+        
+    Returns:
+        Bytes estimados, 0 sin presupuesto (o en local), o None si no se pueden estimar:
+        entra_en_presupuesto la trata como si no entrara
+    """
+    if sesion.presupuesto_restante is None:
+        return 0
+    archivos = sesion.archivos_iceberg(table)
+    return archivos['bytes'] if archivos else sesion.bytes_s3(table)
+
+def maximo_iceberg(sesion: SesionValidacion, table: str, column: str) -> Optional[datetime]:
+    """
+    Lee el máximo de una columna de una tabla Iceberg de Athena de las cotas superiores de sus archivos ($partitions).
+    
+    Como contar_filas_iceberg, solo es exacto sin archivos de borrado pendientes.
+    
+    Args:
+        sesion (SesionValidacion): Sesión de validación
+        table (str): Tabla
+        column (str): Columna
+        
+    Returns:
+        El máximo, o None si la tabla no es Iceberg, no tiene estadísticas de la columna o estamos en local
+    """
+    if contar_filas_iceberg(sesion, table) is None:
+        return None
+    try:
+        return sesion.execute_destination(
+            f'SELECT MAX(data.{column}.max) FROM "{sesion.dataset_name}"."{table}$partitions"',
+            f"metadatos:{table}"
+        )[0]
+    except Exception:
+        return None
+
 def validar_conteo_tablas(
     env: str = 'local',
-    tables: Optional[List[str]] = None
+    tables: Optional[List[str]] = None,
+    sesion: Optional[SesionValidacion] = None
 ) -> Dict[str, Dict]:
     """
     Valida el conteo de registros entre origen y destino.
@@ -135,6 +627,7 @@ def validar_conteo_tablas(
     Args:
         env (str): Entorno de ejecución ('local', 'dev' o 'prod')
         tables (List[str]): Lista de tablas a validar (las que se cargaron)
+        sesion (SesionValidacion): Sesión con las conexiones a reutilizar. Si es None, se abre una para esta validación.
         
     Returns:
         Dict con resultados de validación por tabla
@@ -147,29 +640,31 @@ def validar_conteo_tablas(
     
     print("🔍 Validando conteo de registros...")
     
-    # Conexión a origen
-    source_conn = get_db_connection(env)
-    
-    # Conexión a destino
-    dest_conn = get_destination_connection(env)
-    
-    # Determinar dataset name según el entorno
-    dataset_name = get_dataset_name(env)
+    propia = sesion is None
+    sesion = sesion or SesionValidacion(env)
+    dataset_name = sesion.dataset_name
     
     try:
         for table in tables:
             try:
                 # Conteo en origen
-                with source_conn.cursor() as cursor:
+                with sesion.source_conn.cursor() as cursor:
                     cursor.execute(f""" 
                         SELECT COUNT(*) FROM {table}
                     """)
                     source_count = cursor.fetchone()[0]
                 
-                # Conteo en destino
-                query = f"SELECT COUNT(*) FROM {dataset_name}.{table}"
-                result = execute_destination_query(env, dest_conn, query)
-                dest_count = result[0]
+                # Conteo en destino: de los metadatos de Iceberg si se puede, si no recorriendo la tabla
+                dest_count = contar_filas_iceberg(sesion, table)
+                fuente = 'metadatos'
+                if dest_count is None:
+                    if not entra_en_presupuesto(sesion, estimar_bytes_tabla(sesion, table)):
+                        omitir_por_presupuesto(results, table)
+                        continue
+                    query = f"SELECT COUNT(*) FROM {dataset_name}.{table}"
+                    result = sesion.execute_destination(query, f"conteo:{table}")
+                    dest_count = result[0]
+                    fuente = 'datos'
                 
                 difference = source_count - dest_count
                 status = 'OK' if source_count == dest_count else 'WARNING'
@@ -178,10 +673,12 @@ def validar_conteo_tablas(
                     'source_count': source_count,
                     'destination_count': dest_count,
                     'difference': difference,
-                    'status': status
+                    'status': status,
+                    'fuente': fuente
                 }
+                adjuntar_costo(results[table], sesion, f"conteo:{table}")
                 
-                print(f"  📊 {table}: Origen={source_count}, Destino={dest_count}")
+                print(f"  📊 {table}: Origen={source_count}, Destino={dest_count} ({fuente})")
                 
             except Exception as e:
                 results[table] = {
@@ -194,22 +691,54 @@ def validar_conteo_tablas(
                 print(f"  ❌ Error validando {table}: {e}")
     
     finally:
-        source_conn.close()
-        if dest_conn:
-            dest_conn.close()
+        if propia:
+            sesion.close()
     
     return results
 
+def evaluar_frescura(newest_update: Optional[datetime], cutoff_time: datetime) -> Dict:
+    """
+    Evalúa la fecha de actualización más reciente de una tabla contra el límite de frescura.
+    
+    Args:
+        newest_update (datetime): MAX(updated_at) de la tabla en el destino
+        cutoff_time (datetime): Fecha a partir de la cual los datos se consideran frescos
+        
+    Returns:
+        Dict con el resultado de frescura de la tabla
+    """
+    if newest_update is None:
+        status = 'WARNING'
+        message = 'No hay registros con updated_at'
+    elif newest_update > datetime.now():
+        status = 'WARNING'
+        message = f'Datos con fechas futuras (más reciente: {newest_update})'
+    elif newest_update > cutoff_time:
+        status = 'OK'
+        message = f'Datos actualizados (más reciente: {newest_update})'
+    else:
+        status = 'WARNING'
+        message = f'Datos desactualizados (más reciente: {newest_update})'
+    
+    return {
+        'newest_update': newest_update,
+        'cutoff_time': cutoff_time,
+        'status': status,
+        'message': message
+    }
+
 def validar_freshness_tablas(
     env: str = 'local',
-    tables: Optional[List[str]] = None
+    tables: Optional[List[str]] = None,
+    sesion: Optional[SesionValidacion] = None
 ) -> Dict[str, Dict]:
     """
-    Valida la frescura de los datos basándose en updated_at (48 horas fijo).
+    Valida la frescura de los datos basándose en updated_at, con el SLA de cada tabla en las reglas (frescura_horas).
     
     Args:
         env (str): Entorno de ejecución ('local', 'dev' o 'prod')
         tables (List[str]): Lista de tablas a validar
+        sesion (SesionValidacion): Sesión con las conexiones a reutilizar. Si es None, se abre una para esta validación.
         
     Returns:
         Dict con resultados de validación de frescura
@@ -219,34 +748,20 @@ def validar_freshness_tablas(
         return {}
     
     results = {}
-    max_hours = 48  # Fijo en 48 horas
-    cutoff_time = datetime.now() - timedelta(hours=max_hours)
-    
-    print(f"⏰ Validando frescura de datos (máximo {max_hours} horas)...")
     
-    # Conexión a origen para verificar esquema
-    source_conn = get_db_connection(env)
+    print("⏰ Validando frescura de datos (SLA de cada tabla)...")
     
-    # Conexión a destino
-    dest_conn = get_destination_connection(env)
-    
-    # Determinar dataset name según el entorno
-    dataset_name = get_dataset_name(env)
+    propia = sesion is None
+    sesion = sesion or SesionValidacion(env)
+    dataset_name = sesion.dataset_name
     
     try:
+        # Verificar qué tablas tienen updated_at consultando el esquema del origen
+        tablas_updated_at = sesion.tiene_updated_at(tables)
+        
         for table in tables:
             try:
-                # Verificar si la tabla tiene updated_at consultando el esquema
-                has_updated_at = False
-                with source_conn.cursor() as cursor:
-                    cursor.execute(f"""
-                        SELECT column_name 
-                        FROM information_schema.columns 
-                        WHERE table_name = '{table}' AND column_name = 'updated_at'
-                    """)
-                    has_updated_at = cursor.fetchone() is not None
-                
-                if not has_updated_at:
+                if not tablas_updated_at[table]:
                     results[table] = {
                         'status': 'SKIP',
                         'message': 'Tabla no tiene columna updated_at'
@@ -254,38 +769,29 @@ def validar_freshness_tablas(
                     print(f"  ⏭️ {table}: No tiene columna updated_at")
                     continue
                 
-                # Consultar el registro más reciente de la tabla
-                query = f"""
-                SELECT MAX(updated_at) 
-                FROM {dataset_name}.{table}
-                WHERE updated_at IS NOT NULL
-                """
-                
-                result = execute_destination_query(env, dest_conn, query)
-                newest_update = result[0]
-                
-                # Verificar si el más reciente está dentro del límite de 48 horas
+                # Consultar el registro más reciente: de los metadatos de Iceberg si se puede,
+                # si no recorriendo la tabla
+                newest_update = maximo_iceberg(sesion, table, 'updated_at')
+                fuente = 'metadatos'
                 if newest_update is None:
-                    status = 'WARNING'
-                    message = 'No hay registros con updated_at'
-                elif newest_update > datetime.now():
-                    status = 'WARNING'
-                    message = f'Datos con fechas futuras (más reciente: {newest_update})'
-                elif newest_update > cutoff_time:
-                    status = 'OK'
-                    message = f'Datos actualizados (más reciente: {newest_update})'
-                else:
-                    status = 'WARNING'
-                    message = f'Datos desactualizados (más reciente: {newest_update})'
-                
-                results[table] = {
-                    'newest_update': newest_update,
-                    'cutoff_time': cutoff_time,
-                    'status': status,
-                    'message': message
-                }
+                    if not entra_en_presupuesto(sesion, estimar_bytes_tabla(sesion, table)):
+                        omitir_por_presupuesto(results, table)
+                        continue
+                    query = f"""
+                    SELECT MAX(updated_at) 
+                    FROM {dataset_name}.{table}
+                    WHERE updated_at IS NOT NULL
+                    """
+                    
+                    result = sesion.execute_destination(query, f"frescura:{table}")
+                    newest_update = result[0]
+                    fuente = 'datos'
+                max_hours = reglas_calidad.regla_tabla(sesion.reglas, table)['frescura_horas']
+                results[table] = evaluar_frescura(newest_update, datetime.now() - timedelta(hours=max_hours))
+                results[table]['fuente'] = fuente
+                adjuntar_costo(results[table], sesion, f"frescura:{table}")
                 
-                print(f"  📅 {table}: {message}")
+                print(f"  📅 {table}: {results[table]['message']} ({fuente})")
                     
             except Exception as e:
                 results[table] = {
@@ -295,15 +801,109 @@ def validar_freshness_tablas(
                 print(f"  ❌ Error validando frescura de {table}: {e}")
     
     finally:
-        source_conn.close()
-        if dest_conn:
-            dest_conn.close()
+        if propia:
+            sesion.close()
     
     return results
 
+def escribir_duplicados_parquet(sesion: 'SesionValidacion', consulta: str, ruta: str, etiqueta: str = 'otras'):
+    """
+    Escribe en parquet el resultado de la consulta de claves repetidas sin cargarlo entero en memoria.
+    
+    En local DuckDB escribe el archivo directamente (COPY). En Athena las filas se leen de a
+    FILAS_POR_LOTE_PARQUET y cada lote se agrega al archivo.
+    
+    Args:
+        sesion (SesionValidacion): Sesión de validación
+        consulta (str): Consulta con las columnas clave y filas
+        ruta (str): Ruta del archivo parquet
+        etiqueta (str): Chequeo al que se imputa el costo de la consulta en Athena
+    """
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    if sesion.env == 'local':
+        sesion.dest_conn.execute(f"COPY ({consulta}) TO '{ruta}' (FORMAT PARQUET)")
+        return
+    
+    writer = None
+    try:
+        with sesion.dest_conn.cursor() as cursor:
+            cursor.execute(consulta)
+            sesion.registrar_costo(etiqueta, cursor.data_scanned_in_bytes, cursor.engine_execution_time_in_millis)
+            while True:
+                filas = cursor.fetchmany(FILAS_POR_LOTE_PARQUET)
+                if not filas:
+                    break
+                lote = pa.table({'clave': [fila[0] for fila in filas], 'filas': [fila[1] for fila in filas]})
+                if writer is None:
+                    writer = pq.ParquetWriter(ruta, lote.schema)
+                writer.write_table(lote)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def reportar_duplicados(
+    sesion: 'SesionValidacion',
+    table: str,
+    pk_column: str,
+    top_n: int = TOP_DUPLICADOS,
+    directorio_parquet: Optional[str] = None
+) -> Dict:
+    """
+    Cuenta las claves repetidas de una tabla en el destino y devuelve solo las top_n con más filas.
+    
+    Los totales se calculan en el motor con funciones de ventana sobre las claves repetidas,
+    de modo que a Python solo llegan top_n filas aunque una carga mala repita millones de
+    claves. Los NULL no se cuentan como clave repetida.
+    
+    Args:
+        sesion (SesionValidacion): Sesión de validación
+        table (str): Tabla
+        pk_column (str): Clave primaria
+        top_n (int): Claves repetidas a listar
+        directorio_parquet (str): Si se pasa y hay claves repetidas, se escribe la lista completa
+            en <directorio>/duplicados_<tabla>.parquet
+        
+    Returns:
+        Dict con duplicate_keys (claves repetidas), duplicate_count (filas sobrantes),
+        top_duplicates (lista de (clave, filas)), duplicate_ids (las claves del top) y
+        archivo (ruta del parquet o None)
+    """
+    repetidas = f"""
+        SELECT {pk_column} AS clave, COUNT(*) AS filas
+        FROM {sesion.dataset_name}.{table}
+        WHERE {pk_column} IS NOT NULL
+        GROUP BY {pk_column}
+        HAVING COUNT(*) > 1
+    """
+    etiqueta = f"duplicados:{table}"
+    rows = sesion.execute_destination_all(f"""
+        SELECT clave, filas, COUNT(*) OVER (), SUM(filas - 1) OVER ()
+        FROM ({repetidas}) r
+        ORDER BY filas DESC, clave
+        LIMIT {max(1, top_n)}
+    """, etiqueta)
+    
+    duplicate_keys = rows[0][2] if rows else 0
+    top_duplicates = [(row[0], row[1]) for row in rows[:top_n]]
+    archivo = None
+    if directorio_parquet and duplicate_keys:
+        archivo = os.path.join(directorio_parquet, f"duplicados_{table}.parquet")
+        escribir_duplicados_parquet(sesion, f"SELECT clave, filas FROM ({repetidas}) r", archivo, etiqueta)
+    
+    return {
+        'duplicate_keys': duplicate_keys,
+        'duplicate_count': rows[0][3] if rows else 0,
+        'top_duplicates': top_duplicates,
+        'duplicate_ids': [clave for clave, _ in top_duplicates],
+        'archivo': archivo
+    }
+
 def validar_duplicados_tablas(
     env: str = 'local',
-    tables: Optional[List[str]] = None
+    tables: Optional[List[str]] = None,
+    sesion: Optional[SesionValidacion] = None,
+    top_n: int = TOP_DUPLICADOS,
+    directorio_parquet: Optional[str] = None
 ) -> Dict[str, Dict]:
     """
     Valida duplicados por clave primaria en las tablas de destino.
@@ -314,6 +914,9 @@ def validar_duplicados_tablas(
     Args:
         env (str): Entorno de ejecución ('local', 'dev' o 'prod')
         tables (List[str]): Lista de tablas a validar
+        sesion (SesionValidacion): Sesión con las conexiones a reutilizar. Si es None, se abre una para esta validación.
+        top_n (int): Claves repetidas a listar por tabla (ver reportar_duplicados)
+        directorio_parquet (str): Directorio donde escribir la lista completa de claves repetidas. Si es None no se escribe.
         
     Returns:
         Dict con resultados de validación de duplicados por tabla
@@ -326,14 +929,9 @@ def validar_duplicados_tablas(
     
     print("🔍 Validando duplicados por clave primaria...")
     
-    # Obtener claves primarias del esquema
-    primary_keys = get_primary_keys_from_schema()
-    
-    # Conexión a destino
-    dest_conn = get_destination_connection(env)
-    
-    # Determinar dataset name según el entorno
-    dataset_name = get_dataset_name(env)
+    propia = sesion is None
+    sesion = sesion or SesionValidacion(env)
+    primary_keys = sesion.primary_keys
     
     try:
         for table in tables:
@@ -347,37 +945,20 @@ def validar_duplicados_tablas(
                     print(f"  ⏭️ {table}: No se encontró clave primaria en el esquema")
                     continue
                 
-                pk_column = primary_keys[table]
-                
-                # Consultar duplicados por clave primaria
-                query = f"""
-                SELECT {pk_column}, COUNT(*) as count
-                FROM {dataset_name}.{table}
-                GROUP BY {pk_column}
-                HAVING COUNT(*) > 1
-                """
+                if not entra_en_presupuesto(sesion, estimar_bytes_tabla(sesion, table)):
+                    omitir_por_presupuesto(results, table)
+                    continue
                 
-                result = execute_destination_query(env, dest_conn, query)
+                pk_column = primary_keys[table]
+                results[table] = reportar_duplicados(sesion, table, pk_column, top_n, directorio_parquet)
+                adjuntar_costo(results[table], sesion, f"duplicados:{table}")
                 
-                if result is None or len(result) == 0:
-                    # No hay duplicados
-                    results[table] = {
-                        'duplicate_count': 0,
-                        'duplicate_ids': [],
-                        'status': 'OK'
-                    }
+                if results[table]['duplicate_keys'] == 0:
+                    results[table]['status'] = 'OK'
                     print(f"  ✅ {table}: Sin duplicados por {pk_column}")
                 else:
-                    # Hay duplicados
-                    duplicate_count = len(result)
-                    duplicate_ids = [row[0] for row in result]
-                    
-                    results[table] = {
-                        'duplicate_count': duplicate_count,
-                        'duplicate_ids': duplicate_ids,
-                        'status': 'WARNING'
-                    }
-                    print(f"  ⚠️ {table}: {duplicate_count} duplicados por {pk_column}")
+                    results[table]['status'] = 'WARNING'
+                    print(f"  ⚠️ {table}: {results[table]['duplicate_keys']} claves repetidas por {pk_column}")
                     
             except Exception as e:
                 results[table] = {
@@ -387,14 +968,15 @@ def validar_duplicados_tablas(
                 print(f"  ❌ Error validando duplicados en {table}: {e}")
     
     finally:
-        if dest_conn:
-            dest_conn.close()
+        if propia:
+            sesion.close()
     
     return results
 
 def validar_integridad_referencial_tablas(
     env: str = 'local',
-    tables: Optional[List[str]] = None
+    tables: Optional[List[str]] = None,
+    sesion: Optional[SesionValidacion] = None
 ) -> Dict[str, Dict]:
     """
     Valida la integridad referencial en las tablas de destino.
@@ -405,6 +987,7 @@ def validar_integridad_referencial_tablas(
     Args:
         env (str): Entorno de ejecución ('local', 'dev' o 'prod')
         tables (List[str]): Lista de tablas a validar
+        sesion (SesionValidacion): Sesión con las conexiones a reutilizar. Si es None, se abre una para esta validación.
         
     Returns:
         Dict con resultados de validación de integridad referencial por tabla
@@ -413,88 +996,1041 @@ def validar_integridad_referencial_tablas(
         print("⚠️ No se especificaron tablas para validar")
         return {}
     
-    # Configuración manual de relaciones FK -> tabla_padre
-    FK_RELATIONS = {
-        "contents": {
-            "account_id": "accounts"
-        },
-        "content_attributes": {
-            "content_id": "contents"
-        },
-        "accounts_subscription": {
-            "account_id": "accounts",
-            "subscription_id": "subscriptions"
+    results = {}
+    
+    print("🔗 Validando integridad referencial (una consulta por tabla padre)...")
+    
+    propia = sesion is None
+    sesion = sesion or SesionValidacion(env)
+    fk_relations = sesion.fk_relations
+    
+    try:
+        # Todas las FKs que referencian a una misma tabla padre se revisan en una sola consulta
+        consultas_fk = construir_consultas_integridad(
+            sesion.dataset_name, tables, fk_relations, sesion.primary_keys, env
+        )
+        errores_fk = {}
+        omitir_integridad_sin_presupuesto(sesion, consultas_fk, fk_relations, tables, errores_fk)
+        filas = sesion.execute_destination_many(
+            {f"integridad:{parent_table}": query for parent_table, (query, _) in consultas_fk.items()}
+        )
+        valores_tabla = {table: {} for table in tables}
+        repartir_integridad(filas, consultas_fk, valores_tabla, errores_fk)
+        
+        for table in tables:
+            results[table] = resultado_integridad(table, fk_relations, valores_tabla[table], errores_fk)
+            if 'status' in results[table]:
+                print(f"  ⏭️ {table}: No hay relaciones definidas")
+                continue
+            adjuntar_costo_integridad(results[table], sesion)
+            for fk_column, fk_result in results[table].items():
+                if fk_result['status'] == 'ERROR':
+                    print(f"  ❌ Error validando integridad {table}.{fk_column}: {fk_result['error']}")
+                elif fk_result['status'] == 'SKIP':
+                    print(f"  ⏭️ {table}.{fk_column}: {fk_result['message']}")
+                else:
+                    print(f"  🔗 {table}.{fk_column} -> {fk_result['parent_table']}: {fk_result['orphan_count']} huérfanos")
+    
+    finally:
+        if propia:
+            sesion.close()
+    
+    return results
+
+def omitir_integridad_sin_presupuesto(
+    sesion: SesionValidacion,
+    consultas_fk: Dict[str, tuple],
+    fk_relations: Dict[str, Dict[str, str]],
+    tables: List[str],
+    errores_fk: Dict[tuple, Exception],
+    planificado: int = 0
+) -> int:
+    """
+    Quita de consultas_fk las tablas padre cuya consulta no entra en el presupuesto de escaneo.
+    
+    La consulta de una tabla padre recorre la tabla padre y todas sus hijas; se estima con el
+    tamaño de todas ellas. Las FKs de las consultas quitadas se marcan en errores_fk con
+    PresupuestoEscaneoAgotado, que resultado_integridad informa como SKIP.
+    
+    Args:
+        sesion (SesionValidacion): Sesión de validación
+        consultas_fk (Dict[str, tuple]): Tabla padre -> (consulta, columnas), se modifica
+        fk_relations (Dict[str, Dict[str, str]]): Relaciones FK -> tabla padre por tabla
+        tables (List[str]): Tablas validadas
+        errores_fk (Dict[tuple, Exception]): (tabla, FK) -> error, se completa
+        planificado (int): Bytes estimados de otras consultas ya aceptadas que todavía no se ejecutaron
+        
+    Returns:
+        int: planificado más los bytes estimados de las consultas que quedaron
+    """
+    por_padre = reglas_calidad.agrupar_por_padre(fk_relations, tables)
+    for parent_table in list(consultas_fk):
+        hijas = {child for child, _ in por_padre.get(parent_table, [])}
+        estimados = [estimar_bytes_tabla(sesion, table) for table in {parent_table} | hijas]
+        estimado = None if None in estimados else sum(estimados)
+        if entra_en_presupuesto(sesion, estimado, planificado):
+            planificado += estimado
+            continue
+        del consultas_fk[parent_table]
+        for child, fk_column in por_padre.get(parent_table, []):
+            errores_fk[(child, fk_column)] = PresupuestoEscaneoAgotado(MENSAJE_SIN_PRESUPUESTO)
+    return planificado
+
+def resultado_integridad(
+    table: str,
+    fk_relations: Dict[str, Dict[str, str]],
+    valores: Dict,
+    errores_fk: Dict[tuple, Exception]
+) -> Dict:
+    """
+    Arma el resultado de integridad referencial de una tabla a partir de los valores repartidos.
+    
+    Args:
+        table (str): Tabla
+        fk_relations (Dict[str, Dict[str, str]]): Relaciones FK -> tabla padre por tabla
+        valores (Dict): Valores de la tabla con las columnas 'orphan_count:<fk>' (ver repartir_integridad)
+        errores_fk (Dict[tuple, Exception]): (tabla, FK) -> error de la consulta de su tabla padre
+            (PresupuestoEscaneoAgotado si la consulta se omitió por el presupuesto)
+        
+    Returns:
+        Dict FK -> resultado, o un resultado SKIP si la tabla no tiene FKs
+    """
+    if table not in fk_relations:
+        return {
+            'status': 'SKIP',
+            'message': f'No hay relaciones de integridad definidas para {table}'
         }
-    }
+    
+    table_results = {}
+    for fk_column, parent_table in fk_relations[table].items():
+        if isinstance(errores_fk.get((table, fk_column)), PresupuestoEscaneoAgotado):
+            table_results[fk_column] = {
+                'parent_table': parent_table,
+                'status': 'SKIP',
+                'message': str(errores_fk[(table, fk_column)])
+            }
+            continue
+        if (table, fk_column) in errores_fk:
+            table_results[fk_column] = {
+                'parent_table': parent_table,
+                'status': 'ERROR',
+                'error': str(errores_fk[(table, fk_column)])
+            }
+            continue
+        orphan_count = valores[f"orphan_count:{fk_column}"]
+        table_results[fk_column] = {
+            'parent_table': parent_table,
+            'orphan_count': orphan_count,
+            'status': 'OK' if orphan_count == 0 else 'WARNING'
+        }
+        if f"interval:orphan_count:{fk_column}" in valores:
+            table_results[fk_column]['intervalo'] = valores[f"interval:orphan_count:{fk_column}"]
+    return table_results
+
+def adjuntar_costo_integridad(table_results: Dict, sesion: SesionValidacion):
+    """
+    Agrega a cada FK de una tabla el costo de la consulta de su tabla padre.
+    
+    La consulta de una tabla padre revisa a la vez todas las FKs que la referencian, así que
+    las FKs hacia un mismo padre muestran el mismo costo.
+    
+    Args:
+        table_results (Dict): Resultado de integridad de la tabla (ver resultado_integridad)
+        sesion (SesionValidacion): Sesión de validación
+    """
+    if 'status' in table_results:
+        return
+    for fk_result in table_results.values():
+        if fk_result['status'] != 'SKIP':
+            adjuntar_costo(fk_result, sesion, f"integridad:{fk_result['parent_table']}")
+
+def validar_valores_aceptados_tablas(
+    env: str = 'local',
+    tables: Optional[List[str]] = None,
+    sesion: Optional[SesionValidacion] = None
+) -> Dict[str, Dict]:
+    """
+    Valida que las columnas con valores_aceptados en las reglas solo tengan esos valores.
+    
+    Todas las columnas de una tabla se revisan en una sola consulta.
+    
+    Args:
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        tables (List[str]): Lista de tablas a validar
+        sesion (SesionValidacion): Sesión con las conexiones a reutilizar. Si es None, se abre una para esta validación.
+        
+    Returns:
+        Dict con resultados de validación de valores aceptados por tabla
+    """
+    if tables is None:
+        print("⚠️ No se especificaron tablas para validar")
+        return {}
     
     results = {}
     
-    print("🔗 Validando integridad referencial...")
+    print("🏷️ Validando valores aceptados...")
+    
+    propia = sesion is None
+    sesion = sesion or SesionValidacion(env)
+    
+    try:
+        consultas = {}
+        columnas_consulta = {}
+        # Bytes estimados de las consultas ya aceptadas, que se envían juntas al final
+        planificado = 0
+        for table in tables:
+            valores_aceptados = reglas_calidad.regla_tabla(sesion.reglas, table)['valores_aceptados']
+            if not valores_aceptados:
+                results[table] = resultado_valores_aceptados(table, valores_aceptados, {})
+                print(f"  ⏭️ {table}: No hay valores aceptados definidos")
+                continue
+            estimado = estimar_bytes_tabla(sesion, table)
+            if not entra_en_presupuesto(sesion, estimado, planificado):
+                omitir_por_presupuesto(results, table)
+                continue
+            planificado += estimado
+            columnas_consulta[table], agregados = agregados_valores_aceptados(valores_aceptados)
+            consultas[f"valores:{table}"] = f"SELECT {', '.join(agregados)} FROM {sesion.dataset_name}.{table} t"
+        
+        filas = sesion.execute_destination_many(consultas)
+        for table in columnas_consulta:
+            fila = filas[f"valores:{table}"]
+            if isinstance(fila, Exception):
+                results[table] = {'status': 'ERROR', 'error': str(fila)}
+                print(f"  ❌ Error validando valores aceptados en {table}: {fila}")
+                continue
+            valores = dict(zip(columnas_consulta[table], fila))
+            valores_aceptados = reglas_calidad.regla_tabla(sesion.reglas, table)['valores_aceptados']
+            results[table] = resultado_valores_aceptados(table, valores_aceptados, valores)
+            for column, column_result in results[table].items():
+                adjuntar_costo(column_result, sesion, f"valores:{table}")
+                print(f"  🏷️ {table}.{column}: {column_result['invalid_count']} filas con valores no aceptados")
+    
+    finally:
+        if propia:
+            sesion.close()
+    
+    return results
+
+def agregados_valores_aceptados(valores_aceptados: Dict[str, List], nueva: str = "1 = 1") -> tuple:
+    """
+    Agregados SQL que cuentan, por columna, las filas con valores no aceptados.
+    
+    Args:
+        valores_aceptados (Dict[str, List]): Columna -> valores aceptados
+        nueva (str): Condición de las filas a revisar (en la validación incremental, las nuevas)
+        
+    Returns:
+        Tupla (columnas, agregados) con nombres 'invalid_count:<columna>'
+    """
+    columnas = []
+    agregados = []
+    for column, valores in valores_aceptados.items():
+        columnas.append(f"invalid_count:{column}")
+        agregados.append(
+            f"COALESCE(SUM(CASE WHEN {nueva} AND {reglas_calidad.condicion_valor_no_aceptado('t', column, valores)} "
+            f"THEN 1 ELSE 0 END), 0)"
+        )
+    return columnas, agregados
+
+def resultado_valores_aceptados(table: str, valores_aceptados: Dict[str, List], valores: Dict) -> Dict:
+    """
+    Arma el resultado de valores aceptados de una tabla.
+    
+    Args:
+        table (str): Tabla
+        valores_aceptados (Dict[str, List]): Columna -> valores aceptados de las reglas
+        valores (Dict): Valores de la consulta con las columnas 'invalid_count:<columna>'
+        
+    Returns:
+        Dict columna -> resultado, o un resultado SKIP si la tabla no tiene valores aceptados
+    """
+    if not valores_aceptados:
+        return {
+            'status': 'SKIP',
+            'message': f'No hay valores aceptados definidos para {table}'
+        }
+    return {
+        column: {
+            'accepted_values': aceptados,
+            'invalid_count': valores[f"invalid_count:{column}"],
+            'status': 'OK' if valores[f"invalid_count:{column}"] == 0 else 'WARNING'
+        }
+        for column, aceptados in valores_aceptados.items()
+    }
+
+def construir_consulta_combinada(
+    dataset_name: str,
+    table: str,
+    pk_column: Optional[str],
+    has_updated_at: bool,
+    valores_aceptados: Optional[Dict[str, List]] = None,
+    marca: Optional[str] = None,
+    contar: bool = True
+) -> tuple:
+    """
+    Arma una única consulta de agregación con todas las reglas propias de una tabla en el destino.
+    
+    Conteo, duplicados, frescura y valores aceptados comparten la recorrida de la tabla. Las
+    FKs se revisan aparte, agrupadas por tabla padre (ver construir_consultas_integridad).
+    
+    Con una marca (el último _dlt_load_id validado) la consulta solo recorre la porción nueva:
+    las filas cargadas después de la marca más las demás filas con sus mismas claves, que es
+    donde pueden aparecer duplicados nuevos. La frescura y los valores aceptados se calculan
+    sobre las filas nuevas; el conteo sigue siendo el de la tabla completa.
+    
+    Args:
+        dataset_name (str): Dataset del destino
+        table (str): Tabla a validar
+        pk_column (str): Clave primaria de la tabla, o None si no tiene
+        has_updated_at (bool): Si la tabla tiene columna updated_at
+        valores_aceptados (Dict[str, List]): Columna -> valores aceptados de las reglas
+        marca (str): _dlt_load_id de la última validación. Si es None, se valida la tabla completa.
+        contar (bool): Si es False, la consulta incremental no cuenta las filas de la tabla
+            (el conteo ya se obtuvo de los metadatos de Iceberg)
+        
+    Returns:
+        Tupla (consulta, columnas) con el nombre de cada columna del resultado en orden
+    """
+    tabla_sql = f"{dataset_name}.{table}"
+    # Condición de fila nueva: en la validación completa, todas las filas
+    nueva = f"t._dlt_load_id > '{marca}'" if marca else "1 = 1"
+    
+    columnas = ['destination_count', 'load_id']
+    if marca:
+        agregados = [f"(SELECT COUNT(*) FROM {tabla_sql})", f"(SELECT MAX(_dlt_load_id) FROM {tabla_sql})"]
+        if not contar:
+            columnas, agregados = columnas[1:], agregados[1:]
+    else:
+        agregados = ["COUNT(*)", "MAX(t._dlt_load_id)"]
+    
+    if pk_column:
+        # Filas con clave menos claves distintas: filas sobrantes por claves repetidas
+        columnas.append('duplicate_count')
+        agregados.append(f"COUNT(t.{pk_column}) - COUNT(DISTINCT t.{pk_column})")
     
-    # Obtener claves primarias del esquema
-    primary_keys = get_primary_keys_from_schema()
+    if has_updated_at:
+        columnas.append('newest_update')
+        agregados.append(f"MAX(CASE WHEN {nueva} THEN t.updated_at END)")
     
-    # Conexión a destino
-    dest_conn = get_destination_connection(env)
+    columnas_valores, agregados_valores = agregados_valores_aceptados(valores_aceptados or {}, nueva)
+    columnas.extend(columnas_valores)
+    agregados.extend(agregados_valores)
     
-    # Determinar dataset name según el entorno
-    dataset_name = get_dataset_name(env)
+    filtro = ""
+    if marca and pk_column:
+        filtro = f"WHERE t.{pk_column} IN (SELECT {pk_column} FROM {tabla_sql} WHERE _dlt_load_id > '{marca}')"
+    elif marca:
+        filtro = f"WHERE {nueva}"
     
+    query = f"""
+    SELECT {', '.join(agregados)}
+    FROM {tabla_sql} t
+    {filtro}
+    """
+    return query, columnas
+
+def construir_consulta_aproximada(
+    dataset_name: str,
+    table: str,
+    pk_column: Optional[str],
+    has_updated_at: bool,
+    valores_aceptados: Optional[Dict[str, List]],
+    env: str,
+    error: float = ERROR_APROXIMADO
+) -> tuple:
+    """
+    Arma la consulta combinada del modo aproximado de una tabla.
+    
+    Las claves distintas se estiman con approx_distinct (HyperLogLog). El conteo,
+    MAX(updated_at) y los valores aceptados siguen siendo exactos porque no agregan costo a la
+    recorrida. Los huérfanos se estiman aparte sobre una muestra (ver construir_consultas_integridad).
+    En local (DuckDB) las claves distintas se cuentan de forma exacta: la tabla es chica y
+    approx_count_distinct no permite fijar el error.
+    
+    Args:
+        dataset_name (str): Dataset del destino
+        table (str): Tabla a validar
+        pk_column (str): Clave primaria de la tabla, o None si no tiene
+        has_updated_at (bool): Si la tabla tiene columna updated_at
+        valores_aceptados (Dict[str, List]): Columna -> valores aceptados de las reglas
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        error (float): Error estándar relativo de approx_distinct
+        
+    Returns:
+        Tupla (consulta, columnas) con el nombre de cada columna del resultado en orden
+    """
+    tabla_sql = f"{dataset_name}.{table}"
+    columnas = ['destination_count', 'load_id']
+    agregados = ["COUNT(*)", "MAX(t._dlt_load_id)"]
+    
+    if pk_column:
+        columnas.extend(['key_count', 'distinct_estimate'])
+        agregados.append(f"COUNT(t.{pk_column})")
+        if env == 'local':
+            agregados.append(f"COUNT(DISTINCT t.{pk_column})")
+        else:
+            agregados.append(f"approx_distinct(t.{pk_column}, {error})")
+    
+    if has_updated_at:
+        columnas.append('newest_update')
+        agregados.append("MAX(t.updated_at)")
+    
+    columnas_valores, agregados_valores = agregados_valores_aceptados(valores_aceptados or {})
+    columnas.extend(columnas_valores)
+    agregados.extend(agregados_valores)
+    
+    query = f"""
+    SELECT {', '.join(agregados)}
+    FROM {tabla_sql} t
+    """
+    return query, columnas
+
+def construir_consultas_integridad(
+    dataset_name: str,
+    tables: List[str],
+    fk_relations: Dict[str, Dict[str, str]],
+    primary_keys: Dict[str, str],
+    env: str = 'local',
+    marcas: Optional[Dict[str, str]] = None,
+    muestreadas: frozenset = frozenset(),
+    muestra_pct: float = MUESTRA_PCT
+) -> Dict[str, tuple]:
+    """
+    Arma una consulta por tabla padre con las FKs de todas las tablas hijas que la referencian.
+    
+    Las columnas FK de las hijas se apilan con UNION ALL, etiquetadas con el número de
+    referencia, y se cruzan una sola vez con las claves distintas de la tabla padre: la tabla
+    padre se lee una vez sin importar cuántas FKs la referencian y de cada hija solo se lee
+    la columna FK. El LEFT JOIN contra claves distintas no multiplica filas.
+    
+    - Las hijas con marca (último _dlt_load_id validado) solo revisan las filas cargadas después.
+    - Las hijas en muestreadas revisan una muestra de muestra_pct % de las filas y devuelven
+      las filas y los huérfanos de la muestra, para estimar_aproximado. En Athena la muestra
+      es TABLESAMPLE SYSTEM, que descarta splits enteros sin leerlos: BERNOULLI elige filas
+      pero lee toda la tabla, así que no bajaría los bytes escaneados. La clave de la tabla
+      padre se lee completa en los dos casos (solo esa columna). En local se usa Bernoulli.
+    
+    Args:
+        dataset_name (str): Dataset del destino
+        tables (List[str]): Tablas hijas a validar
+        fk_relations (Dict[str, Dict[str, str]]): Relaciones FK -> tabla padre por tabla
+        primary_keys (Dict[str, str]): Claves primarias de todas las tablas
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        marcas (Dict[str, str]): Tabla -> _dlt_load_id de la última validación
+        muestreadas (frozenset): Tablas cuyas FKs se estiman con una muestra
+        muestra_pct (float): Porcentaje de filas muestreadas
+        
+    Returns:
+        Dict tabla padre -> (consulta, columnas). Las columnas se llaman
+        'orphan_count:<tabla>.<fk>', o 'sample_rows:<tabla>.<fk>' y 'sample_orphans:<tabla>.<fk>'
+        en las tablas muestreadas
+    """
+    marcas = marcas or {}
+    consultas = {}
+    for parent_table, referencias in reglas_calidad.agrupar_por_padre(fk_relations, tables).items():
+        parent_pk = primary_keys.get(parent_table, 'id')  # fallback a 'id' si no se encuentra
+        ramas = []
+        columnas = []
+        agregados = []
+        for i, (table, fk_column) in enumerate(referencias):
+            tabla_sql = f"{dataset_name}.{table}"
+            regla = f"{table}.{fk_column}"
+            if table in muestreadas:
+                if env == 'local':
+                    origen = f"{tabla_sql} USING SAMPLE {muestra_pct}% (bernoulli)"
+                else:
+                    origen = f"{tabla_sql} TABLESAMPLE SYSTEM ({muestra_pct})"
+                ramas.append(f"SELECT {i} AS regla, {fk_column} AS fk FROM {origen}")
+                columnas.extend([f"sample_rows:{regla}", f"sample_orphans:{regla}"])
+                agregados.extend([
+                    f"SUM(CASE WHEN r.regla = {i} THEN 1 ELSE 0 END)",
+                    f"SUM(CASE WHEN r.regla = {i} AND r.fk IS NOT NULL AND p.clave IS NULL THEN 1 ELSE 0 END)"
+                ])
+            else:
+                nueva = f" AND _dlt_load_id > '{marcas[table]}'" if marcas.get(table) else ""
+                ramas.append(f"SELECT {i} AS regla, {fk_column} AS fk FROM {tabla_sql} WHERE {fk_column} IS NOT NULL{nueva}")
+                columnas.append(f"orphan_count:{regla}")
+                agregados.append(f"SUM(CASE WHEN r.regla = {i} AND p.clave IS NULL THEN 1 ELSE 0 END)")
+        
+        union = "\n        UNION ALL\n        ".join(f"({rama})" for rama in ramas)
+        consultas[parent_table] = (f"""
+    SELECT {', '.join(f'COALESCE({agregado}, 0)' for agregado in agregados)}
+    FROM (
+        {union}
+    ) r
+    LEFT JOIN (SELECT DISTINCT {parent_pk} AS clave FROM {dataset_name}.{parent_table}) p
+        ON r.fk = p.clave
+    """, columnas)
+    return consultas
+
+def repartir_integridad(
+    filas: Dict[str, object],
+    consultas_fk: Dict[str, tuple],
+    valores_tabla: Dict[str, Dict],
+    errores_fk: Dict[tuple, Exception]
+):
+    """
+    Reparte los resultados de las consultas por tabla padre entre los valores de cada tabla hija.
+    
+    Args:
+        filas (Dict[str, object]): Resultado de execute_destination_many, con las consultas de
+            construir_consultas_integridad bajo la clave 'integridad:<tabla padre>'
+        consultas_fk (Dict[str, tuple]): Resultado de construir_consultas_integridad
+        valores_tabla (Dict[str, Dict]): Valores por tabla; se les agregan las columnas
+            '<nombre>:<fk>' (solo a las tablas presentes)
+        errores_fk (Dict[tuple, Exception]): Se completa con (tabla, FK) -> error si la
+            consulta de su tabla padre falló
+    """
+    for parent_table, (_, columnas) in consultas_fk.items():
+        fila = filas[f"integridad:{parent_table}"]
+        for i, columna in enumerate(columnas):
+            nombre, regla = columna.split(':', 1)
+            table, fk_column = regla.split('.', 1)
+            if table not in valores_tabla:
+                continue
+            if isinstance(fila, Exception):
+                errores_fk[(table, fk_column)] = fila
+            else:
+                valores_tabla[table][f"{nombre}:{fk_column}"] = fila[i]
+                errores_fk.pop((table, fk_column), None)
+
+def estimar_aproximado(
+    valores: Dict,
+    fk_columns: List[str],
+    error: float,
+    umbral: float,
+    exacto_distintos: bool
+) -> tuple:
+    """
+    Convierte los valores de la consulta aproximada en estimaciones con intervalo de confianza.
+    
+    - Duplicados: filas con clave menos claves distintas estimadas; el intervalo sale del
+      error relativo de HyperLogLog (± Z_CONFIANZA · error · distintas).
+    - Huérfanos: proporción de huérfanos en la muestra por filas de la tabla; el intervalo es
+      el normal de una proporción, o la regla del tres (3 / muestra) si no hubo huérfanos.
+      Supone filas independientes: con la muestra por splits de Athena es optimista si los
+      huérfanos se concentran en algunos archivos (por ejemplo, los de una carga).
+    
+    Args:
+        valores (Dict): Columna -> valor de la consulta de construir_consulta_aproximada
+        fk_columns (List[str]): FKs de la tabla
+        error (float): Error estándar relativo de approx_distinct
+        umbral (float): Fracción de filas a partir de la cual se repite la validación exacta
+        exacto_distintos (bool): Si las claves distintas se contaron de forma exacta
+        
+    Returns:
+        Tupla (valores, escalar): los valores con duplicate_count, orphan_count:<fk> y sus
+        intervalos ('interval:<columna>'), y si alguna cota superior supera el umbral
+    """
+    filas = valores['destination_count'] or 0
+    escalar = False
+    
+    if 'distinct_estimate' in valores:
+        claves = valores['key_count'] or 0
+        distintas = valores['distinct_estimate'] or 0
+        margen = 0 if exacto_distintos else Z_CONFIANZA * error * distintas
+        valores['duplicate_count'] = max(0, claves - distintas)
+        valores['interval:duplicate_count'] = (
+            max(0, math.floor(claves - distintas - margen)),
+            max(0, math.ceil(claves - distintas + margen))
+        )
+        escalar |= valores['interval:duplicate_count'][1] > umbral * max(filas, 1)
+    
+    for fk_column in fk_columns:
+        muestra = valores[f"sample_rows:{fk_column}"] or 0
+        huerfanos = valores[f"sample_orphans:{fk_column}"] or 0
+        if muestra == 0:
+            proporcion, desde, hasta = 0.0, 0.0, 1.0
+        elif huerfanos == 0:
+            proporcion, desde, hasta = 0.0, 0.0, min(1.0, 3 / muestra)
+        else:
+            proporcion = huerfanos / muestra
+            margen = Z_CONFIANZA * math.sqrt(proporcion * (1 - proporcion) / muestra)
+            desde, hasta = max(0.0, proporcion - margen), min(1.0, proporcion + margen)
+        # Si la muestra tiene huérfanos hay al menos esos en la tabla
+        valores[f"orphan_count:{fk_column}"] = round(proporcion * filas)
+        valores[f"interval:orphan_count:{fk_column}"] = (
+            max(huerfanos, math.floor(desde * filas)), math.ceil(hasta * filas)
+        )
+        escalar |= hasta > umbral
+    
+    return valores, escalar
+
+def leer_marcas(sesion: SesionValidacion) -> Dict[str, Dict]:
+    """
+    Lee las marcas de agua de la validación incremental de la tabla TABLA_MARCAS del destino.
+    
+    Args:
+        sesion (SesionValidacion): Sesión de validación
+        
+    Returns:
+        Dict tabla -> {'load_id': último _dlt_load_id validado, 'newest_update': MAX(updated_at)
+        validado en formato ISO}. Vacío si todavía no hubo validaciones.
+    """
     try:
+        rows = sesion.execute_destination_all(
+            f"""
+            SELECT tabla, load_id, newest_update
+            FROM (
+                SELECT tabla, load_id, newest_update,
+                       ROW_NUMBER() OVER (PARTITION BY tabla ORDER BY validado_en DESC) AS orden
+                FROM "{sesion.dataset_name}"."{TABLA_MARCAS}"
+            ) AS marcas
+            WHERE orden = 1
+            """,
+            'marcas'
+        )
+    except Exception:
+        # La tabla todavía no existe: se valida todo completo
+        return {}
+    return {table: {'load_id': load_id, 'newest_update': newest_update} for table, load_id, newest_update in rows}
+
+def guardar_marcas(pipeline: dlt.Pipeline, marcas: Dict[str, Dict]):
+    """
+    Agrega a la tabla TABLA_MARCAS del destino las marcas de agua que avanzaron en esta validación.
+    
+    Args:
+        pipeline (dlt.Pipeline): Pipeline del entorno, con el que se cargan las marcas
+        marcas (Dict[str, Dict]): Marcas por tabla (ver leer_marcas)
+    """
+    if not marcas:
+        return
+    validado_en = datetime.now()
+    pipeline.run(
+        [
+            {
+                'tabla': table,
+                'load_id': marca['load_id'],
+                'newest_update': str(marca['newest_update']) if marca['newest_update'] else None,
+                'validado_en': validado_en
+            }
+            for table, marca in marcas.items()
+        ],
+        table_name=TABLA_MARCAS,
+        write_disposition="append",
+        columns={'newest_update': {'data_type': 'text', 'nullable': True}}
+    )
+    print(f"  🔖 Marcas de validación agregadas a {TABLA_MARCAS}: {', '.join(marcas)}")
+
+def registrar_error_combinado(
+    results: Dict[str, Dict[str, Dict]],
+    table: str,
+    reglas: Dict[str, Dict],
+    error: Exception
+):
+    """
+    Marca con ERROR todas las validaciones de una tabla en los resultados combinados.
+    
+    Args:
+        results (Dict[str, Dict[str, Dict]]): Resultados por validación, se modifican en el lugar
+        table (str): Tabla cuya validación falló
+        reglas (Dict[str, Dict]): Reglas de calidad por tabla
+        error (Exception): Error de la consulta
+    """
+    regla = reglas_calidad.regla_tabla(reglas, table)
+    results['CONTEO'][table] = {
+        'source_count': 0,
+        'destination_count': 0,
+        'difference': 0,
+        'status': 'ERROR',
+        'error': str(error)
+    }
+    results['DUPLICADOS'][table] = {'status': 'ERROR', 'error': str(error)}
+    results['FRESCURA'][table] = {'status': 'ERROR', 'error': str(error)}
+    if regla['claves_foraneas']:
+        results['INTEGRIDAD REFERENCIAL'][table] = {
+            fk_column: {'status': 'ERROR', 'error': str(error)}
+            for fk_column in regla['claves_foraneas']
+        }
+    else:
+        results['INTEGRIDAD REFERENCIAL'][table] = {
+            'status': 'SKIP',
+            'message': f'No hay relaciones de integridad definidas para {table}'
+        }
+    if regla['valores_aceptados']:
+        results['VALORES ACEPTADOS'][table] = {'status': 'ERROR', 'error': str(error)}
+    else:
+        results['VALORES ACEPTADOS'][table] = resultado_valores_aceptados(table, {}, {})
+    print(f"  ❌ Error validando {table}: {error}")
+
+def degradar_a_metadatos(
+    results: Dict[str, Dict[str, Dict]],
+    sesion: SesionValidacion,
+    table: str,
+    source_count: int,
+    has_updated_at: bool
+):
+    """
+    Valida una tabla que no entra en el presupuesto de escaneo solo con los metadatos de Iceberg.
+    
+    El conteo y la frescura salen de $files y $partitions (ver contar_filas_iceberg y
+    maximo_iceberg), que no leen los archivos de datos; si no hay metadatos utilizables se
+    informan como SKIP. Duplicados, integridad referencial y valores aceptados necesitan
+    recorrer la tabla y se omiten.
+    
+    Args:
+        results (Dict[str, Dict[str, Dict]]): Resultados por validación, se modifican en el lugar
+        sesion (SesionValidacion): Sesión de validación
+        table (str): Tabla
+        source_count (int): Conteo de la tabla en el origen
+        has_updated_at (bool): Si la tabla tiene columna updated_at
+    """
+    omitido = {'status': 'SKIP', 'message': MENSAJE_SIN_PRESUPUESTO}
+    dest_count = contar_filas_iceberg(sesion, table)
+    if dest_count is None:
+        results['CONTEO'][table] = dict(omitido)
+    else:
+        results['CONTEO'][table] = {
+            'source_count': source_count,
+            'destination_count': dest_count,
+            'difference': source_count - dest_count,
+            'status': 'OK' if source_count == dest_count else 'WARNING',
+            'fuente': 'metadatos'
+        }
+    
+    newest_update = maximo_iceberg(sesion, table, 'updated_at') if has_updated_at else None
+    if not has_updated_at:
+        results['FRESCURA'][table] = {
+            'status': 'SKIP',
+            'message': 'Tabla no tiene columna updated_at'
+        }
+    elif newest_update is None:
+        results['FRESCURA'][table] = dict(omitido)
+    else:
+        max_hours = reglas_calidad.regla_tabla(sesion.reglas, table)['frescura_horas']
+        results['FRESCURA'][table] = evaluar_frescura(newest_update, datetime.now() - timedelta(hours=max_hours))
+        results['FRESCURA'][table]['fuente'] = 'metadatos'
+    
+    for validacion in ('DUPLICADOS', 'INTEGRIDAD REFERENCIAL', 'VALORES ACEPTADOS'):
+        results[validacion][table] = dict(omitido)
+    print(f"  💸 {table}: {MENSAJE_SIN_PRESUPUESTO}, solo conteo y frescura de los metadatos de Iceberg")
+
+def validar_tablas_combinado(
+    env: str = 'local',
+    tables: Optional[List[str]] = None,
+    sesion: Optional[SesionValidacion] = None,
+    completa: bool = True,
+    aproximado: bool = False,
+    error: float = ERROR_APROXIMADO,
+    muestra_pct: float = MUESTRA_PCT,
+    umbral: float = UMBRAL_APROXIMADO,
+    top_duplicados: int = TOP_DUPLICADOS,
+    directorio_duplicados: Optional[str] = None,
+    pipeline: Optional[dlt.Pipeline] = None
+) -> Dict[str, Dict[str, Dict]]:
+    """
+    Ejecuta todas las reglas de calidad con una consulta por tabla y una por tabla padre.
+    
+    Las reglas salen de reglas_calidad.yaml. En el destino, cada tabla se recorre una vez con
+    una consulta que agrega COUNT(*), COUNT(DISTINCT pk), MAX(updated_at) y las filas con
+    valores no aceptados, y cada tabla padre se lee una vez para los huérfanos de todas las FKs
+    que la referencian (ver construir_consultas_integridad). En el origen se hace un conteo
+    por tabla y una única consulta a information_schema para todas las tablas. Las consultas
+    de destino se envían juntas (en paralelo en Athena).
+    
+    Al terminar se agrega a la tabla TABLA_MARCAS del destino, por tabla, el último
+    _dlt_load_id validado, solo si todas sus consultas (conteo, nulos, duplicados y cada FK)
+    terminaron sin error. Con completa=False,
+    las tablas con marca solo validan las filas cargadas después de ella (ver
+    construir_consulta_combinada), de modo que el costo sigue al volumen cargado y no al
+    tamaño de la tabla.
+    
+    Con aproximado=True, las tablas que se validarían completas usan la consulta aproximada
+    (ver construir_consulta_aproximada) y se informan con su intervalo de confianza. Solo las
+    tablas cuya cota superior de duplicados o huérfanos supera el umbral se vuelven a validar
+    de forma exacta.
+    
+    La consulta combinada solo cuenta las filas sobrantes. De las tablas con duplicados se
+    agrega el reporte de reportar_duplicados (claves repetidas y las top_duplicados con más filas).
+    
+    Con un presupuesto de escaneo en la sesión, las consultas se planifican con el tamaño de
+    las tablas (estimar_bytes_tabla) antes de enviarlas: las tablas que no entran se validan
+    solo con los metadatos de Iceberg (ver degradar_a_metadatos) y las FKs cuya consulta no
+    entra se informan como SKIP. Los reintentos exactos del modo aproximado y los listados de
+    duplicados también se omiten si no entran. Las tablas con algún chequeo omitido por el
+    presupuesto no avanzan su marca.
+    
+    Args:
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        tables (List[str]): Lista de tablas a validar
+        sesion (SesionValidacion): Sesión con las conexiones a reutilizar. Si es None, se abre una para esta validación.
+        completa (bool): Si es True, valida las tablas completas aunque tengan marca
+        aproximado (bool): Si es True, estima duplicados y huérfanos en las validaciones completas
+        error (float): Error estándar relativo de approx_distinct en el modo aproximado
+        muestra_pct (float): Porcentaje de filas muestreadas para los huérfanos en el modo aproximado
+        umbral (float): Fracción de filas con problemas estimada a partir de la cual se valida de forma exacta
+        top_duplicados (int): Claves repetidas a listar por tabla con duplicados
+        directorio_duplicados (str): Directorio donde escribir la lista completa de claves repetidas. Si es None no se escribe.
+        pipeline (dlt.Pipeline): Pipeline del entorno con el que se guardan las marcas (ver
+            guardar_marcas). Si es None las marcas no avanzan.
+        
+    Returns:
+        Dict nombre de validación ('CONTEO', 'DUPLICADOS', 'INTEGRIDAD REFERENCIAL', 'FRESCURA',
+        'VALORES ACEPTADOS') -> resultados por tabla, con el mismo formato que las funciones
+        validar_* individuales
+    """
+    results = {
+        'CONTEO': {},
+        'DUPLICADOS': {},
+        'INTEGRIDAD REFERENCIAL': {},
+        'FRESCURA': {},
+        'VALORES ACEPTADOS': {}
+    }
+    if tables is None:
+        print("⚠️ No se especificaron tablas para validar")
+        return results
+    
+    alcance = 'completa' if completa else 'incremental desde la última validación'
+    if aproximado:
+        alcance += ', aproximada'
+    print(f"🔍 Validando tablas con una consulta combinada por tabla ({alcance})...")
+    
+    propia = sesion is None
+    sesion = sesion or SesionValidacion(env)
+    primary_keys = sesion.primary_keys
+    reglas = sesion.reglas
+    fk_relations = sesion.fk_relations
+    dataset_name = sesion.dataset_name
+    
+    try:
+        marcas = leer_marcas(sesion)
+        marcas_nuevas = {}
+        
+        # Tablas con updated_at, en una sola consulta al catálogo del origen
+        tablas_updated_at = sesion.tiene_updated_at(tables)
+        
+        source_counts = {}
+        consultas = {}
+        columnas_consulta = {}
+        tablas_aproximadas = set()
+        conteos_metadatos = {}
+        marcas_consulta = {}
         for table in tables:
-            if table not in FK_RELATIONS:
-                results[table] = {
+            try:
+                # Conteo en origen
+                with sesion.source_conn.cursor() as cursor:
+                    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                    source_counts[table] = cursor.fetchone()[0]
+                
+                valores_aceptados = reglas_calidad.regla_tabla(reglas, table)['valores_aceptados']
+                marca = None if completa else marcas.get(table, {}).get('load_id')
+                marcas_consulta[table] = marca
+                if aproximado and marca is None:
+                    consultas[table], columnas_consulta[table] = construir_consulta_aproximada(
+                        dataset_name, table, primary_keys.get(table), tablas_updated_at[table],
+                        valores_aceptados, env, error
+                    )
+                    tablas_aproximadas.add(table)
+                else:
+                    # En la validación incremental el conteo de la tabla completa sale de los
+                    # metadatos de Iceberg cuando se puede, para no recorrerla
+                    conteos_metadatos[table] = contar_filas_iceberg(sesion, table) if marca else None
+                    consultas[table], columnas_consulta[table] = construir_consulta_combinada(
+                        dataset_name, table, primary_keys.get(table), tablas_updated_at[table],
+                        valores_aceptados, marca, conteos_metadatos[table] is None
+                    )
+            except Exception as e:
+                registrar_error_combinado(results, table, reglas, e)
+        
+        # Presupuesto de escaneo: las tablas cuya consulta no entra se validan con los metadatos
+        planificado = 0
+        for table in list(consultas):
+            estimado = estimar_bytes_tabla(sesion, table)
+            if entra_en_presupuesto(sesion, estimado, planificado):
+                planificado += estimado
+                continue
+            del consultas[table]
+            tablas_aproximadas.discard(table)
+            degradar_a_metadatos(results, sesion, table, source_counts[table], tablas_updated_at[table])
+        
+        # Integridad referencial: una consulta por tabla padre para las FKs de todas sus hijas
+        consultas_fk = construir_consultas_integridad(
+            dataset_name, list(consultas), fk_relations, primary_keys, env,
+            marcas_consulta, frozenset(tablas_aproximadas), muestra_pct
+        )
+        errores_fk = {}
+        omitir_integridad_sin_presupuesto(sesion, consultas_fk, fk_relations, list(consultas), errores_fk, planificado)
+        print(f"  🔗 {len(consultas)} consultas por tabla y {len(consultas_fk)} por tabla padre para las FKs")
+        
+        # Todas las consultas de destino juntas: en Athena se ejecutan en paralelo
+        tiempos = {}
+        todas = dict(consultas)
+        todas.update({f"integridad:{parent_table}": query for parent_table, (query, _) in consultas_fk.items()})
+        filas = sesion.execute_destination_many(todas, tiempos)
+        valores_tabla = {}
+        for table in consultas:
+            if isinstance(filas[table], Exception):
+                registrar_error_combinado(results, table, reglas, filas[table])
+                continue
+            valores_tabla[table] = dict(zip(columnas_consulta[table], filas[table]))
+            if conteos_metadatos.get(table) is not None:
+                valores_tabla[table]['destination_count'] = conteos_metadatos[table]
+        repartir_integridad(filas, consultas_fk, valores_tabla, errores_fk)
+        
+        # Modo aproximado: repetir de forma exacta las tablas cuya estimación supera el umbral.
+        # Las que se quedan con la estimación por el presupuesto no avanzan su marca
+        escaladas = {}
+        sin_marca = set()
+        planificado = 0
+        for table in tablas_aproximadas & valores_tabla.keys():
+            fk_columns = [
+                fk_column for fk_column in fk_relations.get(table, {})
+                if (table, fk_column) not in errores_fk
+            ]
+            valores_tabla[table], escalar = estimar_aproximado(
+                valores_tabla[table], fk_columns, error, umbral, env == 'local'
+            )
+            if escalar and not entra_en_presupuesto(sesion, estimar_bytes_tabla(sesion, table), planificado):
+                print(f"  💸 {table}: {MENSAJE_SIN_PRESUPUESTO}, se mantiene la estimación")
+                sin_marca.add(table)
+            elif escalar:
+                planificado += estimar_bytes_tabla(sesion, table)
+                escaladas[table], columnas_consulta[table] = construir_consulta_combinada(
+                    dataset_name, table, primary_keys.get(table), tablas_updated_at[table],
+                    reglas_calidad.regla_tabla(reglas, table)['valores_aceptados']
+                )
+        if escaladas:
+            print(f"  🔁 Estimación sobre el umbral, validación exacta de: {', '.join(escaladas)}")
+            consultas_fk = construir_consultas_integridad(
+                dataset_name, list(escaladas), fk_relations, primary_keys, env
+            )
+            # Las FKs cuya consulta exacta no entra en el presupuesto conservan la estimación
+            sin_presupuesto = {}
+            omitir_integridad_sin_presupuesto(
+                sesion, consultas_fk, fk_relations, list(escaladas), sin_presupuesto, planificado
+            )
+            sin_marca.update(child for child, _ in sin_presupuesto)
+            todas = dict(escaladas)
+            todas.update({f"integridad:{parent_table}": query for parent_table, (query, _) in consultas_fk.items()})
+            tiempos_exactos = {}
+            filas = sesion.execute_destination_many(todas, tiempos_exactos)
+            for clave, segundos in tiempos_exactos.items():
+                tiempos[clave] = tiempos.get(clave, 0) + segundos
+            for table in escaladas:
+                if isinstance(filas[table], Exception):
+                    registrar_error_combinado(results, table, reglas, filas[table])
+                    del valores_tabla[table]
+                    continue
+                estimados = valores_tabla[table]
+                valores_tabla[table] = dict(zip(columnas_consulta[table], filas[table]))
+                for child, fk_column in sin_presupuesto:
+                    if child == table:
+                        for clave in (f"orphan_count:{fk_column}", f"interval:orphan_count:{fk_column}"):
+                            if clave in estimados:
+                                valores_tabla[table][clave] = estimados[clave]
+            repartir_integridad(filas, consultas_fk, valores_tabla, errores_fk)
+        
+        for table, valores in valores_tabla.items():
+            pk_column = primary_keys.get(table)
+            source_count = source_counts[table]
+            regla = reglas_calidad.regla_tabla(reglas, table)
+            
+            # Conteo
+            dest_count = valores['destination_count']
+            results['CONTEO'][table] = {
+                'source_count': source_count,
+                'destination_count': dest_count,
+                'difference': source_count - dest_count,
+                'status': 'OK' if source_count == dest_count else 'WARNING',
+                # Segundos de la consulta combinada de la tabla en el destino
+                'query_s': tiempos.get(table)
+            }
+            adjuntar_costo(results['CONTEO'][table], sesion, table)
+            
+            # Duplicados: la consulta combinada solo cuenta las filas sobrantes; las claves se listan aparte
+            if pk_column is None:
+                results['DUPLICADOS'][table] = {
                     'status': 'SKIP',
-                    'message': f'No hay relaciones de integridad definidas para {table}'
+                    'message': f'No se encontró clave primaria para {table} en el esquema'
                 }
-                print(f"  ⏭️ {table}: No hay relaciones definidas")
-                continue
+            else:
+                duplicate_count = valores['duplicate_count']
+                results['DUPLICADOS'][table] = {
+                    'duplicate_count': duplicate_count,
+                    'duplicate_ids': [],
+                    'status': 'OK' if duplicate_count == 0 else 'WARNING'
+                }
+                if 'interval:duplicate_count' in valores:
+                    # Estimado: solo es un problema seguro si la cota inferior es positiva
+                    intervalo = valores['interval:duplicate_count']
+                    results['DUPLICADOS'][table]['intervalo'] = intervalo
+                    results['DUPLICADOS'][table]['status'] = 'OK' if intervalo[0] == 0 else 'WARNING'
+                if results['DUPLICADOS'][table]['status'] == 'WARNING' and not entra_en_presupuesto(
+                    sesion, estimar_bytes_tabla(sesion, table)
+                ):
+                    print(f"  💸 {table}: {MENSAJE_SIN_PRESUPUESTO}, no se listan las claves repetidas")
+                elif results['DUPLICADOS'][table]['status'] == 'WARNING':
+                    try:
+                        reporte = reportar_duplicados(sesion, table, pk_column, top_duplicados, directorio_duplicados)
+                        # El conteo de la consulta combinada se mantiene (en la incremental es el de la porción nueva)
+                        del reporte['duplicate_count']
+                        results['DUPLICADOS'][table].update(reporte)
+                    except Exception as e:
+                        print(f"  ⚠️ No se pudieron listar las claves repetidas de {table}: {e}")
+                # La consulta combinada y, si se listaron las claves, la del listado
+                adjuntar_costo(results['DUPLICADOS'][table], sesion, table)
+                adjuntar_costo(results['DUPLICADOS'][table], sesion, f"duplicados:{table}")
             
-            table_results = {}
+            # Integridad referencial y valores aceptados
+            results['INTEGRIDAD REFERENCIAL'][table] = resultado_integridad(table, fk_relations, valores, errores_fk)
+            adjuntar_costo_integridad(results['INTEGRIDAD REFERENCIAL'][table], sesion)
+            results['VALORES ACEPTADOS'][table] = resultado_valores_aceptados(table, regla['valores_aceptados'], valores)
+            if regla['valores_aceptados']:
+                for column_result in results['VALORES ACEPTADOS'][table].values():
+                    adjuntar_costo(column_result, sesion, table)
             
-            for fk_column, parent_table in FK_RELATIONS[table].items():
-                try:
-                    # Query para detectar registros huérfanos
-                    # Obtener la clave primaria de la tabla padre
-                    parent_pk = primary_keys.get(parent_table, 'id')  # fallback a 'id' si no se encuentra
-                    
-                    query = f"""
-                    SELECT COUNT(*)
-                    FROM {dataset_name}.{table} t
-                    LEFT JOIN {dataset_name}.{parent_table} p 
-                        ON t.{fk_column} = p.{parent_pk}
-                    WHERE t.{fk_column} IS NOT NULL 
-                        AND p.{parent_pk} IS NULL
-                    """
-                    
-                    result = execute_destination_query(env, dest_conn, query)
-                    orphan_count = result[0]
-                    
-                    status = 'OK' if orphan_count == 0 else 'WARNING'
-                    
-                    table_results[fk_column] = {
-                        'parent_table': parent_table,
-                        'orphan_count': orphan_count,
-                        'status': status
-                    }
-                    
-                    print(f"  🔗 {table}.{fk_column} -> {parent_table}: {orphan_count} huérfanos")
-                    
-                except Exception as e:
-                    table_results[fk_column] = {
-                        'status': 'ERROR',
-                        'error': str(e)
-                    }
-                    print(f"  ❌ Error validando integridad {table}.{fk_column}: {e}")
+            # Frescura: en la validación incremental, lo más reciente entre las filas nuevas y lo ya validado
+            newest_update = valores.get('newest_update')
+            marca_anterior = marcas.get(table, {}).get('newest_update')
+            if not completa and marca_anterior:
+                marca_anterior = datetime.fromisoformat(marca_anterior)
+                newest_update = max(newest_update, marca_anterior) if newest_update else marca_anterior
+            if tablas_updated_at[table]:
+                cutoff_time = datetime.now() - timedelta(hours=regla['frescura_horas'])
+                results['FRESCURA'][table] = evaluar_frescura(newest_update, cutoff_time)
+                adjuntar_costo(results['FRESCURA'][table], sesion, table)
+            else:
+                results['FRESCURA'][table] = {
+                    'status': 'SKIP',
+                    'message': 'Tabla no tiene columna updated_at'
+                }
+            
+            print(f"  📊 {table}: Origen={source_count}, Destino={dest_count}")
             
-            results[table] = table_results
+            # Avanzar la marca solo de las tablas que se validaron sin error ni omisiones por el
+            # presupuesto, incluidas todas sus FKs
+            if (
+                valores['load_id'] is not None
+                and table not in sin_marca
+                and not any(child == table for child, _ in errores_fk)
+            ):
+                marcas_nuevas[table] = {'load_id': valores['load_id'], 'newest_update': newest_update}
+        
+        if pipeline is not None:
+            guardar_marcas(pipeline, marcas_nuevas)
     
     finally:
-        if dest_conn:
-            dest_conn.close()
+        if propia:
+            sesion.close()
     
     return results
 
+def formatear_intervalo(result: Dict) -> str:
+    """
+    Texto con el intervalo de confianza de un resultado estimado, o vacío si es exacto.
+    
+    Args:
+        result (Dict): Resultado de una validación
+        
+    Returns:
+        str: Texto a agregar al resumen
+    """
+    if 'intervalo' not in result:
+        return ""
+    desde, hasta = result['intervalo']
+    return f" (estimado, IC 95%: {desde}–{hasta})"
+
 def mostrar_resumen_conteo(results: Dict[str, Dict]):
     """
     Muestra un resumen de los resultados de conteo.
@@ -507,8 +2043,11 @@ def mostrar_resumen_conteo(results: Dict[str, Dict]):
     print("=" * 50)
     
     for table, result in results.items():
+        if result['status'] == 'SKIP':
+            print(f"  ⏭️ {table}: {result['message']}")
+            continue
         status_icon = "✅" if result['status'] == 'OK' else "⚠️" if result['status'] == 'WARNING' else "❌"
-        print(f"  {status_icon} {table}: {result['source_count']} → {result['destination_count']} ({result['difference']:+d})")
+        print(f"  {status_icon} {table}: {result['source_count']} → {result['destination_count']} ({result['difference']:+d}){formatear_costo(result)}")
     
     print("=" * 50)
 
@@ -525,9 +2064,15 @@ def mostrar_resumen_duplicados(results: Dict[str, Dict]):
     
     for table, result in results.items():
         if result['status'] == 'OK':
-            print(f"  ✅ {table}: Sin duplicados")
+            print(f"  ✅ {table}: Sin duplicados{formatear_intervalo(result)}{formatear_costo(result)}")
         elif result['status'] == 'WARNING':
-            print(f"  ⚠️ {table}: {result['duplicate_count']} duplicados encontrados")
+            print(f"  ⚠️ {table}: {result['duplicate_count']} duplicados encontrados{formatear_intervalo(result)}{formatear_costo(result)}")
+            if 'duplicate_keys' in result:
+                print(f"      {result['duplicate_keys']} claves repetidas, las de más filas:")
+                for clave, filas in result['top_duplicates']:
+                    print(f"        {clave}: {filas} filas")
+            if result.get('archivo'):
+                print(f"      Lista completa en {result['archivo']}")
         elif result['status'] == 'SKIP':
             print(f"  ⏭️ {table}: {result['message']}")
         else:
@@ -553,12 +2098,17 @@ def mostrar_resumen_integridad_referencial(results: Dict[str, Dict]):
         else:
             # Caso de tabla con relaciones de integridad
             for fk, fk_result in table_results.items():
-                if fk_result['status'] == 'OK':
-                    print(f"  ✅ {table}.{fk} -> {fk_result['parent_table']}: Sin huérfanos")
-                elif fk_result['status'] == 'WARNING':
-                    print(f"  ⚠️ {table}.{fk} -> {fk_result['parent_table']}: {fk_result['orphan_count']} huérfanos")
+                if fk_result['status'] in ('OK', 'WARNING'):
+                    if fk_result['status'] == 'OK':
+                        print(f"  ✅ {table}.{fk} -> {fk_result['parent_table']}: Sin huérfanos{formatear_intervalo(fk_result)}{formatear_costo(fk_result)}")
+                    else:
+                        print(f"  ⚠️ {table}.{fk} -> {fk_result['parent_table']}: {fk_result['orphan_count']} huérfanos{formatear_intervalo(fk_result)}{formatear_costo(fk_result)}")
+                    if 'intervalo' in fk_result:
+                        print(f"     ↳ estimado con una muestra de {table}: la clave de {fk_result['parent_table']} se lee completa, el costo no baja en proporción a la muestra")
+                elif fk_result['status'] == 'SKIP':
+                    print(f"  ⏭️ {table}.{fk} -> {fk_result['parent_table']}: {fk_result['message']}")
                 else:
-                    print(f"  ❌ {table}.{fk}: Error - {fk_result.get('error', 'Desconocido')}")
+                    print(f"  ❌ {table}.{fk}: Error - {fk_result.get('error', 'Desconocido')}{formatear_costo(fk_result)}")
     
     print("=" * 50)
 
@@ -575,12 +2125,71 @@ def mostrar_resumen_freshness(results: Dict[str, Dict]):
     
     for table, result in results.items():
         if result['status'] == 'OK':
-            print(f"  ✅ {table}: {result['message']}")
+            print(f"  ✅ {table}: {result['message']}{formatear_costo(result)}")
         elif result['status'] == 'WARNING':
-            print(f"  ⚠️ {table}: {result['message']}")
+            print(f"  ⚠️ {table}: {result['message']}{formatear_costo(result)}")
         elif result['status'] == 'SKIP':
             print(f"  ⏭️ {table}: {result['message']}")
         else:
             print(f"  ❌ {table}: Error - {result.get('error', 'Desconocido')}")
     
-    print("=" * 50) 
\ No newline at end of file
+    print("=" * 50)
+
+def mostrar_resumen_valores_aceptados(results: Dict[str, Dict]):
+    """
+    Muestra un resumen de los resultados de valores aceptados.
+    
+    Args:
+        results (Dict[str, Dict]): Resultados de validación
+    """
+    print("\n" + "=" * 50)
+    print("🏷️ RESUMEN DE VALORES ACEPTADOS")
+    print("=" * 50)
+    
+    for table, table_results in results.items():
+        if 'status' in table_results:
+            if table_results['status'] == 'SKIP':
+                print(f"  ⏭️ {table}: {table_results['message']}")
+            else:
+                print(f"  ❌ {table}: Error - {table_results.get('error', 'Desconocido')}")
+            continue
+        for column, column_result in table_results.items():
+            if column_result['status'] == 'OK':
+                print(f"  ✅ {table}.{column}: Todos los valores aceptados{formatear_costo(column_result)}")
+            else:
+                print(f"  ⚠️ {table}.{column}: {column_result['invalid_count']} filas con valores fuera de {column_result['accepted_values']}{formatear_costo(column_result)}")
+    
+    print("=" * 50)
+
+def mostrar_resumen_costos(sesion: SesionValidacion):
+    """
+    Muestra los bytes escaneados y el tiempo de motor en Athena por chequeo y el total de la sesión.
+    
+    Args:
+        sesion (SesionValidacion): Sesión de validación
+    """
+    if not sesion.costos:
+        return
+    print("\n" + "=" * 50)
+    print("💸 RESUMEN DE COSTOS EN ATHENA")
+    print("=" * 50)
+    
+    for etiqueta, costo in sorted(sesion.costos.items(), key=lambda item: -item[1]['bytes']):
+        print(
+            f"  {etiqueta}: {costo['bytes'] / 1024 ** 2:.1f} MB, {costo['motor_ms'] / 1000:.1f} s de motor "
+            f"({costo['consultas']} consultas)"
+        )
+    total = sesion.bytes_escaneados
+    print(f"  Total: {total / 1024 ** 2:.1f} MB (≈ {total / 1024 ** 4 * USD_POR_TB:.4f} USD)")
+    if sesion.presupuesto_restante is not None:
+        print(
+            f"  Presupuesto: {sesion.presupuesto_bytes / 1024 ** 3:.2f} GB, "
+            f"restante {max(sesion.presupuesto_restante, 0) / 1024 ** 3:.2f} GB"
+        )
+        if sesion.presupuesto_restante < 0:
+            print(
+                f"  ⚠️ Se superó el presupuesto en {-sesion.presupuesto_restante / 1024 ** 3:.2f} GB: "
+                f"las consultas se planifican con estimaciones y Athena no las corta"
+            )
+    
+    print("=" * 50)
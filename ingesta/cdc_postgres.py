@@ -0,0 +1,332 @@
+"""
+Ingesta por CDC (change data capture) desde un slot de replicación lógica de PostgreSQL.
+
+Lee los cambios del slot con el plugin pgoutput, los decodifica y los entrega a dlt en
+micro-lotes con merge por clave primaria y borrado físico de las filas eliminadas.
+El LSN del último commit cargado se guarda en el estado del pipeline y recién se
+confirma en el slot al comenzar el lote siguiente, es decir, cuando dlt ya cargó el lote.
+
+Requisitos en el origen:
+- wal_level = logical
+- un usuario con atributo REPLICATION (o superusuario)
+- REPLICA IDENTITY FULL en las tablas capturadas, para que pgoutput envíe el valor anterior
+  de las columnas TOAST (textos largos) que un UPDATE no cambió. preparar_cdc lo configura,
+  por lo que el usuario tiene que ser dueño de las tablas
+"""
+import struct
+import psycopg2
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import dlt
+
+import calidad_de_datos
+
+CDC_SLOT = "datavision_cdc"
+CDC_PUBLICATION = "datavision_cdc"
+
+# Columnas agregadas a cada fila capturada
+COLUMNA_BORRADO = "_cdc_deleted"
+COLUMNA_LSN = "_cdc_lsn"
+
+# Conversión del formato de texto de pgoutput según el OID del tipo de PostgreSQL
+CONVERSORES_TIPO = {
+    16: lambda v: v == 't',                 # bool
+    20: int, 21: int, 23: int,              # bigint, smallint, integer
+    700: float, 701: float,                 # real, double precision
+    1700: Decimal,                          # numeric
+    1082: date.fromisoformat,               # date
+    1114: datetime.fromisoformat,           # timestamp
+    1184: datetime.fromisoformat,           # timestamptz
+}
+
+def lsn_a_entero(lsn: str) -> int:
+    """
+    Convierte un LSN de PostgreSQL ('16/B374D848') a entero.
+
+    Args:
+        lsn (str): LSN en formato texto
+
+    Returns:
+        int: LSN como entero de 64 bits
+    """
+    alto, bajo = lsn.split('/')
+    return (int(alto, 16) << 32) + int(bajo, 16)
+
+def entero_a_lsn(valor: int) -> str:
+    """
+    Convierte un LSN entero al formato texto de PostgreSQL.
+
+    Args:
+        valor (int): LSN como entero
+
+    Returns:
+        str: LSN en formato 'X/Y'
+    """
+    return f"{valor >> 32:X}/{valor & 0xFFFFFFFF:X}"
+
+class LectorMensaje:
+    """Lee los campos de un mensaje binario de pgoutput (enteros big-endian y strings terminados en cero)."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def byte(self) -> str:
+        valor = chr(self.data[self.pos])
+        self.pos += 1
+        return valor
+
+    def int8(self) -> int:
+        return self._unpack('>b', 1)
+
+    def int16(self) -> int:
+        return self._unpack('>h', 2)
+
+    def int32(self) -> int:
+        return self._unpack('>i', 4)
+
+    def int64(self) -> int:
+        return self._unpack('>q', 8)
+
+    def string(self) -> str:
+        fin = self.data.index(0, self.pos)
+        valor = self.data[self.pos:fin].decode('utf-8')
+        self.pos = fin + 1
+        return valor
+
+    def bytes(self, n: int) -> bytes:
+        valor = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return valor
+
+    def _unpack(self, formato: str, n: int) -> int:
+        valor = struct.unpack_from(formato, self.data, self.pos)[0]
+        self.pos += n
+        return valor
+
+def leer_tupla(lector: LectorMensaje, columnas: List[Tuple[str, int]]) -> Dict[str, Any]:
+    """
+    Decodifica un TupleData de pgoutput.
+
+    Las columnas TOAST sin cambios ('u') no se incluyen en el resultado.
+
+    Args:
+        lector (LectorMensaje): Lector posicionado al inicio de la tupla
+        columnas (List[Tuple[str, int]]): Nombre y OID de tipo de cada columna de la relación
+
+    Returns:
+        Dict columna -> valor
+    """
+    fila = {}
+    for i in range(lector.int16()):
+        nombre, tipo_oid = columnas[i]
+        tipo = lector.byte()
+        if tipo == 'n':
+            fila[nombre] = None
+        elif tipo == 't':
+            texto = lector.bytes(lector.int32()).decode('utf-8')
+            fila[nombre] = CONVERSORES_TIPO.get(tipo_oid, str)(texto)
+        # 'u': valor TOAST sin cambios, pgoutput no lo envía
+    return fila
+
+def decodificar_cambios(
+    mensajes: List[Tuple[str, bytes]],
+    tables: List[str]
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Optional[int]]:
+    """
+    Decodifica una secuencia de mensajes pgoutput (protocolo versión 1) en filas por tabla.
+
+    Cada fila lleva la columna COLUMNA_LSN con el LSN del cambio, para quedarse con la
+    última versión de una clave dentro del lote, y COLUMNA_BORRADO en True si fue un DELETE.
+
+    Args:
+        mensajes (List[Tuple[str, bytes]]): Pares (lsn, data) devueltos por el slot
+        tables (List[str]): Tablas a capturar; los cambios de otras tablas se ignoran
+
+    Returns:
+        Tupla (filas por tabla, LSN de fin del último commit decodificado o None)
+    """
+    relaciones: Dict[int, Tuple[str, List[Tuple[str, int]]]] = {}
+    filas: Dict[str, List[Dict[str, Any]]] = {}
+    ultimo_commit_lsn = None
+
+    for lsn, data in mensajes:
+        lector = LectorMensaje(bytes(data))
+        tipo = lector.byte()
+
+        if tipo == 'R':
+            oid = lector.int32()
+            lector.string()  # namespace
+            nombre = lector.string()
+            lector.int8()  # replica identity
+            columnas = []
+            for _ in range(lector.int16()):
+                lector.int8()  # flags
+                columna = lector.string()
+                tipo_oid = lector.int32()
+                lector.int32()  # typmod
+                columnas.append((columna, tipo_oid))
+            relaciones[oid] = (nombre, columnas)
+
+        elif tipo in ('I', 'U', 'D'):
+            nombre, columnas = relaciones[lector.int32()]
+            if nombre not in tables:
+                continue
+            fila_anterior = {}
+            marca = lector.byte()
+            if tipo in ('U', 'D') and marca in ('K', 'O'):
+                # Clave o fila anterior (según REPLICA IDENTITY)
+                fila_anterior = leer_tupla(lector, columnas)
+                if tipo == 'U':
+                    marca = lector.byte()
+            if tipo == 'D':
+                fila = fila_anterior
+            else:
+                # Completar columnas TOAST sin cambios con el valor anterior si se envió
+                fila = {**fila_anterior, **leer_tupla(lector, columnas)}
+            fila[COLUMNA_BORRADO] = tipo == 'D'
+            fila[COLUMNA_LSN] = lsn_a_entero(lsn)
+            filas.setdefault(nombre, []).append(fila)
+
+        elif tipo == 'C':
+            lector.int8()  # flags
+            lector.int64()  # LSN del commit
+            ultimo_commit_lsn = lector.int64()  # LSN de fin de la transacción
+
+        # 'B' (begin), 'T' (truncate), 'Y' (type) y 'O' (origin) no generan filas
+
+    return filas, ultimo_commit_lsn
+
+def preparar_cdc(env: str, tables: List[str]):
+    """
+    Crea (o actualiza) la publicación y el slot de replicación lógica en el origen.
+
+    Las tablas publicadas quedan con REPLICA IDENTITY FULL: con la identidad por defecto, un
+    UPDATE que no toca una columna TOAST (contents.description, por ejemplo) la envía sin
+    valor ('u') y la fila del merge la perdería.
+
+    Después de crear el slot hay que hacer una carga completa de las tablas: los cambios
+    posteriores a la creación del slot se aplican luego por CDC.
+
+    Args:
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        tables (List[str]): Tablas a publicar
+    """
+    source_conn = calidad_de_datos.get_db_connection(env)
+    source_conn.autocommit = True
+    try:
+        with source_conn.cursor() as cursor:
+            cursor.execute("SHOW wal_level")
+            wal_level = cursor.fetchone()[0]
+            if wal_level != 'logical':
+                raise RuntimeError(f"El origen tiene wal_level={wal_level}, CDC requiere wal_level=logical")
+
+            cursor.execute(
+                "SELECT relname FROM pg_class WHERE oid = ANY(%s::regclass[]) AND relreplident != 'f'",
+                (tables,)
+            )
+            for (table,) in cursor.fetchall():
+                try:
+                    cursor.execute(f"ALTER TABLE {table} REPLICA IDENTITY FULL")
+                except psycopg2.Error as e:
+                    raise RuntimeError(
+                        f"{table} no tiene REPLICA IDENTITY FULL y no se pudo configurar ({e}). "
+                        f"Ejecutar como dueño de la tabla: ALTER TABLE {table} REPLICA IDENTITY FULL"
+                    ) from e
+                print(f"🪪 {table}: REPLICA IDENTITY FULL")
+
+            lista_tablas = ", ".join(tables)
+            cursor.execute("SELECT 1 FROM pg_publication WHERE pubname = %s", (CDC_PUBLICATION,))
+            if cursor.fetchone() is None:
+                cursor.execute(f"CREATE PUBLICATION {CDC_PUBLICATION} FOR TABLE {lista_tablas}")
+            else:
+                cursor.execute(f"ALTER PUBLICATION {CDC_PUBLICATION} SET TABLE {lista_tablas}")
+            print(f"📣 Publicación {CDC_PUBLICATION}: {lista_tablas}")
+
+            cursor.execute("SELECT 1 FROM pg_replication_slots WHERE slot_name = %s", (CDC_SLOT,))
+            if cursor.fetchone() is None:
+                cursor.execute("SELECT pg_create_logical_replication_slot(%s, 'pgoutput')", (CDC_SLOT,))
+                print(f"🎰 Slot {CDC_SLOT} creado. Ejecutar ahora una carga completa de las tablas.")
+            else:
+                print(f"🎰 Slot {CDC_SLOT} ya existe")
+    finally:
+        source_conn.close()
+
+@dlt.resource(name="cdc_postgres")
+def cambios_postgres(
+    env: str,
+    tables: List[str],
+    primary_keys: Dict[str, str],
+    tamano_lote: int = 10000,
+    resumen: Optional[Dict[str, Any]] = None
+) -> Iterator[Any]:
+    """
+    Recurso dlt que entrega un micro-lote de cambios del slot, agrupado por tabla.
+
+    Al empezar confirma en el slot el LSN guardado en el estado (el del último lote que dlt
+    cargó) y luego lee, sin consumirlos, hasta tamano_lote cambios. El LSN del último commit
+    leído se guarda en el estado para confirmarlo en la próxima ejecución.
+
+    Args:
+        env (str): Entorno de ejecución
+        tables (List[str]): Tablas a capturar
+        primary_keys (Dict[str, str]): Clave primaria de cada tabla
+        tamano_lote (int): Cantidad aproximada de cambios por lote (se leen transacciones completas)
+        resumen (Dict[str, Any]): Diccionario opcional donde se informan filas por tabla y LSN del lote
+    """
+    state = dlt.current.resource_state()
+    resumen = resumen if resumen is not None else {}
+
+    source_conn = calidad_de_datos.get_db_connection(env)
+    source_conn.autocommit = True
+    try:
+        with source_conn.cursor() as cursor:
+            # Confirmar el lote anterior: el slot puede liberar el WAL hasta ese punto
+            lsn_confirmado = state.get('last_commit_lsn')
+            if lsn_confirmado is not None:
+                cursor.execute(
+                    """
+                    SELECT pg_replication_slot_advance(%s, %s::pg_lsn)
+                    FROM pg_replication_slots
+                    WHERE slot_name = %s AND confirmed_flush_lsn < %s::pg_lsn
+                    """,
+                    (CDC_SLOT, entero_a_lsn(lsn_confirmado), CDC_SLOT, entero_a_lsn(lsn_confirmado))
+                )
+
+            cursor.execute(
+                """
+                SELECT lsn::text, data
+                FROM pg_logical_slot_peek_binary_changes(
+                    %s, NULL, %s, 'proto_version', '1', 'publication_names', %s
+                )
+                """,
+                (CDC_SLOT, tamano_lote, CDC_PUBLICATION)
+            )
+            mensajes = cursor.fetchall()
+    finally:
+        source_conn.close()
+
+    filas, ultimo_commit_lsn = decodificar_cambios(mensajes, tables)
+    resumen['filas'] = {table: len(rows) for table, rows in filas.items()}
+    resumen['last_commit_lsn'] = ultimo_commit_lsn
+
+    for table, rows in filas.items():
+        yield dlt.mark.with_hints(
+            rows,
+            dlt.mark.make_hints(
+                table_name=table,
+                write_disposition="merge",
+                primary_key=primary_keys[table],
+                table_format="iceberg",
+                columns=[
+                    {"name": COLUMNA_BORRADO, "data_type": "bool", "hard_delete": True},
+                    {"name": COLUMNA_LSN, "data_type": "bigint", "dedup_sort": "desc"},
+                ]
+            ),
+            create_table_variant=True
+        )
+
+    if ultimo_commit_lsn is not None:
+        state['last_commit_lsn'] = ultimo_commit_lsn
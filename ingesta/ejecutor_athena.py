@@ -0,0 +1,161 @@
+"""
+Ejecución concurrente de consultas en Athena.
+
+pyathena ejecuta una consulta a la vez y espera a que termine, de modo que validar varias
+tablas tarda la suma de sus latencias (cola + ejecución). Este módulo envía las consultas
+con StartQueryExecution hasta un máximo de consultas en curso (el workgroup limita las
+consultas concurrentes de la cuenta), consulta el estado de todas las que están en curso
+con una sola llamada a BatchGetQueryExecution y lee el resultado de cada una apenas
+termina. El tiempo total se acerca al de la consulta más lenta.
+
+El cliente es cualquier objeto con la interfaz del cliente boto3 de Athena
+(start_query_execution, batch_get_query_execution, get_query_results), lo que permite
+ejecutarlo contra un cliente simulado (ver benchmark_ejecutor_athena.py).
+"""
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from pyathena.converter import DefaultTypeConverter
+
+# Consultas en curso como máximo; el límite de DML concurrentes por cuenta de Athena es de 20 a 25
+MAX_CONSULTAS_CONCURRENTES = 5
+# Espera entre consultas de estado: empieza corta y crece hasta el máximo mientras no termine ninguna
+ESPERA_INICIAL_S = 0.2
+ESPERA_MAXIMA_S = 2.0
+# Máximo de ids por llamada a BatchGetQueryExecution
+IDS_POR_LOTE = 50
+
+ESTADOS_FINALES = {'SUCCEEDED', 'FAILED', 'CANCELLED'}
+
+class ErrorConsultaAthena(Exception):
+    """Una consulta terminó en estado FAILED o CANCELLED."""
+
+def convertir_fila(fila: Dict[str, Any], columnas: List[Dict[str, Any]], conversor: DefaultTypeConverter) -> Tuple:
+    """
+    Convierte una fila de GetQueryResults (todos los valores como texto) a los tipos de Python.
+
+    Args:
+        fila (Dict): Fila con la clave 'Data' de GetQueryResults
+        columnas (List[Dict]): ColumnInfo de ResultSetMetadata
+        conversor (DefaultTypeConverter): Conversor de tipos de pyathena
+
+    Returns:
+        Tupla con los valores de la fila, igual que fetchone() de pyathena
+    """
+    return tuple(
+        conversor.convert(columna['Type'], dato.get('VarCharValue'))
+        for columna, dato in zip(columnas, fila['Data'])
+    )
+
+def leer_primera_fila(client: Any, query_execution_id: str, conversor: DefaultTypeConverter) -> Optional[Tuple]:
+    """
+    Lee la primera fila de resultado de una consulta terminada.
+
+    Args:
+        client: Cliente de Athena
+        query_execution_id (str): Id de la ejecución
+        conversor (DefaultTypeConverter): Conversor de tipos de pyathena
+
+    Returns:
+        Tupla con la primera fila, o None si la consulta no devolvió filas
+    """
+    # La primera fila de un SELECT son los nombres de las columnas
+    respuesta = client.get_query_results(QueryExecutionId=query_execution_id, MaxResults=2)
+    filas = respuesta['ResultSet']['Rows']
+    if len(filas) < 2:
+        return None
+    columnas = respuesta['ResultSet']['ResultSetMetadata']['ColumnInfo']
+    return convertir_fila(filas[1], columnas, conversor)
+
+def ejecutar_consultas(
+    client: Any,
+    consultas: Dict[Hashable, str],
+    work_group: str,
+    output_location: Optional[str] = None,
+    max_concurrentes: int = MAX_CONSULTAS_CONCURRENTES,
+    tiempos: Optional[Dict[Hashable, float]] = None,
+    estadisticas: Optional[Dict[Hashable, Dict[str, int]]] = None
+) -> Dict[Hashable, Any]:
+    """
+    Ejecuta consultas en Athena en paralelo y devuelve la primera fila de cada una.
+
+    Args:
+        client: Cliente de Athena (boto3 o con la misma interfaz)
+        consultas (Dict[Hashable, str]): Clave -> consulta SQL
+        work_group (str): Workgroup de Athena
+        output_location (str): Ubicación S3 de los resultados. Si es None, la del workgroup.
+        max_concurrentes (int): Consultas en curso como máximo
+        tiempos (Dict): Si se pasa, se completa con los segundos de cada consulta desde que se
+            envió hasta que se detectó su fin
+        estadisticas (Dict): Si se pasa, se completa con los bytes escaneados ('bytes') y el
+            tiempo de ejecución en el motor ('motor_ms') que informa Athena de cada consulta
+
+    Returns:
+        Dict clave -> primera fila (tupla o None), o la excepción si la consulta falló
+    """
+    conversor = DefaultTypeConverter()
+    pendientes = list(consultas.items())
+    en_curso: Dict[str, Hashable] = {}
+    results: Dict[Hashable, Any] = {}
+    espera = ESPERA_INICIAL_S
+    inicios: Dict[Hashable, float] = {}
+
+    while pendientes or en_curso:
+        # Completar los lugares libres con las consultas pendientes
+        while pendientes and len(en_curso) < max(1, max_concurrentes):
+            clave, query = pendientes.pop(0)
+            parametros = {'QueryString': query, 'WorkGroup': work_group}
+            if output_location:
+                parametros['ResultConfiguration'] = {'OutputLocation': output_location}
+            try:
+                inicios[clave] = time.perf_counter()
+                respuesta = client.start_query_execution(**parametros)
+                en_curso[respuesta['QueryExecutionId']] = clave
+            except Exception as e:
+                results[clave] = e
+
+        if not en_curso:
+            continue
+
+        time.sleep(espera)
+
+        # Estado de todas las consultas en curso, de a lotes de IDS_POR_LOTE
+        terminadas = 0
+        ids = list(en_curso)
+        for i in range(0, len(ids), IDS_POR_LOTE):
+            respuesta = client.batch_get_query_execution(QueryExecutionIds=ids[i:i + IDS_POR_LOTE])
+            for ejecucion in respuesta['QueryExecutions']:
+                estado = ejecucion['Status']['State']
+                if estado not in ESTADOS_FINALES:
+                    continue
+                query_execution_id = ejecucion['QueryExecutionId']
+                clave = en_curso.pop(query_execution_id)
+                terminadas += 1
+                if tiempos is not None:
+                    tiempos[clave] = time.perf_counter() - inicios[clave]
+                if estadisticas is not None:
+                    # También las consultas fallidas o canceladas cobran lo que escanearon
+                    estadisticas_consulta = ejecucion.get('Statistics', {})
+                    estadisticas[clave] = {
+                        'bytes': estadisticas_consulta.get('DataScannedInBytes', 0),
+                        'motor_ms': estadisticas_consulta.get('EngineExecutionTimeInMillis', 0)
+                    }
+                if estado == 'SUCCEEDED':
+                    try:
+                        results[clave] = leer_primera_fila(client, query_execution_id, conversor)
+                    except Exception as e:
+                        results[clave] = e
+                else:
+                    motivo = ejecucion['Status'].get('StateChangeReason', 'sin detalle')
+                    results[clave] = ErrorConsultaAthena(f"Consulta {estado}: {motivo}")
+            for query_execution_id in respuesta.get('UnprocessedQueryExecutionIds', []):
+                clave = en_curso.pop(query_execution_id['QueryExecutionId'])
+                results[clave] = ErrorConsultaAthena(
+                    f"No se pudo obtener el estado: {query_execution_id.get('ErrorMessage', 'sin detalle')}"
+                )
+                terminadas += 1
+
+        # Si terminó alguna hay lugar para enviar otra: volver a la espera corta
+        espera = ESPERA_INICIAL_S if terminadas else min(espera * 2, ESPERA_MAXIMA_S)
+
+    return results
@@ -0,0 +1,327 @@
+"""
+Historial de las validaciones de calidad de datos y detección de cambios de volumen anómalos.
+
+Cada ejecución de las validaciones agrega una fila por tabla (conteos, diferencia, duplicados,
+huérfanos, updated_at más reciente, segundos de la consulta y estado) a la tabla
+TABLA_HISTORIAL del destino, igual que las métricas de metricas_ingesta, para que el historial
+sobreviva a los contenedores de ECS. Sobre ese historial:
+- detectar_anomalias_volumen compara el cambio de filas del día de cada tabla con la media
+  y el desvío de los cambios diarios de los DIAS_VENTANA días anteriores, y marca los que
+  se alejan más de Z_ANOMALIA desvíos
+- consultar_historial y resumir_crecimiento permiten ver la evolución de cada tabla y
+  relacionar el tiempo de validación con su tamaño
+
+Uso:
+    python historial_validaciones.py --env prod
+    python historial_validaciones.py --env prod --tabla subscription_payments --dias 90
+"""
+import argparse
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import dlt
+
+import calidad_de_datos
+
+TABLA_HISTORIAL = "_validaciones_historial"
+
+# Días anteriores con los que se calcula la media y el desvío del cambio diario de filas
+DIAS_VENTANA = 14
+# Días con cambio mínimos para evaluar una tabla
+MIN_DIAS = 7
+# Desvíos a partir de los cuales un cambio diario es anómalo
+Z_ANOMALIA = 3.0
+
+# Orden de gravedad de los estados, para resumir todas las validaciones de una tabla
+GRAVEDAD_ESTADOS = {'SKIP': 0, 'OK': 1, 'WARNING': 2, 'ERROR': 3}
+
+def estado_tabla(results: Dict[str, Dict[str, Dict]], table: str) -> str:
+    """
+    Estado más grave entre todas las validaciones de una tabla.
+
+    Args:
+        results (Dict[str, Dict[str, Dict]]): Resultados de validar_tablas_combinado
+        table (str): Tabla
+
+    Returns:
+        str: 'OK', 'WARNING', 'ERROR' o 'SKIP'
+    """
+    estados = []
+    for validacion in results.values():
+        result = validacion.get(table, {})
+        if 'status' in result:
+            estados.append(result['status'])
+        else:
+            # Integridad referencial: un resultado por FK
+            estados.extend(fk_result['status'] for fk_result in result.values())
+    return max(estados, key=lambda estado: GRAVEDAD_ESTADOS.get(estado, 0), default='SKIP')
+
+def construir_registros(env: str, results: Dict[str, Dict[str, Dict]]) -> List[Dict[str, Any]]:
+    """
+    Arma una fila de historial por tabla a partir de los resultados de una ejecución.
+
+    Args:
+        env (str): Entorno de ejecución
+        results (Dict[str, Dict[str, Dict]]): Resultados de validar_tablas_combinado
+
+    Returns:
+        Lista de registros, uno por tabla validada
+    """
+    timestamp = datetime.now(timezone.utc).replace(tzinfo=None)
+    registros = []
+    for table, conteo in results['CONTEO'].items():
+        duplicados = results['DUPLICADOS'].get(table, {})
+        integridad = results['INTEGRIDAD REFERENCIAL'].get(table, {})
+        frescura = results['FRESCURA'].get(table, {})
+        huerfanos = [
+            fk_result['orphan_count'] for fk_result in integridad.values()
+            if isinstance(fk_result, dict) and 'orphan_count' in fk_result
+        ]
+        registros.append({
+            'timestamp': timestamp,
+            'env': env,
+            'table_name': table,
+            'source_count': conteo.get('source_count'),
+            'destination_count': conteo.get('destination_count'),
+            'difference': conteo.get('difference'),
+            'duplicate_count': duplicados.get('duplicate_count'),
+            'orphan_count': sum(huerfanos) if huerfanos else None,
+            'newest_update': frescura.get('newest_update'),
+            'query_s': conteo.get('query_s'),
+            'status': estado_tabla(results, table)
+        })
+    return registros
+
+def guardar_historial(pipeline: dlt.Pipeline, registros: List[Dict[str, Any]]):
+    """
+    Agrega los registros a la tabla TABLA_HISTORIAL del destino.
+
+    Args:
+        pipeline (dlt.Pipeline): Pipeline del entorno, con el que se cargan los registros
+        registros (List[Dict[str, Any]]): Registros de construir_registros
+    """
+    pipeline.run(
+        registros,
+        table_name=TABLA_HISTORIAL,
+        write_disposition="append",
+        columns={
+            'source_count': {'data_type': 'bigint', 'nullable': True},
+            'destination_count': {'data_type': 'bigint', 'nullable': True},
+            'difference': {'data_type': 'bigint', 'nullable': True},
+            'duplicate_count': {'data_type': 'bigint', 'nullable': True},
+            'orphan_count': {'data_type': 'bigint', 'nullable': True},
+            'newest_update': {'data_type': 'timestamp', 'nullable': True},
+            'query_s': {'data_type': 'double', 'nullable': True}
+        }
+    )
+
+def detectar_anomalias_volumen(
+    sesion: calidad_de_datos.SesionValidacion,
+    dias_ventana: int = DIAS_VENTANA,
+    z_anomalia: float = Z_ANOMALIA
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compara el último cambio diario de filas de cada tabla con los cambios de los días anteriores.
+
+    Se toma el último conteo del destino de cada día; el cambio diario es la diferencia con
+    el día anterior con datos. El último cambio se compara con la media y el desvío de los
+    dias_ventana cambios previos.
+
+    Args:
+        sesion (SesionValidacion): Sesión de validación del entorno
+        dias_ventana (int): Cambios diarios previos con los que se calcula la media y el desvío
+        z_anomalia (float): Desvíos a partir de los cuales el cambio es anómalo
+
+    Returns:
+        Dict tabla -> resultado con 'status' ('OK', 'WARNING' o 'SKIP'), el cambio, la media,
+        el desvío y z
+    """
+    rows = sesion.execute_destination_all(f"""
+        WITH diario AS (
+            SELECT table_name, CAST("timestamp" AS DATE) AS dia, max_by(destination_count, "timestamp") AS filas
+            FROM "{sesion.dataset_name}"."{TABLA_HISTORIAL}"
+            WHERE status != 'ERROR'
+            GROUP BY table_name, CAST("timestamp" AS DATE)
+        )
+        SELECT table_name, dia, filas - LAG(filas) OVER (PARTITION BY table_name ORDER BY dia) AS cambio
+        FROM diario
+        ORDER BY table_name, dia
+    """, 'historial')
+
+    cambios: Dict[str, List[tuple]] = {}
+    for table, dia, cambio in rows:
+        if cambio is not None:
+            cambios.setdefault(table, []).append((dia, cambio))
+
+    results = {}
+    for table, serie in cambios.items():
+        dia, cambio = serie[-1]
+        previos = [c for _, c in serie[:-1]][-dias_ventana:]
+        if len(previos) < MIN_DIAS:
+            results[table] = {
+                'status': 'SKIP',
+                'message': f'Historial insuficiente ({len(previos)} de {MIN_DIAS} días)'
+            }
+            continue
+        media = sum(previos) / len(previos)
+        desvio = math.sqrt(sum((c - media) ** 2 for c in previos) / (len(previos) - 1))
+        if desvio == 0:
+            z = 0.0 if cambio == media else math.inf
+        else:
+            z = (cambio - media) / desvio
+        results[table] = {
+            'status': 'WARNING' if abs(z) > z_anomalia else 'OK',
+            'dia': dia,
+            'cambio': cambio,
+            'media': media,
+            'desvio': desvio,
+            'z': z
+        }
+    return results
+
+def consultar_historial(
+    sesion: calidad_de_datos.SesionValidacion,
+    tabla: Optional[str] = None,
+    dias: int = 30
+) -> List[tuple]:
+    """
+    Devuelve el historial de las validaciones de los últimos días.
+
+    Args:
+        sesion (SesionValidacion): Sesión de validación del entorno
+        tabla (str): Tabla a consultar. Si es None, todas.
+        dias (int): Días hacia atrás
+
+    Returns:
+        Lista de filas (timestamp, tabla, filas en destino, cambio respecto de la validación
+        anterior, segundos de la consulta, estado)
+    """
+    filtro_tabla = f"AND table_name = '{tabla.replace(chr(39), chr(39) * 2)}'" if tabla else ""
+    return sesion.execute_destination_all(f"""
+        SELECT
+            "timestamp",
+            table_name,
+            destination_count,
+            destination_count - LAG(destination_count) OVER (PARTITION BY table_name ORDER BY "timestamp"),
+            query_s,
+            status
+        FROM "{sesion.dataset_name}"."{TABLA_HISTORIAL}"
+        WHERE "timestamp" >= current_timestamp - INTERVAL '{int(dias)}' DAY
+            {filtro_tabla}
+        ORDER BY table_name, "timestamp"
+    """, 'historial')
+
+def resumir_crecimiento(sesion: calidad_de_datos.SesionValidacion, dias: int = 30) -> List[tuple]:
+    """
+    Relaciona, por tabla, el tiempo de validación con la cantidad de filas en los últimos días.
+
+    Args:
+        sesion (SesionValidacion): Sesión de validación del entorno
+        dias (int): Días hacia atrás
+
+    Returns:
+        Lista de filas (tabla, validaciones, filas al inicio, filas al final, segundos al inicio,
+        segundos al final, correlación entre filas y segundos, segundos por millón de filas
+        según la regresión lineal)
+    """
+    return sesion.execute_destination_all(f"""
+        SELECT
+            table_name,
+            COUNT(*),
+            min_by(destination_count, "timestamp"),
+            max_by(destination_count, "timestamp"),
+            min_by(query_s, "timestamp"),
+            max_by(query_s, "timestamp"),
+            corr(query_s, destination_count),
+            regr_slope(query_s, destination_count) * 1000000
+        FROM "{sesion.dataset_name}"."{TABLA_HISTORIAL}"
+        WHERE "timestamp" >= current_timestamp - INTERVAL '{int(dias)}' DAY
+        GROUP BY table_name
+        ORDER BY table_name
+    """, 'historial')
+
+def registrar_historial(
+    pipeline: dlt.Pipeline,
+    sesion: calidad_de_datos.SesionValidacion,
+    env: str,
+    results: Dict[str, Dict[str, Dict]]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Agrega los resultados de una ejecución al historial y detecta cambios de volumen anómalos.
+
+    Un error al escribir o leer el historial se informa pero no hace fallar la validación.
+
+    Args:
+        pipeline (dlt.Pipeline): Pipeline del entorno, con el que se cargan los registros
+        sesion (SesionValidacion): Sesión de validación del entorno, con la que se lee el historial
+        env (str): Entorno de ejecución
+        results (Dict[str, Dict[str, Dict]]): Resultados de validar_tablas_combinado
+
+    Returns:
+        Resultado de detectar_anomalias_volumen, o vacío si no se pudo registrar
+    """
+    try:
+        guardar_historial(pipeline, construir_registros(env, results))
+        print(f"🗃️ Resultados agregados al historial {TABLA_HISTORIAL}")
+        return detectar_anomalias_volumen(sesion)
+    except Exception as e:
+        print(f"⚠️ No se pudo actualizar el historial de validaciones {TABLA_HISTORIAL}: {e}")
+        return {}
+
+def mostrar_resumen_anomalias(results: Dict[str, Dict[str, Any]]):
+    """
+    Muestra un resumen de la detección de cambios de volumen anómalos.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): Resultados de detectar_anomalias_volumen
+    """
+    print("\n" + "=" * 50)
+    print("📉 RESUMEN DE VOLUMEN DIARIO")
+    print("=" * 50)
+
+    for table, result in results.items():
+        if result['status'] == 'SKIP':
+            print(f"  ⏭️ {table}: {result['message']}")
+            continue
+        icono = "✅" if result['status'] == 'OK' else "⚠️"
+        print(
+            f"  {icono} {table}: {result['cambio']:+,} filas el {result['dia']} "
+            f"(media {result['media']:+,.0f}, desvío {result['desvio']:,.0f}, z={result['z']:+.1f})"
+        )
+
+    print("=" * 50)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Historial de las validaciones de calidad de datos')
+    parser.add_argument('--env', choices=['local', 'dev', 'prod'], default='local',
+                      help='Entorno de ejecución (local, dev o prod). Por defecto es local.')
+    parser.add_argument('--tabla',
+                      help='Mostrar el detalle de una sola tabla. Por defecto se muestran todas.')
+    parser.add_argument('--dias', type=int, default=30,
+                      help='Días hacia atrás a consultar. Por defecto es 30.')
+    args = parser.parse_args()
+
+    with calidad_de_datos.SesionValidacion(args.env) as sesion:
+        historial = consultar_historial(sesion, args.tabla, args.dias)
+        crecimiento = resumir_crecimiento(sesion, args.dias)
+
+    print("\n" + "=" * 90)
+    print(f"🗃️ HISTORIAL DE VALIDACIONES ({args.env}, últimos {args.dias} días)")
+    print("=" * 90)
+    for timestamp, table, filas, cambio, query_s, status in historial:
+        cambio_texto = f"{cambio:+,}" if cambio is not None else "-"
+        segundos = f"{query_s:.2f} s" if query_s is not None else "-"
+        print(f"  {timestamp:%Y-%m-%d %H:%M}  {table:<28} {filas or 0:>14,} {cambio_texto:>12}  {segundos:>9}  {status}")
+
+    print("\n" + "=" * 90)
+    print("📈 TIEMPO DE VALIDACIÓN VS. TAMAÑO")
+    print("=" * 90)
+    for table, n, filas_desde, filas_hasta, s_desde, s_hasta, correlacion, pendiente in crecimiento:
+        correlacion_texto = f"{correlacion:+.2f}" if correlacion is not None else "-"
+        pendiente_texto = f"{pendiente:.3f} s/M filas" if pendiente is not None else "-"
+        print(
+            f"  {table:<28} {n:>4} validaciones  filas {filas_desde or 0:,} → {filas_hasta or 0:,}  "
+            f"segundos {s_desde or 0:.2f} → {s_hasta or 0:.2f}  corr {correlacion_texto}  {pendiente_texto}"
+        )
+    print("=" * 90)
@@ -1,57 +1,564 @@
 import dlt
 import argparse
 import os
-from dlt.sources.sql_database import sql_database
+import re
+import time
+from dlt.sources.sql_database import sql_table
+from dlt.destinations.adapters import athena_adapter, athena_partition
 from dlt.common.pipeline import get_dlt_pipelines_dir
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 import calidad_de_datos
+import cdc_postgres
+import ejecutor_athena
+import historial_validaciones
+import mantenimiento_iceberg
+import metricas_ingesta
+import reconciliacion
+import reflexion_origen
+
+# Estrategias de carga por tabla:
+# - replace: full refresh en cada ejecución
+# - merge-on-updated_at: solo filas con cursor_column (updated_at) mayor al último cargado, merge por primary_key
+# - append-on-pk: solo filas con clave primaria mayor a la última cargada (tablas que solo crecen)
+ESTRATEGIAS = ["replace", "merge-on-updated_at", "append-on-pk"]
 
 # Definir las tablas por defecto como constante global
+# strategy: una de ESTRATEGIAS
+# cursor_column: columna que usa el incremental de dlt (no aplica a replace)
+# primary_key: clave primaria, usada para merge y para particionar por rangos
+# lookback: ventana que se vuelve a leer en cada carga incremental (lag de dlt). Segundos para
+#     cursores de fecha, cantidad de claves para cursores numéricos. Con append-on-pk y lookback
+#     la tabla se carga con merge para no duplicar las claves releídas.
+# pk_ranges: en full refresh, cantidad de rangos de clave primaria que se leen en paralelo
+# fingerprint_hash: agrega a la huella de la tabla un hash de todas sus filas (solo tablas chicas),
+#     para detectar también updates en tablas sin updated_at
+# partition: particionado de la tabla Iceberg en Athena, como lista de columnas o transformaciones
+#     year/month/day/hour(columna), bucket(n, columna) o truncate(n, columna). Se aplica al crear
+#     la tabla, así que una tabla existente hay que eliminarla y recargarla para particionarla.
+# chunk_size: filas por lote leído del origen (por defecto CHUNK_SIZE_POR_DEFECTO). Con --memoria-mb
+#     se achica si el lote no entra en el presupuesto de memoria
 DEFAULT_TABLES = {
-    "accounts": False,
-    "accounts_subscription": False,
-    "subscriptions": False,
-    "contents": True,
-    "content_attributes": True,
-    "premium_features": False,
-    "account_premium_features": False,
-    "subscription_payments": False
+    "accounts": {"strategy": "replace", "primary_key": "account_id"},
+    "accounts_subscription": {"strategy": "replace", "primary_key": "account_subscription_id", "pk_ranges": 4},
+    "subscriptions": {"strategy": "replace", "primary_key": "subscription_id", "fingerprint_hash": True},
+    "contents": {
+        "strategy": "merge-on-updated_at",
+        "cursor_column": "updated_at",
+        "primary_key": "content_id",
+        "lookback": 3600,
+        "partition": ["month(created_at)"],
+        "chunk_size": 20000  # filas anchas (description es TEXT)
+    },
+    "content_attributes": {
+        "strategy": "merge-on-updated_at",
+        "cursor_column": "updated_at",
+        "primary_key": "attribute_id",
+        "lookback": 3600
+    },
+    "premium_features": {"strategy": "replace", "primary_key": "feature_id", "fingerprint_hash": True},
+    "account_premium_features": {
+        "strategy": "append-on-pk",
+        "cursor_column": "account_feature_id",
+        "primary_key": "account_feature_id",
+        "partition": ["month(purchase_date)"]
+    },
+    "subscription_payments": {
+        "strategy": "append-on-pk",
+        "cursor_column": "payment_id",
+        "primary_key": "payment_id",
+        "pk_ranges": 4,
+        "partition": ["month(payment_date)"]
+    }
 }
 
-def carga_datos(
-    env: str = 'local',
-    full_refresh_tables: Optional[Dict[str, bool]] = None,
-    tables: Optional[List[str]] = None
-) -> None:
+# Backends de extracción soportados por sql_table:
+# - sqlalchemy: filas como diccionarios de Python, normalizadas por dlt
+# - pyarrow / connectorx: lotes de Arrow que se escriben directo a parquet
+BACKENDS = ["sqlalchemy", "pyarrow", "connectorx"]
+
+# Lotes de lectura del origen. dlt lee cada tabla con un cursor del lado del servidor, de a
+# chunk_size filas, así que la memoria de la extracción depende del lote y no del tamaño de la tabla.
+CHUNK_SIZE_POR_DEFECTO = 50000
+CHUNK_SIZE_MINIMO = 1000
+# Bytes en memoria por byte de fila en el origen, según el backend: con sqlalchemy cada valor
+# es un objeto de Python (tupla y luego diccionario); con Arrow las columnas son contiguas
+FACTOR_MEMORIA_BACKEND = {"sqlalchemy": 8, "pyarrow": 3, "connectorx": 3}
+# Memoria del proceso antes de leer datos (intérprete, dlt, pyarrow, SQLAlchemy y drivers),
+# medida con benchmark_memoria.py: ningún lote la achica
+MEMORIA_BASE_MB = 170
+# Memoria que agrega normalize sobre la que queda de la extracción: el archivo intermedio que
+# lee y el buffer del parquet que escribe. Con más de un worker, cada proceso hijo la suma a
+# su propia memoria base
+MEMORIA_NORMALIZE_MB = 64
+# Lotes de una tabla en memoria a la vez por hilo de extracción: el que se está leyendo y el
+# anterior, que espera en el buffer del writer de dlt hasta escribirse
+LOTES_EN_MEMORIA_POR_HILO = 2
+# Presupuesto mínimo que la ingesta puede respetar, medido con benchmark_memoria.py: con 256 MB
+# y lotes de 14.000 filas el pico de la carga llegó a 271 MB, casi todo memoria base
+MEMORIA_MINIMA_MB = 288
+# Filas por archivo intermedio de extract y normalize: normalize y load procesan un archivo a la vez
+FILAS_POR_ARCHIVO = 100000
+
+# Validaciones de calidad de datos: (nombre, función de validación, función de resumen)
+VALIDACIONES = [
+    ("CONTEO", calidad_de_datos.validar_conteo_tablas, calidad_de_datos.mostrar_resumen_conteo),
+    ("DUPLICADOS", calidad_de_datos.validar_duplicados_tablas, calidad_de_datos.mostrar_resumen_duplicados),
+    ("INTEGRIDAD REFERENCIAL", calidad_de_datos.validar_integridad_referencial_tablas, calidad_de_datos.mostrar_resumen_integridad_referencial),
+    ("FRESCURA", calidad_de_datos.validar_freshness_tablas, calidad_de_datos.mostrar_resumen_freshness),
+    ("VALORES ACEPTADOS", calidad_de_datos.validar_valores_aceptados_tablas, calidad_de_datos.mostrar_resumen_valores_aceptados)
+]
+
+# Clave del estado de la fuente donde se guardan las huellas de las tablas cargadas
+ESTADO_HUELLAS = "huellas_origen"
+
+def calcular_rangos_clave_primaria(env: str, table: str, pk_column: str, particiones: int) -> List[Tuple[int, int]]:
     """
-    Carga datos de las tablas especificadas, permitiendo carga incremental o full refresh.
+    Divide el rango de la clave primaria de una tabla origen en rangos contiguos.
     
     Args:
-        env (str): Entorno de ejecución ('local', 'dev' o 'prod'). Por defecto es 'local'.
-        full_refresh_tables (Dict[str, bool]): Diccionario con las tablas que se cargarán en modo full refresh.
-            Ejemplo: {"contents": True, "content_attributes": False}
-            Si es None, todas las tablas se cargan incrementalmente.
-        tables (List[str]): Lista de tablas a cargar. Si es None, se cargan todas las tablas disponibles.
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        table (str): Nombre de la tabla origen
+        pk_column (str): Columna de clave primaria (entera)
+        particiones (int): Cantidad de rangos deseada
+        
+    Returns:
+        Lista de rangos (desde, hasta) con límite inferior inclusivo y superior exclusivo.
+        Lista vacía si la tabla está vacía o la clave no es entera.
+    """
+    source_conn = calidad_de_datos.get_db_connection(env)
+    try:
+        with source_conn.cursor() as cursor:
+            cursor.execute(f"SELECT MIN({pk_column}), MAX({pk_column}) FROM {table}")
+            min_pk, max_pk = cursor.fetchone()
+    finally:
+        source_conn.close()
+    
+    if not isinstance(min_pk, int) or not isinstance(max_pk, int):
+        return []
+    
+    # El último rango termina en max + 1 para incluir la clave máxima
+    ancho = max(1, -(-(max_pk - min_pk + 1) // particiones))
+    return [
+        (desde, min(desde + ancho, max_pk + 1))
+        for desde in range(min_pk, max_pk + 1, ancho)
+    ]
+
+def filtrar_rango_clave_primaria(pk_column: str, desde: int, hasta: int) -> Callable[[Any, Any], Any]:
+    """
+    Crea un query_adapter_callback de sql_table que limita la consulta a un rango de clave primaria.
+    
+    Args:
+        pk_column (str): Columna de clave primaria
+        desde (int): Límite inferior (inclusivo)
+        hasta (int): Límite superior (exclusivo)
+        
+    Returns:
+        Función que recibe la consulta y la tabla de SQLAlchemy y devuelve la consulta filtrada
+    """
+    def _filtrar(query, table):
+        columna = table.c[pk_column]
+        return query.where(columna >= desde).where(columna < hasta)
+    
+    return _filtrar
+
+def crear_recursos_particionados(
+    table: str,
+    pk_column: str,
+    rangos: List[Tuple[int, int]],
+    backend: str = 'sqlalchemy',
+    chunk_size: int = CHUNK_SIZE_POR_DEFECTO,
+    metadata: Optional[Any] = None
+) -> List[Any]:
+    """
+    Crea un recurso sql_table por rango de clave primaria, todos escribiendo en la misma tabla destino.
+    
+    Cada recurso abre su propia conexión al origen y se marca como paralelizable,
+    por lo que los rangos se leen al mismo tiempo.
+    
+    Args:
+        table (str): Nombre de la tabla origen y destino
+        pk_column (str): Columna de clave primaria
+        rangos (List[Tuple[int, int]]): Rangos (desde, hasta) calculados con calcular_rangos_clave_primaria
+        backend (str): Backend de extracción (ver BACKENDS)
+        chunk_size (int): Filas por lote leído del origen
+        metadata (sqlalchemy.MetaData): Tablas ya reflejadas (ver reflexion_origen). Si no
+            contiene la tabla, cada recurso la refleja al extraer.
+        
+    Returns:
+        Lista de recursos dlt
+    """
+    recursos = []
+    for i, (desde, hasta) in enumerate(rangos):
+        recurso = sql_table(
+            table=table,
+            defer_table_reflect=True,
+            query_adapter_callback=filtrar_rango_clave_primaria(pk_column, desde, hasta),
+            backend=backend,
+            chunk_size=chunk_size,
+            metadata=metadata,
+            write_disposition="replace"
+        ).with_name(f"{table}__rango_{i}")
+        recurso.apply_hints(table_name=table)
+        recursos.append(recurso.parallelize())
+    
+    return recursos
+
+def estimar_tamano_tablas(env: str, tables: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Estima la cantidad de filas y los bytes por fila de las tablas origen con las estadísticas
+    de PostgreSQL (pg_class), sin recorrer las tablas.
+    
+    Args:
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        tables (List[str]): Tablas origen
+        
+    Returns:
+        Dict tabla -> {'filas', 'bytes_por_fila'}. Las tablas sin estadísticas (nunca analizadas)
+        se informan con 0 filas y 1 KB por fila.
+    """
+    source_conn = calidad_de_datos.get_db_connection(env)
+    try:
+        with source_conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT c.relname, c.reltuples, pg_table_size(c.oid)
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.relname = ANY(%s) AND c.relkind = 'r' AND n.nspname = current_schema()
+                """,
+                (tables,)
+            )
+            estadisticas = cursor.fetchall()
+    finally:
+        source_conn.close()
+    
+    tamanos = {table: {'filas': 0, 'bytes_por_fila': 1024.0} for table in tables}
+    for table, filas, bytes_tabla in estadisticas:
+        if filas > 0:
+            tamanos[table] = {'filas': filas, 'bytes_por_fila': bytes_tabla / filas}
+    return tamanos
+
+def calcular_lotes_lectura(
+    env: str,
+    tables: List[str],
+    backend: str,
+    memoria_mb: Optional[int] = None,
+    hilos: int = 1
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Define el chunk_size y el backend con que se lee cada tabla.
+    
+    Sin presupuesto de memoria se usa el chunk_size de DEFAULT_TABLES. Con presupuesto, el lote
+    de cada tabla se achica para que LOTES_EN_MEMORIA_POR_HILO lotes de cada hilo de extracción
+    entren en lo que queda después de la memoria base del proceso y de la normalización
+    (MEMORIA_BASE_MB y MEMORIA_NORMALIZE_MB). Como connectorx lee la tabla completa sin
+    respetar chunk_size, las tablas que no entran en el presupuesto se leen con pyarrow.
+    
+    Args:
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        tables (List[str]): Tablas a cargar
+        backend (str): Backend de extracción pedido (ver BACKENDS)
+        memoria_mb (int): Presupuesto de memoria del proceso en MB. Si es None no se limita.
+        hilos (int): Hilos de extracción que leen lotes al mismo tiempo
+        
+    Returns:
+        Dict tabla -> {'chunk_size', 'backend'}
+    """
+    lotes = {
+        table: {'chunk_size': DEFAULT_TABLES.get(table, {}).get("chunk_size", CHUNK_SIZE_POR_DEFECTO), 'backend': backend}
+        for table in tables
+    }
+    if memoria_mb is None or not tables:
+        return lotes
+    
+    if memoria_mb < MEMORIA_MINIMA_MB:
+        print(f"⚠️ --memoria-mb {memoria_mb} es menor que el mínimo medido ({MEMORIA_MINIMA_MB} MB): "
+              f"la memoria pico va a superar el presupuesto aunque se lean lotes chicos")
+    memoria_lotes_mb = memoria_mb - MEMORIA_BASE_MB - MEMORIA_NORMALIZE_MB
+    memoria_por_hilo = max(0, memoria_lotes_mb) * 1024 * 1024 / (LOTES_EN_MEMORIA_POR_HILO * max(1, hilos))
+    for table, tamano in estimar_tamano_tablas(env, tables).items():
+        lote = lotes[table]
+        if backend == 'connectorx' and tamano['filas'] * tamano['bytes_por_fila'] * FACTOR_MEMORIA_BACKEND[backend] > memoria_por_hilo:
+            print(f"⚠️ {table}: no entra en memoria con connectorx (lee la tabla completa), se lee con pyarrow")
+            lote['backend'] = 'pyarrow'
+        limite = int(memoria_por_hilo / (tamano['bytes_por_fila'] * FACTOR_MEMORIA_BACKEND[lote['backend']]))
+        chunk_size = max(CHUNK_SIZE_MINIMO, min(lote['chunk_size'], limite))
+        if chunk_size < lote['chunk_size']:
+            print(f"🧮 {table}: lotes de {chunk_size:,} filas (~{tamano['bytes_por_fila']:.0f} bytes por fila)")
+        lote['chunk_size'] = chunk_size
+    
+    return lotes
+
+def configurar_limites_memoria(memoria_mb: int, hilos: int):
+    """
+    Configura dlt para que extract, normalize y load trabajen con memoria acotada.
+    
+    - extract: como máximo un lote en curso por hilo; la extracción espera a que se escriba
+      un lote antes de leer el siguiente
+    - extract y normalize: archivos intermedios de FILAS_POR_ARCHIVO filas, de modo que
+      normalize y load procesan archivos chicos en lugar de uno por tabla
+    - load: un job en paralelo cada 256 MB del presupuesto
+    
+    Args:
+        memoria_mb (int): Presupuesto de memoria del proceso en MB
+        hilos (int): Hilos de extracción
     """
+    dlt.config["extract.max_parallel_items"] = max(1, hilos)
+    dlt.config["extract.data_writer.file_max_items"] = FILAS_POR_ARCHIVO
+    dlt.config["normalize.data_writer.file_max_items"] = FILAS_POR_ARCHIVO
+    dlt.config["load.workers"] = max(1, memoria_mb // 256)
+
+def calcular_workers_normalize(memoria_mb: Optional[int], workers: int) -> int:
+    """
+    Define cuántos procesos de normalize entran en el presupuesto de memoria.
+    
+    Con más de un worker dlt normaliza en procesos hijos, y cada uno ocupa su propia memoria
+    base además de la normalización (MEMORIA_BASE_MB + MEMORIA_NORMALIZE_MB).
+    
+    Args:
+        memoria_mb (int): Presupuesto de memoria del proceso en MB. Si es None no se limita.
+        workers (int): Workers de normalize pedidos
+        
+    Returns:
+        Cantidad de workers de normalize, entre 1 y workers
+    """
+    if memoria_mb is None or workers <= 1:
+        return workers
+    
+    entran = max(1, (memoria_mb - MEMORIA_BASE_MB) // (MEMORIA_BASE_MB + MEMORIA_NORMALIZE_MB))
+    if entran < workers:
+        print(f"🧮 normalize: {entran} procesos en lugar de {workers} para entrar en {memoria_mb} MB")
+    return min(workers, entran)
+
+@dlt.source(name="sql_database")
+def fuente_datavision(recursos: List[Any]) -> List[Any]:
+    """
+    Fuente dlt con los recursos de las tablas a cargar.
+    
+    Reemplaza a sql_database para poder leer cada tabla con su propio chunk_size y backend;
+    conserva su nombre para que el esquema y el estado de las cargas anteriores sigan valiendo.
+    
+    Args:
+        recursos (List[Any]): Recursos sql_table y de estado
+        
+    Returns:
+        Los mismos recursos
+    """
+    return recursos
+
+def aplicar_estrategia_incremental(table_resource: Any, spec: Dict[str, Any]):
+    """
+    Aplica a un recurso sql_table el incremental y el write_disposition de su estrategia.
+    
+    Args:
+        table_resource: Recurso dlt de la tabla
+        spec (Dict[str, Any]): Configuración de la tabla en DEFAULT_TABLES
+    """
+    strategy = spec["strategy"]
+    if strategy not in ESTRATEGIAS or strategy == "replace":
+        raise ValueError(f"Estrategia incremental no soportada: {strategy}")
+    
+    # La clave primaria solo crece: no hace falta releer el último valor (range_start abierto).
+    # Con el rango abierto dlt descarta las filas menores al máximo ya visto en la misma
+    # ejecución, por lo que la consulta tiene que ordenar por la clave (row_order)
+    if strategy == "append-on-pk":
+        incremental = dlt.sources.incremental(
+            spec["cursor_column"], lag=spec.get("lookback"), range_start="open", row_order="asc"
+        )
+    else:
+        incremental = dlt.sources.incremental(spec["cursor_column"], lag=spec.get("lookback"))
+    
+    # append-on-pk con lookback también usa merge para deduplicar las claves releídas
+    if strategy == "merge-on-updated_at" or spec.get("lookback"):
+        # Merge en Athena requiere tablas Iceberg
+        table_resource.apply_hints(
+            table_format="iceberg",
+            incremental=incremental,
+            primary_key=spec["primary_key"],
+            write_disposition="merge"
+        )
+    else:
+        table_resource.apply_hints(
+            incremental=incremental,
+            primary_key=spec["primary_key"],
+            write_disposition="append"
+        )
+
+def convertir_particion(expresion: str) -> Union[str, Any]:
+    """
+    Convierte una expresión de partición de DEFAULT_TABLES al formato de athena_adapter.
+    
+    Args:
+        expresion (str): Columna ('account_id') o transformación ('month(payment_date)', 'bucket(16, account_id)')
+        
+    Returns:
+        El nombre de la columna o la transformación de athena_partition
+        
+    Raises:
+        ValueError: Si la transformación no es una de las que soporta Iceberg en Athena
+    """
+    match = re.fullmatch(r"\s*(\w+)\s*\(\s*(?:(\d+)\s*,\s*)?(\w+)\s*\)\s*", expresion)
+    if match is None:
+        return expresion.strip()
+    
+    transformacion, argumento, columna = match.groups()
+    if transformacion in ("year", "month", "day", "hour") and argumento is None:
+        return getattr(athena_partition, transformacion)(columna)
+    if transformacion in ("bucket", "truncate") and argumento is not None:
+        return getattr(athena_partition, transformacion)(int(argumento), columna)
+    raise ValueError(f"Partición no soportada: {expresion}")
+
+def aplicar_particion_destino(table_resource: Any, spec: Dict[str, Any]):
+    """
+    Aplica a un recurso el particionado de su tabla en el destino, si la tabla lo define.
+    
+    Athena solo particiona tablas Iceberg, por eso la tabla se crea con table_format iceberg.
+    En DuckDB ambas indicaciones se ignoran.
+    
+    Args:
+        table_resource: Recurso dlt de la tabla
+        spec (Dict[str, Any]): Configuración de la tabla en DEFAULT_TABLES
+    """
+    if not spec.get("partition"):
+        return
+    table_resource.apply_hints(table_format="iceberg")
+    athena_adapter(table_resource, partition=[convertir_particion(expresion) for expresion in spec["partition"]])
+
+def registrar_tiempos_tabla(table: str, tiempos: Dict[str, Dict[str, float]], inicio: float) -> Callable[[Any], Any]:
+    """
+    Crea un paso de mapeo que registra cuándo llega el primer y el último lote de una tabla.
+    
+    Los tiempos se guardan en segundos desde el inicio de la extracción, de modo que
+    en modo paralelo se puede ver qué tablas se solaparon y cuál fue la más lenta.
+    
+    Args:
+        table (str): Nombre de la tabla
+        tiempos (Dict[str, Dict[str, float]]): Diccionario compartido donde se acumulan los tiempos
+        inicio (float): Marca de tiempo (time.perf_counter) del inicio de la extracción
+        
+    Returns:
+        Función para usar con add_map que devuelve los datos sin modificarlos
+    """
+    def _registrar(item: Any) -> Any:
+        ahora = time.perf_counter() - inicio
+        tiempos_tabla = tiempos.setdefault(table, {'primer_lote_s': ahora})
+        tiempos_tabla['ultimo_lote_s'] = ahora
+        tiempos_tabla['duracion_s'] = ahora - tiempos_tabla['primer_lote_s']
+        return item
+    
+    return _registrar
+
+def calcular_huella_tabla(env: str, table: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Calcula una huella barata de una tabla origen para saber si cambió desde la última carga.
+    
+    La huella se compone de la cantidad de filas, la clave primaria máxima, el updated_at
+    máximo (si la tabla lo tiene) y, si la tabla tiene fingerprint_hash, un md5 de todas las filas.
+    
+    Args:
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        table (str): Nombre de la tabla origen
+        spec (Dict[str, Any]): Configuración de la tabla en DEFAULT_TABLES
+        
+    Returns:
+        Dict con los componentes de la huella como texto (para guardarla en el estado de dlt)
+    """
+    pk_column = spec["primary_key"]
+    source_conn = calidad_de_datos.get_db_connection(env)
+    try:
+        with source_conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM information_schema.columns WHERE table_name = %s AND column_name = 'updated_at'",
+                (table,)
+            )
+            tiene_updated_at = cursor.fetchone() is not None
+            
+            columnas = [
+                "COUNT(*)",
+                f"MAX({pk_column})",
+                "MAX(updated_at)" if tiene_updated_at else "NULL",
+                f"md5(string_agg(md5(t::text), '' ORDER BY {pk_column}))" if spec.get("fingerprint_hash") else "NULL"
+            ]
+            cursor.execute(f"SELECT {', '.join(columnas)} FROM {table} AS t")
+            filas, max_pk, max_updated_at, hash_filas = cursor.fetchone()
+    finally:
+        source_conn.close()
+    
+    return {
+        'filas': str(filas),
+        'max_pk': str(max_pk),
+        'max_updated_at': str(max_updated_at),
+        'hash': hash_filas
+    }
+
+@dlt.resource(name="cursores_particionados")
+def guardar_cursores(cursores: Dict[str, Tuple[str, Any]]) -> Iterator[Any]:
+    """
+    Recurso dlt sin filas que registra el cursor incremental de las tablas recargadas por rangos.
+    
+    Los rangos se extraen con recursos propios (tabla__rango_i), por lo que el incremental
+    de la tabla no guarda su último valor. Se escribe en el estado del recurso de la tabla
+    con el mismo formato que usa dlt, para que la próxima carga incremental continúe desde ahí.
+    
+    Args:
+        cursores (Dict[str, Tuple[str, Any]]): Tabla -> (columna cursor, último valor cargado)
+    """
+    for table, (cursor_column, valor) in cursores.items():
+        dlt.current.resource_state(table).setdefault("incremental", {})[cursor_column] = {
+            "initial_value": None,
+            "last_value": valor,
+            "unique_hashes": []
+        }
+    yield from ()
+
+@dlt.resource(name="huellas_origen")
+def guardar_huellas(huellas: Dict[str, Dict[str, Any]]) -> Iterator[Any]:
+    """
+    Recurso dlt sin filas que guarda las huellas de las tablas en el estado de la fuente.
+    
+    El estado viaja en el mismo paquete que los datos, por lo que las huellas
+    solo quedan registradas en el destino cuando la carga termina bien.
+    
+    Args:
+        huellas (Dict[str, Dict[str, Any]]): Huella de cada tabla cargada
+    """
+    dlt.current.source_state().setdefault(ESTADO_HUELLAS, {}).update(huellas)
+    yield from ()
+
+def crear_pipeline(env: str = 'local', dev_mode: Optional[bool] = None) -> dlt.Pipeline:
+    """
+    Crea el pipeline de dlt con el destino, dataset y directorio de trabajo del entorno.
+    
+    Args:
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        dev_mode (bool): Fuerza el modo desarrollo de dlt. Si es None, solo 'local' usa dev_mode.
+        
+    Returns:
+        dlt.Pipeline: Pipeline configurado
+    """
+    # Configurar directorio específico para el entorno, ver https://dlthub.com/docs/general-usage/pipeline#pipeline-working-directory
+    pipelines_dir = os.path.join(get_dlt_pipelines_dir(), env)
+    
     # Determinar el destino según el entorno
     if env == 'local':
-        destination = 'duckdb'
+        # Mismo archivo que abre calidad_de_datos.get_destination_connection
+        destination = dlt.destinations.duckdb(os.path.join(pipelines_dir, 'datavision.duckdb'))
         dataset_name = 'raw_datavision_local'
-        dev_mode = True  # Modo desarrollo para experimentación
+        entorno_dev_mode = True  # Modo desarrollo para experimentación
     elif env == 'dev':
         destination = 'athena'
         dataset_name = 'raw_datavision_dev'
-        dev_mode = False  # Modo producción, sin reset automático
+        entorno_dev_mode = False  # Modo producción, sin reset automático
     else:  # prod
         destination = 'athena'
         dataset_name = 'raw_datavision_prod'
-        dev_mode = False  # Modo producción, sin reset automático
+        entorno_dev_mode = False  # Modo producción, sin reset automático
     
-    # Configurar directorio específico para el entorno, ver https://dlthub.com/docs/general-usage/pipeline#pipeline-working-directory
-    pipelines_dir = os.path.join(get_dlt_pipelines_dir(), env)
+    if dev_mode is None:
+        dev_mode = entorno_dev_mode
     
     # Configurar el pipeline de datos con directorio específico y modo de desarrollo
-    pipeline = dlt.pipeline(
+    return dlt.pipeline(
         pipeline_name='datavision',
         destination=destination,
         dataset_name=dataset_name,
@@ -60,14 +567,76 @@ def carga_datos(
         import_schema_path="schemas/import",
         export_schema_path="schemas/export",
     )
+
+def cargar_paquetes_pendientes(pipeline: dlt.Pipeline):
+    """
+    Sincroniza el estado con el destino y carga los paquetes que quedaron pendientes
+    de una ejecución anterior (lo mismo que hace pipeline.run antes de extraer).
     
-    # Crear una conexión a la base de datos origen
-    db = sql_database()
+    Args:
+        pipeline (dlt.Pipeline): Pipeline de la ingesta
+    """
+    if not pipeline.dev_mode:
+        pipeline.sync_destination()
+    if pipeline.list_extracted_load_packages() or pipeline.list_normalized_load_packages():
+        print("Cargando paquetes pendientes de una ejecución anterior...")
+        pipeline.run()
+
+def carga_datos(
+    env: str = 'local',
+    full_refresh_tables: Optional[Dict[str, bool]] = None,
+    tables: Optional[List[str]] = None,
+    workers: int = 1,
+    particiones: Optional[int] = None,
+    backend: str = 'sqlalchemy',
+    metricas_dir: Optional[str] = None,
+    dev_mode: Optional[bool] = None,
+    memoria_mb: Optional[int] = None,
+    compactar: bool = False,
+    umbral_archivos: Optional[int] = mantenimiento_iceberg.UMBRAL_ARCHIVOS
+) -> Dict[str, Any]:
+    """
+    Carga datos de las tablas especificadas, permitiendo carga incremental o full refresh.
     
-    # Tablas disponibles por defecto y su configuración
-    # True = carga incremental (tiene updated_at)
-    # False = full refresh
-    # (El diccionario ahora es global: DEFAULT_TABLES)
+    Args:
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod'). Por defecto es 'local'.
+        full_refresh_tables (Dict[str, bool]): Diccionario con las tablas que se cargarán en modo full refresh.
+            Ejemplo: {"contents": True, "content_attributes": False}
+            Si es None, cada tabla se carga según la estrategia definida en DEFAULT_TABLES.
+        tables (List[str]): Lista de tablas a cargar. Si es None, se cargan todas las tablas disponibles.
+        workers (int): Cantidad de hilos para extraer tablas en paralelo y de procesos para normalizar.
+            Con 1 (por defecto) las tablas se extraen una detrás de otra.
+        particiones (int): Cantidad de rangos de clave primaria en que se leen las tablas con
+            pk_ranges cuando se cargan en full refresh. Si es None se usa el pk_ranges de
+            DEFAULT_TABLES; con 1 se desactiva la partición.
+        backend (str): Backend de extracción ('sqlalchemy', 'pyarrow' o 'connectorx'). Con 'pyarrow'
+            y 'connectorx' cada tabla se lee en lotes de Arrow que se escriben directo a parquet,
+            sin crear un diccionario por fila ni pasar por la normalización de JSON.
+        metricas_dir (str): Directorio donde se escriben las métricas en JSON lines y formato
+            Prometheus. Si es None solo se cargan en la tabla _ingesta_metrics del destino.
+        dev_mode (bool): Fuerza el modo desarrollo de dlt (ver crear_pipeline). Con False en
+            'local' el estado incremental se conserva entre ejecuciones.
+        memoria_mb (int): Presupuesto de memoria del proceso en MB. Dimensiona los lotes de lectura
+            de cada tabla y acota los archivos y trabajos en paralelo de cada etapa (ver
+            calcular_lotes_lectura, configurar_limites_memoria y calcular_workers_normalize).
+            Es un objetivo de dimensionamiento, no un límite: el límite duro es la memoria del
+            contenedor. Si es None no se limita.
+        compactar (bool): Compactar (OPTIMIZE y VACUUM) las tablas Iceberg cargadas aunque no
+            superen umbral_archivos (ver mantenimiento_iceberg)
+        umbral_archivos (int): Archivos de una tabla Iceberg cargada a partir de los cuales se
+            compacta. Si es None solo se compacta con compactar=True.
+            
+    Returns:
+        Dict con el LoadInfo de dlt ('load_info'), los tiempos por etapa ('tiempos_etapas'),
+        los tiempos de extracción por tabla ('tiempos_tablas'), las tablas omitidas por no
+        tener cambios ('tablas_omitidas'), los registros de métricas ('metricas') y el
+        resultado del mantenimiento de las tablas Iceberg ('mantenimiento')
+    """
+    pipeline = crear_pipeline(env, dev_mode)
+    
+    # Sincronizar el estado con el destino y terminar cargas pendientes antes de leer las
+    # huellas y los cursores: en un contenedor nuevo el directorio del pipeline está vacío
+    cargar_paquetes_pendientes(pipeline)
     
     # Determinar qué tablas procesar
     tables_to_process = tables if tables else list(DEFAULT_TABLES.keys())
@@ -78,58 +647,306 @@ def carga_datos(
         if table not in DEFAULT_TABLES:
             print(f"Advertencia: La tabla {table} no está en la lista de tablas disponibles")
             continue
-            
-        table_resource = db.with_resources(table)
-
-        # Determinar si la tabla debe ser full refresh
-        is_full_refresh = (
+        tables_to_load.append(table)
+    
+    # Determinar si cada tabla debe ser full refresh
+    full_refresh_by_table = {
+        table: (
             full_refresh_tables is not None and 
             full_refresh_tables.get(table, False)
-        ) or not DEFAULT_TABLES[table]  # Si no soporta incremental, es full refresh
-        
-        # Configurar carga incremental usando updated_at solo si la tabla lo soporta
-        if not is_full_refresh and DEFAULT_TABLES[table]:
-            getattr(table_resource, table).apply_hints(
-                table_format="iceberg",
-                incremental=dlt.sources.incremental("updated_at")
-            )
-        
-        # Configurar el write_disposition específico para esta tabla
-        getattr(table_resource, table).apply_hints(
-            write_disposition="replace" if is_full_refresh else "merge"
+        ) or DEFAULT_TABLES[table]["strategy"] == "replace"  # Si no es incremental, es full refresh
+        for table in tables_to_load
+    }
+    
+    # Las tablas incrementales sin cursor registrado (primera carga o cambio de estrategia) se
+    # recargan completas: un append desde cero volvería a agregar las filas que ya están en el destino
+    estado_recursos = pipeline.state.get('sources', {}).get(fuente_datavision.name, {}).get('resources', {})
+    for table in tables_to_load:
+        spec = DEFAULT_TABLES[table]
+        if full_refresh_by_table[table]:
+            continue
+        cursor = estado_recursos.get(table, {}).get('incremental', {}).get(spec["cursor_column"], {})
+        if cursor.get('last_value') is None:
+            print(f"🆕 {table}: sin cursor de {spec['cursor_column']} registrado, se recarga completa y se registra")
+            full_refresh_by_table[table] = True
+    
+    # Omitir las tablas replace cuya huella no cambió desde la última carga
+    # (un --full-refresh explícito las recarga igual, pero registra su huella)
+    huellas_anteriores = pipeline.state.get('sources', {}).get(fuente_datavision.name, {}).get(ESTADO_HUELLAS, {})
+    huellas = {}
+    tablas_omitidas = []
+    for table in list(tables_to_load):
+        spec = DEFAULT_TABLES[table]
+        if spec["strategy"] != "replace":
+            continue
+        huellas[table] = calcular_huella_tabla(env, table, spec)
+        forzada = (full_refresh_tables or {}).get(table, False)
+        if not forzada and huellas[table] == huellas_anteriores.get(table):
+            print(f"⏭️ {table}: sin cambios desde la última carga ({huellas[table]['filas']} filas), se omite")
+            tablas_omitidas.append(table)
+            tables_to_load.remove(table)
+            del huellas[table]
+    
+    # Calcular los rangos de clave primaria de las tablas grandes que se recargan completas
+    rangos_por_tabla = {}
+    cursores_particionados = {}
+    try:
+        primary_keys = calidad_de_datos.get_primary_keys_from_schema()
+    except FileNotFoundError:
+        primary_keys = {}  # Primera ejecución: el esquema todavía no fue exportado
+    for table in tables_to_load:
+        spec = DEFAULT_TABLES[table]
+        n_particiones = particiones if particiones is not None else spec.get("pk_ranges", 1)
+        if "pk_ranges" not in spec or n_particiones <= 1 or not full_refresh_by_table[table]:
+            continue
+        pk_column = spec.get("primary_key") or primary_keys.get(table)
+        if pk_column is None:
+            print(f"Advertencia: No se encontró la clave primaria de {table} en el esquema, se carga sin particionar")
+            continue
+        if spec["strategy"] != "replace" and spec.get("cursor_column") != pk_column:
+            # El cursor de la tabla solo se puede registrar si es la clave por la que se particiona
+            print(f"Advertencia: {table} tiene un cursor distinto de la clave primaria, se carga sin particionar")
+            continue
+        rangos = calcular_rangos_clave_primaria(env, table, pk_column, n_particiones)
+        if rangos:
+            rangos_por_tabla[table] = (pk_column, rangos)
+            print(f"🔀 {table}: {len(rangos)} rangos de {pk_column} leídos en paralelo")
+            if spec["strategy"] != "replace":
+                # Los rangos terminan en la clave máxima + 1: la próxima carga incremental sigue desde ahí
+                cursores_particionados[table] = (pk_column, rangos[-1][1] - 1)
+    
+    # Los rangos de una tabla particionada necesitan un hilo cada uno
+    extract_workers = max([workers] + [len(rangos) for _, rangos in rangos_por_tabla.values()])
+    
+    # Lote de lectura de cada tabla, acotado por el presupuesto de memoria si se indicó
+    lotes = calcular_lotes_lectura(env, tables_to_load, backend, memoria_mb, extract_workers)
+    if memoria_mb is not None:
+        configurar_limites_memoria(memoria_mb, extract_workers)
+    
+    # Reflejar solo las tablas a cargar, reutilizando la caché si su definición no cambió
+    metadata = reflexion_origen.reflejar_tablas(env, tables_to_load)
+    
+    # Todas las tablas van en una misma fuente para que dlt pueda extraerlas en paralelo
+    recursos = []
+    for table in tables_to_load:
+        lote = lotes[table]
+        if table in rangos_por_tabla:
+            pk_column, rangos = rangos_por_tabla[table]
+            for recurso in crear_recursos_particionados(
+                table, pk_column, rangos, lote['backend'], lote['chunk_size'], metadata
+            ):
+                aplicar_particion_destino(recurso, DEFAULT_TABLES[table])
+                recursos.append(recurso)
+            continue
+        table_resource = sql_table(
+            table=table, backend=lote['backend'], chunk_size=lote['chunk_size'], metadata=metadata
         )
+        spec = DEFAULT_TABLES[table]
+        aplicar_particion_destino(table_resource, spec)
         
-        tables_to_load.append(table_resource)
-
-    # Ejecutar el pipeline
-    info = pipeline.run(tables_to_load)
+        if full_refresh_by_table[table]:
+            if spec["strategy"] != "replace":
+                # Con replace dlt reinicia el incremental: se recarga todo y queda registrado el cursor
+                aplicar_estrategia_incremental(table_resource, spec)
+            table_resource.apply_hints(write_disposition="replace")
+        else:
+            aplicar_estrategia_incremental(table_resource, spec)
+        
+        # Extraer cada tabla en su propio hilo si se pidió más de un worker
+        if workers > 1:
+            table_resource.parallelize()
+        recursos.append(table_resource)
+    recursos.extend([guardar_huellas(huellas), guardar_cursores(cursores_particionados)])
+    source = fuente_datavision(recursos)
+    
+    # Ejecutar el pipeline por etapas para poder medir cada una
+    tiempos_tablas: Dict[str, Dict[str, float]] = {}
+    tiempos_etapas: Dict[str, float] = {}
+    inicio = time.perf_counter()
+    for resource in source.selected_resources.values():
+        resource.add_map(registrar_tiempos_tabla(resource.name, tiempos_tablas, inicio))
+    
+    # En parquet la carga a DuckDB no arma sentencias INSERT en memoria (Athena ya usa parquet)
+    pipeline.extract(source, workers=extract_workers, loader_file_format="parquet")
+    tiempos_etapas['extract_s'] = time.perf_counter() - inicio
+    
+    inicio_etapa = time.perf_counter()
+    normalize_info = pipeline.normalize(workers=calcular_workers_normalize(memoria_mb, workers))
+    tiempos_etapas['normalize_s'] = time.perf_counter() - inicio_etapa
+    
+    inicio_etapa = time.perf_counter()
+    info = pipeline.load()
+    tiempos_etapas['load_s'] = time.perf_counter() - inicio_etapa
+    tiempos_etapas['total_s'] = time.perf_counter() - inicio
 
     # Mostrar el resultado de la operación
     print(info)
+    print(f"⏱️ Tiempos por etapa (workers={workers}): " + ", ".join(f"{k}={v:.2f}" for k, v in tiempos_etapas.items()))
+    for table, tiempos in sorted(tiempos_tablas.items(), key=lambda x: -x[1]['ultimo_lote_s']):
+        print(f"  ⏱️ {table}: primer lote {tiempos['primer_lote_s']:.2f}s, último lote {tiempos['ultimo_lote_s']:.2f}s")
+    
+    resultado = {
+        'load_info': info,
+        'workers': workers,
+        'tiempos_etapas': tiempos_etapas,
+        'tiempos_tablas': tiempos_tablas,
+        'tablas_omitidas': tablas_omitidas
+    }
+    
+    # Exportar métricas de la ejecución (archivos y tabla _ingesta_metrics)
+    row_counts = normalize_info.row_counts if normalize_info is not None else {}
+    resultado['metricas'] = metricas_ingesta.exportar_metricas(pipeline, env, resultado, row_counts, metricas_dir)
+    
+    # Compactar las tablas Iceberg cargadas que acumularon demasiados archivos
+    tablas_cargadas = [table for table in row_counts if not table.startswith('_dlt')]
+    resultado['mantenimiento'] = mantenimiento_iceberg.mantener_tablas_iceberg(
+        pipeline, env, tablas_cargadas, compactar, umbral_archivos, metricas_dir
+    )
+    
+    return resultado
+
+def obtener_tablas_cdc(tables: Optional[List[str]] = None) -> List[str]:
+    """
+    Determina las tablas que se capturan por CDC.
+    
+    Args:
+        tables (List[str]): Tablas pedidas. Si es None, las tablas con estrategia merge-on-updated_at.
+        
+    Returns:
+        Lista de tablas válidas de DEFAULT_TABLES
+    """
+    tables_cdc = []
+    for table in tables or [t for t, spec in DEFAULT_TABLES.items() if spec["strategy"] == "merge-on-updated_at"]:
+        if table not in DEFAULT_TABLES:
+            print(f"Advertencia: La tabla {table} no está en la lista de tablas disponibles")
+            continue
+        tables_cdc.append(table)
+    return tables_cdc
+
+def carga_cdc(
+    env: str = 'local',
+    tables: Optional[List[str]] = None,
+    tamano_lote: int = 10000,
+    max_lotes: Optional[int] = None,
+    compactar: bool = False,
+    umbral_archivos: Optional[int] = mantenimiento_iceberg.UMBRAL_ARCHIVOS,
+    metricas_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Aplica en el destino los cambios capturados por el slot de replicación lógica (ver cdc_postgres).
+    
+    Inserts, updates y deletes se cargan en micro-lotes con merge por clave primaria hasta que
+    el slot no tenga cambios pendientes o se alcance max_lotes. Requiere haber ejecutado antes
+    --preparar-cdc y una carga completa de las tablas.
     
-    return info
+    Args:
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        tables (List[str]): Tablas a capturar. Si es None, las tablas con estrategia merge-on-updated_at.
+        tamano_lote (int): Cantidad aproximada de cambios por micro-lote
+        max_lotes (int): Máximo de micro-lotes por ejecución. Si es None, hasta vaciar el slot.
+        compactar (bool): Compactar las tablas que recibieron cambios aunque no superen umbral_archivos
+        umbral_archivos (int): Archivos a partir de los cuales se compacta una tabla (ver mantenimiento_iceberg)
+        metricas_dir (str): Directorio donde se registra el mantenimiento. Si es None no se registra.
+        
+    Returns:
+        Dict con el resumen de cada micro-lote ('lotes'), el LoadInfo del último ('load_info')
+        y el resultado del mantenimiento de las tablas Iceberg ('mantenimiento')
+    """
+    tables_cdc = obtener_tablas_cdc(tables)
+    primary_keys = {table: DEFAULT_TABLES[table]["primary_key"] for table in tables_cdc}
+    
+    pipeline = crear_pipeline(env)
+    cargar_paquetes_pendientes(pipeline)
+    
+    lotes = []
+    info = None
+    while max_lotes is None or len(lotes) < max_lotes:
+        resumen: Dict[str, Any] = {}
+        inicio = time.perf_counter()
+        info = pipeline.run(cdc_postgres.cambios_postgres(env, tables_cdc, primary_keys, tamano_lote, resumen))
+        resumen['duracion_s'] = time.perf_counter() - inicio
+        
+        # Sin commits nuevos en el slot: el destino está al día
+        if resumen['last_commit_lsn'] is None:
+            break
+        lotes.append(resumen)
+        print(
+            f"🔄 Lote {len(lotes)} hasta LSN {cdc_postgres.entero_a_lsn(resumen['last_commit_lsn'])}: "
+            f"{resumen['filas']} ({resumen['duracion_s']:.2f}s)"
+        )
+    
+    print(f"✅ CDC al día: {len(lotes)} lotes aplicados")
+    
+    # Cada micro-lote agrega archivos de datos y de borrado a las tablas que tocó
+    tablas_cargadas = sorted({table for lote in lotes for table in lote['filas']})
+    mantenimiento = mantenimiento_iceberg.mantener_tablas_iceberg(
+        pipeline, env, tablas_cargadas, compactar, umbral_archivos, metricas_dir
+    )
+    return {
+        'load_info': info,
+        'lotes': lotes,
+        'mantenimiento': mantenimiento
+    }
 
-def ejecutar_validaciones_completas(env: str, tables: List[str]):
+def ejecutar_validaciones_completas(
+    env: str,
+    tables: List[str],
+    consultas_concurrentes: int = ejecutor_athena.MAX_CONSULTAS_CONCURRENTES,
+    reconciliar: bool = False,
+    completa: bool = False,
+    aproximado: bool = False,
+    error_aproximado: float = calidad_de_datos.ERROR_APROXIMADO,
+    muestra_pct: float = calidad_de_datos.MUESTRA_PCT,
+    umbral_aproximado: float = calidad_de_datos.UMBRAL_APROXIMADO,
+    top_duplicados: int = calidad_de_datos.TOP_DUPLICADOS,
+    duplicados_parquet: Optional[str] = None,
+    presupuesto_gb: Optional[float] = None
+):
     """
-    Ejecuta todas las validaciones de calidad de datos.
+    Ejecuta todas las validaciones de calidad de datos con una consulta combinada por tabla.
+    
+    Las marcas de la validación incremental y el historial de validaciones se guardan en el
+    destino con el pipeline del entorno (ver calidad_de_datos.guardar_marcas e
+    historial_validaciones.registrar_historial).
     
     Args:
         env (str): Entorno de ejecución
         tables (List[str]): Lista de tablas a validar
+        consultas_concurrentes (int): Consultas de validación en curso como máximo en Athena
+        reconciliar (bool): Si es True, además compara origen y destino por rangos de clave primaria
+        completa (bool): Si es True, valida las tablas completas en lugar de solo lo cargado
+            desde la última validación
+        aproximado (bool): Si es True, estima duplicados y huérfanos y valida de forma exacta
+            solo las tablas cuya estimación supera umbral_aproximado
+        error_aproximado (float): Error estándar relativo de approx_distinct
+        muestra_pct (float): Porcentaje de filas muestreadas para estimar huérfanos
+        umbral_aproximado (float): Fracción de filas con problemas que dispara la validación exacta
+        top_duplicados (int): Claves repetidas a listar por tabla con duplicados
+        duplicados_parquet (str): Directorio donde escribir en parquet todas las claves repetidas. Si es None no se escribe.
+        presupuesto_gb (float): GB que pueden escanear en Athena las consultas de validación. Los
+            chequeos que no entran se omiten o se reducen a los metadatos de Iceberg. Si es None no hay límite.
     """
-    validaciones = [
-        ("CONTEO", calidad_de_datos.validar_conteo_tablas, calidad_de_datos.mostrar_resumen_conteo),
-        ("DUPLICADOS", calidad_de_datos.validar_duplicados_tablas, calidad_de_datos.mostrar_resumen_duplicados),
-        ("INTEGRIDAD REFERENCIAL", calidad_de_datos.validar_integridad_referencial_tablas, calidad_de_datos.mostrar_resumen_integridad_referencial),
-        ("FRESCURA", calidad_de_datos.validar_freshness_tablas, calidad_de_datos.mostrar_resumen_freshness)
-    ]
-    
-    for nombre, funcion_validacion, funcion_resumen in validaciones:
-        print("\n" + "=" * 60)
-        print(f"🔍 EJECUTANDO VALIDACIÓN DE {nombre}")
-        print("=" * 60)
-        results = funcion_validacion(env, tables)
-        funcion_resumen(results)
+    print("\n" + "=" * 60)
+    print("🔍 EJECUTANDO VALIDACIONES DE CALIDAD DE DATOS")
+    print("=" * 60)
+    # Una sola consulta por tabla en el destino para todas las validaciones
+    presupuesto_bytes = int(presupuesto_gb * 1024 ** 3) if presupuesto_gb is not None else None
+    pipeline = crear_pipeline(env, dev_mode=False)
+    with calidad_de_datos.SesionValidacion(env, consultas_concurrentes, presupuesto_bytes=presupuesto_bytes) as sesion:
+        results = calidad_de_datos.validar_tablas_combinado(
+            env, tables, sesion, completa, aproximado, error_aproximado, muestra_pct, umbral_aproximado,
+            top_duplicados, duplicados_parquet, pipeline=pipeline
+        )
+        if reconciliar:
+            results_reconciliacion = reconciliacion.validar_reconciliacion_tablas(env, tables, sesion)
+        anomalias = historial_validaciones.registrar_historial(pipeline, sesion, env, results)
+    for nombre, _, funcion_resumen in VALIDACIONES:
+        funcion_resumen(results[nombre])
+    if reconciliar:
+        reconciliacion.mostrar_resumen_reconciliacion(results_reconciliacion)
+    calidad_de_datos.mostrar_resumen_costos(sesion)
+    if anomalias:
+        historial_validaciones.mostrar_resumen_anomalias(anomalias)
 
 if __name__ == "__main__":
     # Configurar el parser de argumentos
@@ -144,6 +961,48 @@ if __name__ == "__main__":
                       help='Si se especifica, ejecuta validación de conteo y frescura después de la carga')
     parser.add_argument('--solo-validar', action='store_true',
                       help='Si se especifica, ejecuta solo validación de calidad de datos sin hacer ingesta')
+    parser.add_argument('--workers', type=int, default=1,
+                      help='Cantidad de tablas a extraer en paralelo. Por defecto es 1 (extracción secuencial).')
+    parser.add_argument('--backend', choices=BACKENDS, default='sqlalchemy',
+                      help='Backend de extracción. pyarrow y connectorx leen lotes de Arrow y escriben parquet directamente. Por defecto es sqlalchemy.')
+    parser.add_argument('--particiones', type=int,
+                      help='Rangos de clave primaria para leer en paralelo las tablas grandes en full refresh. Por defecto se usa pk_ranges de DEFAULT_TABLES; 1 desactiva la partición.')
+    parser.add_argument('--memoria-mb', type=int,
+                      help='Presupuesto de memoria en MB (objetivo de dimensionamiento, no un límite duro): achica los lotes de lectura y acota el trabajo en paralelo de cada etapa. Por defecto no se limita.')
+    parser.add_argument('--metricas-dir', default='metricas',
+                      help='Directorio de las métricas de la ejecución (JSON lines y textfile de Prometheus). Por defecto es metricas.')
+    parser.add_argument('--compactar', '--compact', action='store_true',
+                      help='Compactar (OPTIMIZE y VACUUM) las tablas Iceberg cargadas aunque no superen --umbral-archivos')
+    parser.add_argument('--umbral-archivos', type=int, default=mantenimiento_iceberg.UMBRAL_ARCHIVOS,
+                      help=f'Archivos de una tabla Iceberg cargada a partir de los cuales se compacta. Por defecto es {mantenimiento_iceberg.UMBRAL_ARCHIVOS}.')
+    parser.add_argument('--preparar-cdc', action='store_true',
+                      help='Si se especifica, crea la publicación y el slot de replicación lógica en el origen y termina')
+    parser.add_argument('--cdc', action='store_true',
+                      help='Si se especifica, aplica los cambios del slot de replicación lógica en lugar de leer las tablas')
+    parser.add_argument('--cdc-lote', type=int, default=10000,
+                      help='Cantidad aproximada de cambios por micro-lote de CDC. Por defecto es 10000.')
+    parser.add_argument('--cdc-max-lotes', type=int,
+                      help='Máximo de micro-lotes de CDC por ejecución. Por defecto hasta vaciar el slot.')
+    parser.add_argument('--consultas-concurrentes', type=int, default=ejecutor_athena.MAX_CONSULTAS_CONCURRENTES,
+                      help=f'Consultas de validación en curso como máximo en Athena (según el límite del workgroup). Por defecto es {ejecutor_athena.MAX_CONSULTAS_CONCURRENTES}.')
+    parser.add_argument('--validacion-completa', action='store_true',
+                      help='Validar las tablas completas en lugar de solo las filas cargadas desde la última validación')
+    parser.add_argument('--aproximado', '--approximate', action='store_true',
+                      help='Estimar duplicados (approx_distinct) y huérfanos (muestra) y validar de forma exacta solo las tablas cuya estimación supera --umbral-aproximado')
+    parser.add_argument('--error-aproximado', type=float, default=calidad_de_datos.ERROR_APROXIMADO,
+                      help=f'Error estándar relativo de approx_distinct en Athena (mínimo 0.0040625). Por defecto es {calidad_de_datos.ERROR_APROXIMADO}.')
+    parser.add_argument('--muestra-pct', type=float, default=calidad_de_datos.MUESTRA_PCT,
+                      help=f'Porcentaje de filas muestreadas para estimar huérfanos. Por defecto es {calidad_de_datos.MUESTRA_PCT}.')
+    parser.add_argument('--umbral-aproximado', type=float, default=calidad_de_datos.UMBRAL_APROXIMADO,
+                      help=f'Fracción de filas con duplicados o huérfanos (cota superior del intervalo) a partir de la cual se valida de forma exacta. Por defecto es {calidad_de_datos.UMBRAL_APROXIMADO}.')
+    parser.add_argument('--top-duplicados', type=int, default=calidad_de_datos.TOP_DUPLICADOS,
+                      help=f'Claves repetidas a listar (las de más filas) por tabla con duplicados. Por defecto es {calidad_de_datos.TOP_DUPLICADOS}.')
+    parser.add_argument('--duplicados-parquet', metavar='DIRECTORIO',
+                      help='Escribir la lista completa de claves repetidas de cada tabla con duplicados en DIRECTORIO/duplicados_<tabla>.parquet')
+    parser.add_argument('--presupuesto-escaneo-gb', type=float,
+                      help='GB que pueden escanear en Athena las validaciones de la ejecución. Los chequeos que no entran se omiten o se reducen a los metadatos de Iceberg. Por defecto no se limita.')
+    parser.add_argument('--reconciliar', action='store_true',
+                      help='Con las validaciones, comparar origen y destino por rangos de clave primaria y hashes de fila e informar las claves que difieren')
     args = parser.parse_args()
     
     # Usar las tablas que realmente se procesaron
@@ -152,7 +1011,25 @@ if __name__ == "__main__":
     # Ejecutar solo validación si se solicita
     if args.solo_validar:
         print("🔍 EJECUTANDO SOLO VALIDACIÓN DE CALIDAD DE DATOS")
-        ejecutar_validaciones_completas(args.env, tables_to_validate)
+        ejecutar_validaciones_completas(
+            args.env, tables_to_validate, args.consultas_concurrentes, args.reconciliar, args.validacion_completa,
+            args.aproximado, args.error_aproximado, args.muestra_pct, args.umbral_aproximado,
+            args.top_duplicados, args.duplicados_parquet, args.presupuesto_escaneo_gb
+        )
+    elif args.preparar_cdc:
+        cdc_postgres.preparar_cdc(args.env, obtener_tablas_cdc(args.tables))
+    elif args.cdc:
+        info = carga_cdc(
+            args.env, args.tables, args.cdc_lote, args.cdc_max_lotes,
+            args.compactar, args.umbral_archivos, args.metricas_dir
+        )
+        
+        if args.validar_calidad_datos:
+            ejecutar_validaciones_completas(
+                args.env, tables_to_validate, args.consultas_concurrentes, args.reconciliar, args.validacion_completa,
+                args.aproximado, args.error_aproximado, args.muestra_pct, args.umbral_aproximado,
+                args.top_duplicados, args.duplicados_parquet, args.presupuesto_escaneo_gb
+            )
     else:
         # Ejecutar ingesta normal
         # Corregido: si se usa --full-refresh sin --tables, aplicar a todas las tablas por defecto
@@ -163,8 +1040,15 @@ if __name__ == "__main__":
             full_refresh_tables = None
         
         # Ejecutar la carga de datos
-        info = carga_datos(args.env, full_refresh_tables, args.tables)
+        info = carga_datos(
+            args.env, full_refresh_tables, args.tables, args.workers, args.particiones, args.backend, args.metricas_dir,
+            memoria_mb=args.memoria_mb, compactar=args.compactar, umbral_archivos=args.umbral_archivos
+        )
         
         # Ejecutar validación de calidad de datos si se solicita
         if args.validar_calidad_datos:
-            ejecutar_validaciones_completas(args.env, tables_to_validate)
\ No newline at end of file
+            ejecutar_validaciones_completas(
+                args.env, tables_to_validate, args.consultas_concurrentes, args.reconciliar, args.validacion_completa,
+                args.aproximado, args.error_aproximado, args.muestra_pct, args.umbral_aproximado,
+                args.top_duplicados, args.duplicados_parquet, args.presupuesto_escaneo_gb
+            )
\ No newline at end of file
@@ -1,10 +1,16 @@
 import dlt
+import argparse
 from dlt.sources.sql_database import sql_database
 
-def ingesta_ejemplo():
+def ingesta_ejemplo(backend: str = 'sqlalchemy'):
     """
     Ejemplo simplificado de ingesta con DLT.
     Demuestra carga full refresh vs incremental.
+    
+    Args:
+        backend (str): Backend de extracción de sql_database. 'sqlalchemy' genera un
+            diccionario por fila; 'pyarrow' y 'connectorx' generan lotes de Arrow que
+            dlt escribe directamente como parquet.
     """
     
     # 1. Configurar el pipeline
@@ -16,7 +22,8 @@ def ingesta_ejemplo():
     )
     
     # 2. Conectar a la base de datos origen
-    db = sql_database()
+    # Con table_names solo se reflejan las tablas del ejemplo y no todo el esquema origen
+    db = sql_database(backend=backend, table_names=["subscriptions", "accounts"])
     
     # 3. Configurar tabla con carga FULL REFRESH
     # Esta tabla se recarga completamente cada vez
@@ -41,4 +48,8 @@ def ingesta_ejemplo():
     print(f"📊 Información de la ejecución: {info}")
 
 if __name__ == "__main__":
-    ingesta_ejemplo() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Ejemplo simplificado de ingesta con DLT')
+    parser.add_argument('--backend', choices=['sqlalchemy', 'pyarrow', 'connectorx'], default='sqlalchemy',
+                      help='Backend de extracción. Por defecto es sqlalchemy.')
+    args = parser.parse_args()
+    ingesta_ejemplo(args.backend)
@@ -0,0 +1,198 @@
+"""
+Mantenimiento de las tablas Iceberg del destino en Athena después de cada carga.
+
+Cada carga con merge (incremental o CDC) agrega archivos de datos y de borrado chicos,
+y cada commit un snapshot nuevo. Con el tiempo las consultas a esas tablas tienen que
+abrir cada vez más archivos. Después de la carga, para las tablas Iceberg que se
+cargaron, se cuentan los archivos con la tabla de metadatos $files y, si se pidió
+(--compactar) o la cantidad supera un umbral, se ejecuta:
+- OPTIMIZE ... REWRITE DATA USING BIN_PACK: reescribe los archivos chicos y aplica los
+  archivos de borrado
+- VACUUM: expira los snapshots viejos (según vacuum_max_snapshot_age_seconds de la tabla)
+  y elimina los archivos que ya no referencia ningún snapshot
+
+Los conteos de archivos antes y después se informan y se agregan a un archivo JSON lines.
+"""
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import dlt
+
+import metricas_ingesta
+
+ARCHIVO_JSONL = "mantenimiento_iceberg.jsonl"
+
+# Cantidad de archivos (datos + borrado) a partir de la cual se compacta sin pedirlo
+UMBRAL_ARCHIVOS = 100
+
+# Valores de la columna content de $files
+CONTENIDO_DATOS = 0
+
+def tablas_iceberg(pipeline: dlt.Pipeline, tables: List[str]) -> List[str]:
+    """
+    Filtra las tablas que el esquema del pipeline declara con table_format iceberg.
+
+    Args:
+        pipeline (dlt.Pipeline): Pipeline de la ingesta
+        tables (List[str]): Tablas cargadas
+
+    Returns:
+        Lista de tablas Iceberg
+    """
+    schema_tables = pipeline.default_schema.tables
+    return [table for table in tables if schema_tables.get(table, {}).get("table_format") == "iceberg"]
+
+def contar_archivos(client: Any, dataset: str, table: str) -> Dict[str, int]:
+    """
+    Cuenta los archivos de datos y de borrado del snapshot actual de una tabla Iceberg.
+
+    Args:
+        client: sql_client de dlt del destino Athena
+        dataset (str): Base de datos de Glue
+        table (str): Tabla Iceberg
+
+    Returns:
+        Dict con 'archivos_datos', 'archivos_borrado' y 'bytes'
+    """
+    rows = client.execute_sql(
+        f'SELECT content, COUNT(*), SUM(file_size_in_bytes) FROM "{dataset}"."{table}$files" GROUP BY content'
+    )
+    conteo = {'archivos_datos': 0, 'archivos_borrado': 0, 'bytes': 0}
+    for content, archivos, bytes_archivos in rows or []:
+        clave = 'archivos_datos' if content == CONTENIDO_DATOS else 'archivos_borrado'
+        conteo[clave] += archivos
+        conteo['bytes'] += bytes_archivos or 0
+    return conteo
+
+def compactar_tabla(client: Any, dataset: str, table: str):
+    """
+    Reescribe los archivos chicos de una tabla Iceberg y expira los snapshots viejos.
+
+    Args:
+        client: sql_client de dlt del destino Athena
+        dataset (str): Base de datos de Glue
+        table (str): Tabla Iceberg
+    """
+    client.execute_sql(f"OPTIMIZE {dataset}.{table} REWRITE DATA USING BIN_PACK")
+    client.execute_sql(f"VACUUM {dataset}.{table}")
+
+def mantener_tablas_iceberg(
+    pipeline: dlt.Pipeline,
+    env: str,
+    tables: List[str],
+    compactar: bool = False,
+    umbral_archivos: Optional[int] = UMBRAL_ARCHIVOS,
+    directorio: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compacta las tablas Iceberg cargadas que lo necesitan y registra sus archivos antes y después.
+
+    Un error en una tabla se informa en su resultado y no detiene a las demás: la carga ya terminó.
+
+    Args:
+        pipeline (dlt.Pipeline): Pipeline de la ingesta
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        tables (List[str]): Tablas cargadas en la ejecución
+        compactar (bool): Compactar todas las tablas Iceberg cargadas, sin mirar el umbral
+        umbral_archivos (int): Archivos a partir de los cuales se compacta una tabla. Si es None
+            solo se compacta con compactar=True.
+        directorio (str): Directorio del archivo JSON lines. Si es None no se escribe.
+
+    Returns:
+        Dict tabla -> resultado con 'status' ('OK', 'SKIPPED' o 'ERROR') y los conteos de archivos
+    """
+    if env == 'local':
+        # DuckDB no tiene tablas Iceberg: table_format se ignora
+        return {}
+
+    results = {}
+    dataset = pipeline.dataset_name
+    with pipeline.sql_client() as client:
+        for table in tablas_iceberg(pipeline, tables):
+            try:
+                antes = contar_archivos(client, dataset, table)
+                archivos = antes['archivos_datos'] + antes['archivos_borrado']
+                if compactar:
+                    motivo = 'compactar'
+                elif umbral_archivos is not None and archivos > umbral_archivos:
+                    motivo = 'umbral'
+                else:
+                    results[table] = {'status': 'SKIPPED', 'antes': antes}
+                    continue
+
+                inicio = time.perf_counter()
+                compactar_tabla(client, dataset, table)
+                results[table] = {
+                    'status': 'OK',
+                    'motivo': motivo,
+                    'antes': antes,
+                    'despues': contar_archivos(client, dataset, table),
+                    'duracion_s': time.perf_counter() - inicio
+                }
+            except Exception as e:
+                results[table] = {'status': 'ERROR', 'message': str(e)}
+
+    mostrar_resumen_mantenimiento(results)
+    if directorio and results:
+        registrar_mantenimiento(results, env, os.path.join(directorio, ARCHIVO_JSONL))
+    return results
+
+def registrar_mantenimiento(results: Dict[str, Dict[str, Any]], env: str, ruta: str):
+    """
+    Agrega un registro por tabla compactada al archivo JSON lines de mantenimiento.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): Resultados de mantener_tablas_iceberg
+        env (str): Entorno de ejecución
+        ruta (str): Ruta del archivo
+    """
+    timestamp = datetime.now(timezone.utc).isoformat()
+    registros = [
+        {
+            'timestamp': timestamp,
+            'env': env,
+            'table_name': table,
+            'motivo': result['motivo'],
+            'duracion_s': result['duracion_s'],
+            **{f'{clave}_antes': valor for clave, valor in result['antes'].items()},
+            **{f'{clave}_despues': valor for clave, valor in result['despues'].items()}
+        }
+        for table, result in results.items() if result['status'] == 'OK'
+    ]
+    try:
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        metricas_ingesta.escribir_jsonl(registros, ruta)
+    except OSError as e:
+        print(f"⚠️ No se pudo registrar el mantenimiento en {ruta}: {e}")
+
+def mostrar_resumen_mantenimiento(results: Dict[str, Dict[str, Any]]):
+    """
+    Muestra los archivos de cada tabla Iceberg antes y después del mantenimiento.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): Resultados de mantener_tablas_iceberg
+    """
+    if not results:
+        return
+
+    print("\n" + "=" * 60)
+    print("🧹 MANTENIMIENTO DE TABLAS ICEBERG")
+    print("=" * 60)
+
+    for table, result in results.items():
+        if result['status'] == 'OK':
+            antes, despues = result['antes'], result['despues']
+            print(
+                f"  ✅ {table}: {antes['archivos_datos']} + {antes['archivos_borrado']} borrado → "
+                f"{despues['archivos_datos']} + {despues['archivos_borrado']} borrado archivos "
+                f"({result['motivo']}, {result['duracion_s']:.1f}s)"
+            )
+        elif result['status'] == 'SKIPPED':
+            antes = result['antes']
+            print(f"  ⏭️ {table}: {antes['archivos_datos']} + {antes['archivos_borrado']} borrado archivos, bajo el umbral")
+        else:
+            print(f"  ❌ {table}: Error - {result.get('message', 'Desconocido')}")
+
+    print("=" * 60)
@@ -0,0 +1,224 @@
+"""
+Exportación de métricas de cada ejecución de la ingesta.
+
+Por cada ejecución se arma un registro general (duración de cada etapa y memoria pico)
+y un registro por tabla (filas, bytes escritos y tiempos de extracción). Los registros se
+escriben en un archivo JSON lines, en un archivo de texto para el textfile collector
+de Prometheus y en la tabla _ingesta_metrics del destino.
+"""
+import json
+import os
+import resource
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import dlt
+
+TABLA_METRICAS = "_ingesta_metrics"
+ARCHIVO_JSONL = "ingesta_metrics.jsonl"
+ARCHIVO_PROMETHEUS = "ingesta.prom"
+
+def memoria_pico_mb() -> float:
+    """
+    Devuelve la memoria pico (RSS) del proceso o de sus procesos hijos, la que sea mayor.
+
+    Los procesos de normalización (--workers > 1) son hijos, por eso se consideran ambos.
+
+    Returns:
+        float: Memoria pico en MB
+    """
+    pico = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+def construir_metricas(
+    env: str,
+    resultado: Dict[str, Any],
+    row_counts: Dict[str, int]
+) -> List[Dict[str, Any]]:
+    """
+    Arma los registros de métricas de una ejecución de carga_datos.
+
+    Args:
+        env (str): Entorno de ejecución
+        resultado (Dict[str, Any]): Resultado de carga_datos (load_info, tiempos_etapas, tiempos_tablas)
+        row_counts (Dict[str, int]): Filas normalizadas por tabla (NormalizeInfo.row_counts)
+
+    Returns:
+        Lista de registros: uno de la ejecución (table_name = None) y uno por tabla cargada
+    """
+    info = resultado['load_info']
+    tiempos_etapas = resultado['tiempos_etapas']
+    tiempos_tablas = resultado['tiempos_tablas']
+
+    # Bytes escritos por tabla según los archivos cargados al destino
+    bytes_tablas: Dict[str, int] = {}
+    for package in info.load_packages:
+        for job in package.jobs['completed_jobs']:
+            table = job.job_file_info.table_name
+            bytes_tablas[table] = bytes_tablas.get(table, 0) + job.file_size
+
+    base = {
+        'run_id': info.loads_ids[-1] if info.loads_ids else None,
+        'env': env,
+        'pipeline_name': info.pipeline.pipeline_name,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'workers': resultado['workers'],
+        'peak_rss_mb': memoria_pico_mb()
+    }
+
+    registros = [{
+        **base,
+        'table_name': None,
+        'rows': sum(count for table, count in row_counts.items() if not table.startswith('_dlt')),
+        'bytes': sum(count for table, count in bytes_tablas.items() if not table.startswith('_dlt')),
+        'extract_s': tiempos_etapas['extract_s'],
+        'normalize_s': tiempos_etapas['normalize_s'],
+        'load_s': tiempos_etapas['load_s'],
+        'total_s': tiempos_etapas['total_s']
+    }]
+
+    for table, rows in sorted(row_counts.items()):
+        if table.startswith('_dlt'):
+            continue
+        # Las tablas particionadas se extraen en varios recursos (tabla__rango_i)
+        tiempos = [
+            t for recurso, t in tiempos_tablas.items()
+            if recurso == table or recurso.startswith(f"{table}__rango_")
+        ]
+        registros.append({
+            **base,
+            'table_name': table,
+            'rows': rows,
+            'bytes': bytes_tablas.get(table, 0),
+            # Normalize y load se ejecutan para todas las tablas juntas: por tabla solo se mide la extracción
+            'extract_s': max((t['ultimo_lote_s'] for t in tiempos), default=None),
+            'extract_first_batch_s': min((t['primer_lote_s'] for t in tiempos), default=None),
+            'normalize_s': None,
+            'load_s': None,
+            'total_s': None
+        })
+
+    return registros
+
+def escribir_jsonl(registros: List[Dict[str, Any]], ruta: str):
+    """
+    Agrega los registros de métricas al final de un archivo JSON lines.
+
+    Args:
+        registros (List[Dict[str, Any]]): Registros de construir_metricas
+        ruta (str): Ruta del archivo
+    """
+    with open(ruta, 'a', encoding='utf-8') as archivo:
+        for registro in registros:
+            archivo.write(json.dumps(registro) + "\n")
+
+def escribir_prometheus(registros: List[Dict[str, Any]], ruta: str):
+    """
+    Escribe las métricas de la última ejecución en formato de texto de Prometheus.
+
+    El archivo se reemplaza de forma atómica para que el textfile collector de
+    node_exporter nunca lea un archivo a medio escribir.
+
+    Args:
+        registros (List[Dict[str, Any]]): Registros de construir_metricas
+        ruta (str): Ruta del archivo .prom
+    """
+    lineas = []
+
+    def metrica(nombre: str, ayuda: str, valores: List[tuple]):
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} gauge")
+        for etiquetas, valor in valores:
+            if valor is None:
+                continue
+            texto_etiquetas = ",".join(f'{k}="{v}"' for k, v in etiquetas.items())
+            lineas.append(f"{nombre}{{{texto_etiquetas}}} {valor}")
+
+    ejecucion = registros[0]
+    tablas = registros[1:]
+    env = ejecucion['env']
+
+    metrica("ingesta_stage_duration_seconds", "Duración de cada etapa de la última ejecución",
+            [({'env': env, 'stage': etapa}, ejecucion[f'{etapa}_s']) for etapa in ('extract', 'normalize', 'load', 'total')])
+    metrica("ingesta_peak_memory_bytes", "Memoria pico (RSS) de la última ejecución",
+            [({'env': env}, int(ejecucion['peak_rss_mb'] * 1024 * 1024))])
+    metrica("ingesta_last_run_timestamp_seconds", "Momento de fin de la última ejecución",
+            [({'env': env}, datetime.fromisoformat(ejecucion['timestamp']).timestamp())])
+    metrica("ingesta_table_rows", "Filas cargadas por tabla en la última ejecución",
+            [({'env': env, 'table': r['table_name']}, r['rows']) for r in tablas])
+    metrica("ingesta_table_bytes", "Bytes escritos por tabla en la última ejecución",
+            [({'env': env, 'table': r['table_name']}, r['bytes']) for r in tablas])
+    metrica("ingesta_table_extract_seconds", "Segundos desde el inicio de la extracción hasta el último lote de la tabla",
+            [({'env': env, 'table': r['table_name']}, r['extract_s']) for r in tablas])
+
+    ruta_temporal = f"{ruta}.tmp"
+    with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+        archivo.write("\n".join(lineas) + "\n")
+    os.replace(ruta_temporal, ruta)
+
+def cargar_metricas_destino(pipeline: dlt.Pipeline, registros: List[Dict[str, Any]]):
+    """
+    Agrega los registros de métricas a la tabla TABLA_METRICAS del destino.
+
+    Args:
+        pipeline (dlt.Pipeline): Pipeline de la ingesta
+        registros (List[Dict[str, Any]]): Registros de construir_metricas
+    """
+    pipeline.run(
+        registros,
+        table_name=TABLA_METRICAS,
+        write_disposition="append",
+        columns={
+            'table_name': {'data_type': 'text', 'nullable': True},
+            'normalize_s': {'data_type': 'double', 'nullable': True},
+            'load_s': {'data_type': 'double', 'nullable': True},
+            'total_s': {'data_type': 'double', 'nullable': True},
+            'extract_first_batch_s': {'data_type': 'double', 'nullable': True}
+        }
+    )
+
+def exportar_metricas(
+    pipeline: dlt.Pipeline,
+    env: str,
+    resultado: Dict[str, Any],
+    row_counts: Dict[str, int],
+    directorio: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Construye las métricas de una ejecución y las exporta a archivos y al destino.
+
+    Un error al exportar se informa pero no hace fallar la ingesta, que ya terminó.
+
+    Args:
+        pipeline (dlt.Pipeline): Pipeline de la ingesta
+        env (str): Entorno de ejecución
+        resultado (Dict[str, Any]): Resultado de carga_datos
+        row_counts (Dict[str, int]): Filas normalizadas por tabla
+        directorio (str): Directorio de los archivos JSON lines y .prom. Si es None no se escriben archivos.
+
+    Returns:
+        Lista de registros de métricas
+    """
+    registros = construir_metricas(env, resultado, row_counts)
+
+    if directorio:
+        try:
+            os.makedirs(directorio, exist_ok=True)
+            escribir_jsonl(registros, os.path.join(directorio, ARCHIVO_JSONL))
+            escribir_prometheus(registros, os.path.join(directorio, ARCHIVO_PROMETHEUS))
+            print(f"📈 Métricas escritas en {directorio}")
+        except OSError as e:
+            print(f"⚠️ No se pudieron escribir las métricas en {directorio}: {e}")
+
+    try:
+        cargar_metricas_destino(pipeline, registros)
+        print(f"📈 Métricas agregadas a {TABLA_METRICAS}")
+    except Exception as e:
+        print(f"⚠️ No se pudieron cargar las métricas en {TABLA_METRICAS}: {e}")
+
+    return registros
@@ -0,0 +1,409 @@
+"""
+Reconciliación por rangos de clave primaria entre el origen (PostgreSQL) y el destino.
+
+validar_conteo_tablas solo compara COUNT(*): no detecta filas actualizadas en el origen que
+no llegaron al destino ni errores que se compensan (una fila de más y otra de menos). La
+reconciliación calcula, de cada lado, un hash por fila sobre las columnas comunes y, por
+rango de clave primaria, la cantidad de filas y la suma de los hashes (que no depende del
+orden de las filas). Los rangos que coinciden se descartan; los que difieren se dividen en
+RAMAS subrangos y se vuelven a comparar, como en un árbol de Merkle, hasta llegar a rangos de
+a lo sumo FILAS_HOJA claves, de los que se leen las claves y sus hashes para informar
+exactamente qué claves faltan, sobran o tienen valores distintos.
+
+La primera pasada recorre la tabla completa (es la única forma de detectar cualquier
+diferencia); las siguientes leen solo los rangos que difieren, que con pocas diferencias son
+una fracción chica de la tabla.
+
+Para que el hash sea el mismo en PostgreSQL, Athena y DuckDB cada columna se lleva a un texto
+canónico: timestamps y fechas como milisegundos desde epoch, booleanos como 0/1 y números no
+enteros redondeados a DECIMALES_HASH decimales. Las columnas json y array se excluyen porque
+su representación como texto depende del motor.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import calidad_de_datos
+
+# Subrangos en los que se divide un rango que difiere
+RAMAS = 16
+# Ancho máximo (en claves) de un rango del que se leen las filas una por una
+FILAS_HOJA = 1000
+# Claves con diferencias que se guardan en el resultado de cada tabla
+MAX_CLAVES_INFORMADAS = 1000
+# Decimales con los que se comparan los números no enteros
+DECIMALES_HASH = 4
+
+TIPOS_ENTEROS = {'smallint', 'integer', 'bigint'}
+TIPOS_NUMERICOS = {'numeric', 'real', 'double precision'}
+TIPOS_FECHA_HORA = {'timestamp without time zone', 'timestamp with time zone'}
+TIPOS_EXCLUIDOS = {'json', 'jsonb', 'ARRAY', 'USER-DEFINED', 'bytea'}
+
+def expresion_columna(column: str, data_type: str, motor: str) -> str:
+    """
+    Expresión SQL que lleva una columna a su texto canónico para el hash.
+
+    Args:
+        column (str): Columna
+        data_type (str): Tipo de la columna en information_schema del origen
+        motor (str): 'postgres', 'athena' o 'duckdb'
+
+    Returns:
+        str: Expresión SQL de tipo texto
+    """
+    if data_type in TIPOS_FECHA_HORA or data_type == 'date':
+        # Las fechas se toman como el timestamp de su medianoche
+        valor = f"CAST({column} AS TIMESTAMP)" if data_type == 'date' else column
+        if motor == 'postgres':
+            expresion = f"CAST(FLOOR(EXTRACT(EPOCH FROM {valor}) * 1000) AS BIGINT)"
+        elif motor == 'athena':
+            expresion = f"CAST(FLOOR(to_unixtime({valor}) * 1000) AS BIGINT)"
+        else:
+            expresion = f"epoch_ms({valor})"
+    elif data_type == 'boolean':
+        expresion = f"CASE WHEN {column} THEN 1 ELSE 0 END"
+    elif data_type in TIPOS_NUMERICOS:
+        expresion = f"CAST(ROUND({column} * {10 ** DECIMALES_HASH}) AS BIGINT)"
+    else:
+        expresion = column
+    return f"COALESCE(CAST({expresion} AS VARCHAR), '\\N')"
+
+def expresion_hash_fila(columnas: List[Tuple[str, str]], motor: str) -> str:
+    """
+    Expresión SQL con un hash entero de 32 bits de una fila, igual en los tres motores.
+
+    Args:
+        columnas (List[Tuple[str, str]]): (columna, tipo) de las columnas comparadas
+        motor (str): 'postgres', 'athena' o 'duckdb'
+
+    Returns:
+        str: Expresión SQL de tipo entero
+    """
+    texto = "concat_ws('|', " + ", ".join(expresion_columna(c, t, motor) for c, t in columnas) + ")"
+    # Primeros 8 dígitos hexadecimales del md5 del texto de la fila
+    if motor == 'postgres':
+        return f"CAST(CAST('x' || substr(md5({texto}), 1, 8) AS BIT(32)) AS BIGINT)"
+    if motor == 'athena':
+        return f"from_base(substr(lower(to_hex(md5(to_utf8({texto})))), 1, 8), 16)"
+    return f"CAST('0x' || substr(md5({texto}), 1, 8) AS BIGINT)"
+
+def dividir_rango(desde: int, hasta: int, ramas: int = RAMAS) -> List[Tuple[int, int]]:
+    """
+    Divide un rango de claves [desde, hasta] en hasta `ramas` subrangos contiguos.
+
+    Args:
+        desde (int): Primera clave del rango
+        hasta (int): Última clave del rango
+        ramas (int): Cantidad máxima de subrangos
+
+    Returns:
+        Lista de rangos (desde, hasta), ambos inclusive
+    """
+    ancho = max(1, -(-(hasta - desde + 1) // ramas))
+    return [(inicio, min(inicio + ancho - 1, hasta)) for inicio in range(desde, hasta + 1, ancho)]
+
+def consulta_rangos(tabla_sql: str, pk_column: str, hash_sql: str, rangos: List[Tuple[int, int]]) -> str:
+    """
+    Consulta que devuelve, en una sola fila, la cantidad de filas y la suma de hashes de cada rango.
+
+    Args:
+        tabla_sql (str): Tabla, calificada con su esquema si hace falta
+        pk_column (str): Clave primaria entera
+        hash_sql (str): Expresión del hash de la fila (ver expresion_hash_fila)
+        rangos (List[Tuple[int, int]]): Rangos contiguos a agregar
+
+    Returns:
+        str: Consulta con dos columnas por rango (cantidad, suma de hashes)
+    """
+    agregados = []
+    for desde, hasta in rangos:
+        condicion = f"{pk_column} BETWEEN {desde} AND {hasta}"
+        agregados.append(f"SUM(CASE WHEN {condicion} THEN 1 ELSE 0 END)")
+        agregados.append(f"SUM(CASE WHEN {condicion} THEN h ELSE 0 END)")
+    return f"""
+    SELECT {', '.join(agregados)}
+    FROM (
+        SELECT {pk_column}, {hash_sql} AS h
+        FROM {tabla_sql}
+        WHERE {pk_column} BETWEEN {rangos[0][0]} AND {rangos[-1][1]}
+    ) t
+    """
+
+def consulta_filas(tabla_sql: str, pk_column: str, hash_sql: str, desde: int, hasta: int) -> str:
+    """
+    Consulta que devuelve la clave y el hash de cada fila de un rango.
+
+    Args:
+        tabla_sql (str): Tabla, calificada con su esquema si hace falta
+        pk_column (str): Clave primaria entera
+        hash_sql (str): Expresión del hash de la fila
+        desde (int): Primera clave del rango
+        hasta (int): Última clave del rango
+
+    Returns:
+        str: Consulta SQL
+    """
+    return f"""
+    SELECT {pk_column}, {hash_sql}
+    FROM {tabla_sql}
+    WHERE {pk_column} BETWEEN {desde} AND {hasta}
+    """
+
+def agregados_por_rango(fila: Optional[tuple], rangos: List[Tuple[int, int]]) -> Dict[Tuple[int, int], Tuple[int, int]]:
+    """
+    Convierte la fila de consulta_rangos en un dict rango -> (cantidad, suma de hashes).
+
+    Args:
+        fila (tuple): Resultado de consulta_rangos
+        rangos (List[Tuple[int, int]]): Rangos de la consulta, en el mismo orden
+
+    Returns:
+        Dict rango -> (cantidad, suma de hashes)
+    """
+    fila = fila or (None,) * (2 * len(rangos))
+    # SUM sobre cero filas es NULL; PostgreSQL devuelve la suma de BIGINT como NUMERIC
+    return {
+        rango: (int(fila[2 * i] or 0), int(fila[2 * i + 1] or 0))
+        for i, rango in enumerate(rangos)
+    }
+
+def columnas_comparables(sesion: calidad_de_datos.SesionValidacion, table: str) -> List[Tuple[str, str]]:
+    """
+    Columnas del origen que también existen en el destino y se pueden comparar con el hash.
+
+    dlt no crea en el destino las columnas que solo tienen nulos, por eso se usa la intersección.
+
+    Args:
+        sesion (SesionValidacion): Sesión de validación
+        table (str): Tabla
+
+    Returns:
+        Lista de (columna, tipo en el origen), en el orden del origen
+    """
+    with sesion.source_conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT column_name, data_type
+            FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = %s
+            ORDER BY ordinal_position
+            """,
+            (table,)
+        )
+        columnas_origen = cursor.fetchall()
+
+    columnas_destino = {
+        row[0] for row in sesion.execute_destination_all(f"""
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_schema = '{sesion.dataset_name}' AND table_name = '{table}'
+        """, f"reconciliacion:{table}")
+    }
+    return [
+        (column, data_type) for column, data_type in columnas_origen
+        if column in columnas_destino and data_type not in TIPOS_EXCLUIDOS
+    ]
+
+def reconciliar_tabla(
+    sesion: calidad_de_datos.SesionValidacion,
+    table: str,
+    pk_column: str,
+    ramas: int = RAMAS,
+    filas_hoja: int = FILAS_HOJA
+) -> Dict[str, Any]:
+    """
+    Compara una tabla entre origen y destino por rangos de clave primaria, subdividiendo los que difieren.
+
+    Args:
+        sesion (SesionValidacion): Sesión de validación
+        table (str): Tabla
+        pk_column (str): Clave primaria entera
+        ramas (int): Subrangos en los que se divide un rango que difiere
+        filas_hoja (int): Ancho máximo de un rango del que se leen las filas una por una
+
+    Returns:
+        Dict con el resultado de la reconciliación de la tabla
+    """
+    columnas = columnas_comparables(sesion, table)
+    motor_destino = 'duckdb' if sesion.env == 'local' else 'athena'
+    hash_origen = expresion_hash_fila(columnas, 'postgres')
+    hash_destino = expresion_hash_fila(columnas, motor_destino)
+    tabla_destino = f"{sesion.dataset_name}.{table}"
+
+    with sesion.source_conn.cursor() as cursor:
+        cursor.execute(f"SELECT MIN({pk_column}), MAX({pk_column}) FROM {table}")
+        pk_min, pk_max = cursor.fetchone()
+    etiqueta = f"reconciliacion:{table}"
+    minimo, maximo = sesion.execute_destination(f"SELECT MIN({pk_column}), MAX({pk_column}) FROM {tabla_destino}", etiqueta)
+    claves = [v for v in (pk_min, pk_max, minimo, maximo) if v is not None]
+    if not claves:
+        return {'status': 'OK', 'source_count': 0, 'destination_count': 0, 'message': 'Tabla vacía en origen y destino'}
+
+    faltantes, sobrantes, distintas = [], [], []
+    source_count = destination_count = 0
+    filas_releidas = 0
+    niveles = 0
+    # Cada elemento es un rango padre que difiere y se compara dividido en subrangos
+    pendientes = [(min(claves), max(claves))]
+
+    while pendientes:
+        niveles += 1
+        hojas = [r for r in pendientes if r[1] - r[0] + 1 <= filas_hoja and niveles > 1]
+        internos = [r for r in pendientes if r not in hojas]
+        siguientes = []
+
+        # Rangos internos: agregados por subrango de cada lado, todas las consultas del destino juntas
+        subrangos = {r: dividir_rango(r[0], r[1], ramas) for r in internos}
+        consultas = {r: consulta_rangos(tabla_destino, pk_column, hash_destino, subrangos[r]) for r in internos}
+        filas_destino = sesion.execute_destination_many(consultas, etiqueta=etiqueta)
+        for rango in internos:
+            if isinstance(filas_destino[rango], Exception):
+                raise filas_destino[rango]
+            with sesion.source_conn.cursor() as cursor:
+                cursor.execute(consulta_rangos(table, pk_column, hash_origen, subrangos[rango]))
+                origen = agregados_por_rango(cursor.fetchone(), subrangos[rango])
+            destino = agregados_por_rango(filas_destino[rango], subrangos[rango])
+            for subrango in subrangos[rango]:
+                if niveles == 1:
+                    source_count += origen[subrango][0]
+                    destination_count += destino[subrango][0]
+                else:
+                    filas_releidas += max(origen[subrango][0], destino[subrango][0])
+                if origen[subrango] != destino[subrango]:
+                    siguientes.append(subrango)
+
+        # Hojas: claves y hashes fila por fila
+        for desde, hasta in hojas:
+            with sesion.source_conn.cursor() as cursor:
+                cursor.execute(consulta_filas(table, pk_column, hash_origen, desde, hasta))
+                filas_origen = dict(cursor.fetchall())
+            filas_dest = dict(sesion.execute_destination_all(
+                consulta_filas(tabla_destino, pk_column, hash_destino, desde, hasta), etiqueta
+            ))
+            filas_releidas += max(len(filas_origen), len(filas_dest))
+            faltantes.extend(sorted(filas_origen.keys() - filas_dest.keys()))
+            sobrantes.extend(sorted(filas_dest.keys() - filas_origen.keys()))
+            distintas.extend(sorted(
+                k for k in filas_origen.keys() & filas_dest.keys() if filas_origen[k] != filas_dest[k]
+            ))
+
+        pendientes = siguientes
+
+    diferencias = len(faltantes) + len(sobrantes) + len(distintas)
+    return {
+        'status': 'OK' if diferencias == 0 else 'WARNING',
+        'source_count': source_count,
+        'destination_count': destination_count,
+        'columnas': len(columnas),
+        'claves_faltantes': faltantes[:MAX_CLAVES_INFORMADAS],
+        'claves_sobrantes': sobrantes[:MAX_CLAVES_INFORMADAS],
+        'claves_distintas': distintas[:MAX_CLAVES_INFORMADAS],
+        'diferencias': diferencias,
+        'niveles': niveles,
+        # Filas leídas después de la primera pasada, respecto del total de la tabla
+        'fraccion_releida': filas_releidas / max(source_count, destination_count, 1)
+    }
+
+def validar_reconciliacion_tablas(
+    env: str = 'local',
+    tables: Optional[List[str]] = None,
+    sesion: Optional[calidad_de_datos.SesionValidacion] = None
+) -> Dict[str, Dict]:
+    """
+    Reconcilia las tablas entre origen y destino por rangos de clave primaria y hashes de fila.
+
+    Args:
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        tables (List[str]): Lista de tablas a validar
+        sesion (SesionValidacion): Sesión con las conexiones a reutilizar. Si es None, se abre una para esta validación.
+
+    Returns:
+        Dict con resultados de reconciliación por tabla
+    """
+    if tables is None:
+        print("⚠️ No se especificaron tablas para validar")
+        return {}
+
+    results = {}
+
+    print("🧮 Reconciliando tablas por rangos de clave primaria...")
+
+    propia = sesion is None
+    sesion = sesion or calidad_de_datos.SesionValidacion(env)
+    primary_keys = sesion.primary_keys
+
+    try:
+        with sesion.source_conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT table_name, column_name, data_type
+                FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = ANY(%s)
+                """,
+                (list(tables),)
+            )
+            tipos = {(table, column): data_type for table, column, data_type in cursor.fetchall()}
+
+        for table in tables:
+            pk_column = primary_keys.get(table)
+            if pk_column is None or tipos.get((table, pk_column)) not in TIPOS_ENTEROS:
+                results[table] = {
+                    'status': 'SKIP',
+                    'message': f'{table} no tiene clave primaria entera en el esquema'
+                }
+                print(f"  ⏭️ {table}: No tiene clave primaria entera")
+                continue
+
+            # La primera pasada recorre la tabla completa
+            if not calidad_de_datos.entra_en_presupuesto(sesion, calidad_de_datos.estimar_bytes_tabla(sesion, table)):
+                calidad_de_datos.omitir_por_presupuesto(results, table)
+                continue
+
+            try:
+                results[table] = reconciliar_tabla(sesion, table, pk_column)
+                result = results[table]
+                calidad_de_datos.adjuntar_costo(result, sesion, f"reconciliacion:{table}")
+                print(
+                    f"  🧮 {table}: {result.get('diferencias', 0)} claves con diferencias "
+                    f"({result.get('niveles', 0)} niveles, {result.get('fraccion_releida', 0):.2%} releído)"
+                )
+            except Exception as e:
+                results[table] = {
+                    'status': 'ERROR',
+                    'error': str(e)
+                }
+                print(f"  ❌ Error reconciliando {table}: {e}")
+
+    finally:
+        if propia:
+            sesion.close()
+
+    return results
+
+def mostrar_resumen_reconciliacion(results: Dict[str, Dict]):
+    """
+    Muestra un resumen de los resultados de reconciliación.
+
+    Args:
+        results (Dict[str, Dict]): Resultados de validación
+    """
+    print("\n" + "=" * 50)
+    print("🧮 RESUMEN DE RECONCILIACIÓN")
+    print("=" * 50)
+
+    for table, result in results.items():
+        if result['status'] == 'OK':
+            print(f"  ✅ {table}: Origen y destino coinciden{calidad_de_datos.formatear_costo(result)}")
+        elif result['status'] == 'WARNING':
+            print(
+                f"  ⚠️ {table}: {len(result['claves_faltantes'])} faltantes, "
+                f"{len(result['claves_sobrantes'])} sobrantes, {len(result['claves_distintas'])} distintas"
+                f" (releído {result['fraccion_releida']:.2%}){calidad_de_datos.formatear_costo(result)}"
+            )
+            for nombre in ('claves_faltantes', 'claves_sobrantes', 'claves_distintas'):
+                if result[nombre]:
+                    print(f"      {nombre}: {result[nombre][:10]}{' ...' if len(result[nombre]) > 10 else ''}")
+        elif result['status'] == 'SKIP':
+            print(f"  ⏭️ {table}: {result['message']}")
+        else:
+            print(f"  ❌ {table}: Error - {result.get('error', 'Desconocido')}")
+
+    print("=" * 50)
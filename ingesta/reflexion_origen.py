@@ -0,0 +1,142 @@
+"""
+Reflexión de las tablas origen con caché en disco.
+
+dlt necesita la definición de cada tabla (columnas, tipos y clave primaria) para leerla
+con sql_table. En lugar de reflejar todo el esquema origen en cada ejecución, solo se
+reflejan las tablas a cargar y cada una se guarda en un archivo pickle junto con un
+checksum de su definición en information_schema. En las ejecuciones siguientes una tabla
+se vuelve a reflejar solo si su checksum cambió (columnas, tipos, nulabilidad o clave primaria).
+"""
+import os
+import pickle
+from typing import Dict, List, Optional
+
+import sqlalchemy as sa
+from dlt.common.pipeline import get_dlt_pipelines_dir
+
+import calidad_de_datos
+
+# Subdirectorio del directorio de trabajo del entorno donde se guarda la caché
+DIRECTORIO_CACHE = "reflexion_origen"
+
+def calcular_checksums_catalogo(env: str, tables: List[str]) -> Dict[str, str]:
+    """
+    Calcula un checksum de la definición de cada tabla origen a partir de information_schema.
+
+    Args:
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        tables (List[str]): Tablas origen
+
+    Returns:
+        Dict tabla -> md5 de sus columnas y clave primaria. Las tablas que no existen no se incluyen.
+    """
+    source_conn = calidad_de_datos.get_db_connection(env)
+    try:
+        with source_conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT
+                    c.table_name,
+                    md5(string_agg(
+                        concat_ws(':', c.column_name, c.data_type, c.udt_name, c.is_nullable,
+                                  c.character_maximum_length, c.numeric_precision, c.numeric_scale,
+                                  c.datetime_precision, k.constraint_name),
+                        ',' ORDER BY c.ordinal_position
+                    ))
+                FROM information_schema.columns c
+                LEFT JOIN information_schema.table_constraints tc
+                    ON tc.table_schema = c.table_schema
+                    AND tc.table_name = c.table_name
+                    AND tc.constraint_type = 'PRIMARY KEY'
+                LEFT JOIN information_schema.key_column_usage k
+                    ON k.constraint_schema = tc.constraint_schema
+                    AND k.constraint_name = tc.constraint_name
+                    AND k.column_name = c.column_name
+                WHERE c.table_schema = current_schema() AND c.table_name = ANY(%s)
+                GROUP BY c.table_name
+                """,
+                (tables,)
+            )
+            return dict(cursor.fetchall())
+    finally:
+        source_conn.close()
+
+def leer_cache(ruta: str) -> Optional[tuple]:
+    """
+    Lee una tabla reflejada de la caché.
+
+    Args:
+        ruta (str): Ruta del archivo pickle
+
+    Returns:
+        Tupla (checksum, MetaData con la tabla) o None si no existe o no se puede leer
+    """
+    try:
+        with open(ruta, 'rb') as archivo:
+            return pickle.load(archivo)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # Archivo corrupto o de otra versión de SQLAlchemy: se vuelve a reflejar
+        print(f"⚠️ No se pudo leer la caché de reflexión {ruta}: {e}")
+        return None
+
+def guardar_cache(ruta: str, checksum: str, table: sa.Table):
+    """
+    Guarda una tabla reflejada en la caché, reemplazando el archivo de forma atómica.
+
+    Args:
+        ruta (str): Ruta del archivo pickle
+        checksum (str): Checksum de la definición de la tabla
+        table (sa.Table): Tabla reflejada
+    """
+    metadata_tabla = sa.MetaData()
+    table.to_metadata(metadata_tabla)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    ruta_temporal = f"{ruta}.tmp"
+    with open(ruta_temporal, 'wb') as archivo:
+        pickle.dump((checksum, metadata_tabla), archivo)
+    os.replace(ruta_temporal, ruta)
+
+def reflejar_tablas(env: str, tables: List[str], directorio: Optional[str] = None) -> sa.MetaData:
+    """
+    Devuelve un MetaData con las tablas pedidas, reflejando solo las que no están en caché o cambiaron.
+
+    El MetaData se pasa a sql_table, que no vuelve a reflejar las tablas que ya contiene.
+
+    Args:
+        env (str): Entorno de ejecución ('local', 'dev' o 'prod')
+        tables (List[str]): Tablas origen a cargar
+        directorio (str): Directorio de la caché. Si es None, DIRECTORIO_CACHE dentro del
+            directorio de trabajo del pipeline del entorno.
+
+    Returns:
+        sa.MetaData con las tablas reflejadas (las que no existen en el origen no se incluyen)
+    """
+    directorio = directorio or os.path.join(get_dlt_pipelines_dir(), env, DIRECTORIO_CACHE)
+    metadata = sa.MetaData()
+    if not tables:
+        return metadata
+
+    checksums = calcular_checksums_catalogo(env, tables)
+    pendientes = []
+    for table in tables:
+        if table not in checksums:
+            continue
+        cache = leer_cache(os.path.join(directorio, f"{table}.pickle"))
+        if cache is not None and cache[0] == checksums[table] and table in cache[1].tables:
+            cache[1].tables[table].to_metadata(metadata)
+        else:
+            pendientes.append(table)
+
+    if pendientes:
+        engine = sa.create_engine("postgresql+psycopg2://", creator=lambda: calidad_de_datos.get_db_connection(env))
+        try:
+            metadata.reflect(bind=engine, only=pendientes, resolve_fks=False)
+        finally:
+            engine.dispose()
+        for table in pendientes:
+            guardar_cache(os.path.join(directorio, f"{table}.pickle"), checksums[table], metadata.tables[table])
+
+    print(f"🗂️ Reflexión del origen: {len(checksums) - len(pendientes)} tablas desde caché, {len(pendientes)} reflejadas")
+    return metadata
@@ -0,0 +1,150 @@
+"""
+Reglas declarativas de calidad de datos (reglas_calidad.yaml).
+
+Cada tabla declara su clave primaria, sus claves foráneas, el SLA de frescura y los valores
+aceptados por columna. calidad_de_datos compila las reglas en consultas de conjunto:
+- una consulta por tabla con todas sus reglas propias (conteo, duplicados, frescura y
+  valores aceptados), que la recorre una sola vez
+- una consulta por tabla padre con las FKs de todas las tablas hijas que la referencian,
+  que lee las claves de la tabla padre una sola vez
+
+Así la cantidad de consultas depende de las tablas y no de la cantidad de reglas.
+"""
+from typing import Any, Dict, List, Tuple
+
+import yaml
+
+ARCHIVO_REGLAS = "reglas_calidad.yaml"
+
+# Frescura máxima de los datos, en horas, para las tablas sin frescura_horas
+MAX_HORAS_FRESCURA = 48
+
+CLAVES_REGLA = {'clave_primaria', 'claves_foraneas', 'frescura_horas', 'valores_aceptados'}
+
+def regla_por_defecto() -> Dict[str, Any]:
+    """
+    Regla de una tabla sin entrada en el archivo de reglas.
+
+    Returns:
+        Dict con clave_primaria, claves_foraneas, frescura_horas y valores_aceptados
+    """
+    return {
+        'clave_primaria': None,
+        'claves_foraneas': {},
+        'frescura_horas': MAX_HORAS_FRESCURA,
+        'valores_aceptados': {}
+    }
+
+def cargar_reglas(ruta: str = ARCHIVO_REGLAS) -> Dict[str, Dict[str, Any]]:
+    """
+    Lee y valida el archivo de reglas.
+
+    Args:
+        ruta (str): Ruta del archivo YAML
+
+    Returns:
+        Dict tabla -> regla con todas las claves de regla_por_defecto
+
+    Raises:
+        ValueError: Si el archivo tiene claves desconocidas o valores con el tipo incorrecto
+    """
+    with open(ruta, 'r', encoding='utf-8') as f:
+        contenido = yaml.safe_load(f) or {}
+
+    reglas = {}
+    for table, regla in (contenido.get('tablas') or {}).items():
+        regla = regla or {}
+        desconocidas = set(regla) - CLAVES_REGLA
+        if desconocidas:
+            raise ValueError(f"{ruta}: claves desconocidas en {table}: {', '.join(sorted(desconocidas))}")
+        normalizada = regla_por_defecto()
+        normalizada.update({clave: valor for clave, valor in regla.items() if valor is not None})
+        if not isinstance(normalizada['claves_foraneas'], dict):
+            raise ValueError(f"{ruta}: claves_foraneas de {table} debe ser columna -> tabla padre")
+        if not isinstance(normalizada['frescura_horas'], (int, float)) or normalizada['frescura_horas'] <= 0:
+            raise ValueError(f"{ruta}: frescura_horas de {table} debe ser un número positivo")
+        for column, valores in normalizada['valores_aceptados'].items():
+            if not isinstance(valores, list) or not valores:
+                raise ValueError(f"{ruta}: valores_aceptados de {table}.{column} debe ser una lista no vacía")
+        reglas[table] = normalizada
+    return reglas
+
+def regla_tabla(reglas: Dict[str, Dict[str, Any]], table: str) -> Dict[str, Any]:
+    """
+    Regla de una tabla, o la regla por defecto si no figura en el archivo.
+
+    Args:
+        reglas (Dict[str, Dict[str, Any]]): Reglas de cargar_reglas
+        table (str): Tabla
+
+    Returns:
+        Dict con clave_primaria, claves_foraneas, frescura_horas y valores_aceptados
+    """
+    return reglas.get(table) or regla_por_defecto()
+
+def relaciones_fk(reglas: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    """
+    Relaciones FK -> tabla padre por tabla, de las tablas con claves foráneas.
+
+    Args:
+        reglas (Dict[str, Dict[str, Any]]): Reglas de cargar_reglas
+
+    Returns:
+        Dict tabla -> {columna FK: tabla padre}
+    """
+    return {
+        table: dict(regla['claves_foraneas'])
+        for table, regla in reglas.items()
+        if regla['claves_foraneas']
+    }
+
+def agrupar_por_padre(
+    fk_relations: Dict[str, Dict[str, str]],
+    tables: List[str]
+) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Agrupa las FKs de las tablas validadas por tabla padre.
+
+    Args:
+        fk_relations (Dict[str, Dict[str, str]]): Relaciones FK -> tabla padre por tabla
+        tables (List[str]): Tablas validadas (las hijas cuyas FKs se revisan)
+
+    Returns:
+        Dict tabla padre -> lista de (tabla hija, columna FK)
+    """
+    por_padre: Dict[str, List[Tuple[str, str]]] = {}
+    for table in tables:
+        for fk_column, parent_table in fk_relations.get(table, {}).items():
+            por_padre.setdefault(parent_table, []).append((table, fk_column))
+    return por_padre
+
+def literal_sql(valor: Any) -> str:
+    """
+    Literal SQL de un valor aceptado.
+
+    Args:
+        valor: Texto, número o booleano del archivo de reglas
+
+    Returns:
+        str: Literal para una lista IN (...)
+    """
+    if isinstance(valor, bool):
+        return 'TRUE' if valor else 'FALSE'
+    if isinstance(valor, (int, float)):
+        return repr(valor)
+    texto = str(valor).replace("'", "''")
+    return f"'{texto}'"
+
+def condicion_valor_no_aceptado(alias: str, column: str, valores: List[Any]) -> str:
+    """
+    Condición SQL de una fila con un valor no aceptado en la columna (los NULL se admiten).
+
+    Args:
+        alias (str): Alias de la tabla en la consulta
+        column (str): Columna
+        valores (List[Any]): Valores aceptados
+
+    Returns:
+        str: Condición para un CASE WHEN
+    """
+    return f"{alias}.{column} IS NOT NULL AND {alias}.{column} NOT IN ({', '.join(literal_sql(v) for v in valores)})"